@@ -29,9 +29,10 @@ target_metadata = Base.metadata
 # Import settings module
 
 # Set sqlalchemy url in Alembic config
+# ("%" is escaped for configparser; URL-encoded passwords and query values contain it)
 config.set_main_option("sqlalchemy.url", str(settings.SQLALCHEMY_DATABASE_URI).replace(
     "postgresql+psycopg2", "postgresql+asyncpg"
-))
+).replace("%", "%%"))
 
 
 def run_migrations_offline() -> None:
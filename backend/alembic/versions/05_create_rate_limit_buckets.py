@@ -0,0 +1,35 @@
+"""create_rate_limit_buckets_table
+
+Revision ID: 05_create_rate_limit_buckets
+Revises: 04_create_order_items
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '05_create_rate_limit_buckets'
+down_revision = '04_create_order_items'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # ワーカー間で共有するレート制限バケット
+    # 揮発性データのため WAL を書かない UNLOGGED テーブルにする
+    op.create_table(
+        'rate_limit_buckets',
+        sa.Column('key', sa.String(), primary_key=True),
+        sa.Column('tokens', sa.Float(precision=53), nullable=False),
+        sa.Column('granted', sa.Integer(), nullable=False,
+                  server_default=sa.text('0')),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        prefixes=['UNLOGGED'],
+    )
+
+
+def downgrade() -> None:
+    # テーブル削除
+    op.drop_table('rate_limit_buckets')
@@ -0,0 +1,43 @@
+"""create_item_stock_shards_table
+
+Revision ID: 06_create_item_stock_shards
+Revises: 05_create_rate_limit_buckets
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '06_create_item_stock_shards'
+down_revision = '05_create_rate_limit_buckets'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 人気商品フラグの追加
+    op.add_column(
+        'items',
+        sa.Column('is_hot', sa.Boolean(), nullable=False,
+                  server_default=sa.text('false')),
+    )
+
+    # 在庫シャードテーブルの作成
+    op.create_table(
+        'item_stock_shards',
+        sa.Column('item_id', postgresql.UUID(as_uuid=True),
+                  sa.ForeignKey('items.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('shard_no', sa.Integer(), primary_key=True),
+        sa.Column('stock', sa.Integer(), nullable=False,
+                  server_default=sa.text('0')),
+        sa.CheckConstraint('stock >= 0', name='ck_item_stock_shards_stock'),
+    )
+
+
+def downgrade() -> None:
+    # テーブル削除
+    op.drop_table('item_stock_shards')
+    op.drop_column('items', 'is_hot')
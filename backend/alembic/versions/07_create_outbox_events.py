@@ -0,0 +1,49 @@
+"""create_outbox_events_table
+
+Revision ID: 07_create_outbox_events
+Revises: 06_create_item_stock_shards
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '07_create_outbox_events'
+down_revision = '06_create_item_stock_shards'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # アウトボックステーブルの作成
+    op.create_table(
+        'outbox_events',
+        sa.Column('id', sa.BigInteger(), sa.Identity(), primary_key=True),
+        sa.Column('event_type', sa.String(100), nullable=False),
+        sa.Column('aggregate_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('payload', postgresql.JSONB(), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False,
+                  server_default=sa.text('0')),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True),
+                  server_default=sa.func.now(), nullable=False),
+        sa.Column('available_at', sa.DateTime(timezone=True),
+                  server_default=sa.func.now(), nullable=False),
+        sa.Column('processed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('failed_at', sa.DateTime(timezone=True), nullable=True),
+    )
+
+    # 未処理イベントのみを対象とした部分インデックス
+    op.create_index(
+        'ix_outbox_events_pending', 'outbox_events', ['available_at', 'id'],
+        postgresql_where=sa.text('processed_at IS NULL AND failed_at IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    # テーブル削除
+    op.drop_index('ix_outbox_events_pending', table_name='outbox_events')
+    op.drop_table('outbox_events')
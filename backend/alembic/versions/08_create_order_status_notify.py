@@ -0,0 +1,47 @@
+"""create_order_status_notify_trigger
+
+Revision ID: 08_create_order_status_notify
+Revises: 07_create_outbox_events
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '08_create_order_status_notify'
+down_revision = '07_create_outbox_events'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 注文ステータス変更時に NOTIFY を送るトリガー関数
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_order_status() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('order_status', json_build_object(
+                'id', NEW.id,
+                'user_id', NEW.user_id,
+                'status', NEW.status,
+                'updated_at', NEW.updated_at
+            )::text);
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+
+    # ステータスが実際に変わった行のみ通知する
+    op.execute("""
+        CREATE TRIGGER orders_status_notify
+        AFTER UPDATE OF status ON orders
+        FOR EACH ROW
+        WHEN (OLD.status IS DISTINCT FROM NEW.status)
+        EXECUTE FUNCTION notify_order_status()
+    """)
+
+
+def downgrade() -> None:
+    # トリガーと関数の削除
+    op.execute("DROP TRIGGER IF EXISTS orders_status_notify ON orders")
+    op.execute("DROP FUNCTION IF EXISTS notify_order_status()")
@@ -0,0 +1,190 @@
+"""partition_orders_by_month
+
+Revision ID: 09_partition_orders
+Revises: 08_create_order_status_notify
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '09_partition_orders'
+down_revision = '08_create_order_status_notify'
+branch_labels = None
+depends_on = None
+
+# 移行時に作成しておく未来のパーティション数（以降はアプリが自動作成する）
+MONTHS_AHEAD = 3
+
+ORDER_COLUMNS = (
+    "id, created_at, updated_at, user_id, status, "
+    "shipping_address, total_amount, notes"
+)
+
+
+def _create_orders_table(partitioned: bool) -> None:
+    op.create_table(
+        'orders',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False,
+                  server_default=sa.text('gen_random_uuid()')),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True),
+                  sa.ForeignKey('users.id', name='orders_user_id_fkey'), nullable=False),
+        sa.Column('status', postgresql.ENUM('pending', 'processing', 'shipped', 'delivered', 'cancelled',
+                  name='orderstatus', create_type=False), nullable=False, server_default='pending'),
+        sa.Column('shipping_address', sa.Text(), nullable=True),
+        sa.Column('total_amount', sa.Float(), nullable=False),
+        sa.Column('notes', sa.Text(), nullable=True),
+        # パーティションキーは主キーに含める必要がある
+        sa.PrimaryKeyConstraint(
+            *(['id', 'created_at'] if partitioned else ['id']), name='orders_pkey'),
+        postgresql_partition_by='RANGE (created_at)' if partitioned else None,
+    )
+    op.create_index('ix_orders_id', 'orders', ['id'], unique=False)
+
+
+def _create_order_items_table(partitioned: bool) -> None:
+    columns = [
+        sa.Column('order_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('item_id', postgresql.UUID(as_uuid=True),
+                  sa.ForeignKey('items.id', name='order_items_item_id_fkey'), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False,
+                  server_default=sa.text('1')),
+        sa.Column('price_at_time', sa.Float(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True),
+                  server_default=sa.func.now(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True),
+                  server_default=sa.func.now(), nullable=False),
+    ]
+    if partitioned:
+        # 注文と同じ月のパーティションに入るよう、注文の作成日時を保持する
+        op.create_table(
+            'order_items',
+            *columns,
+            sa.Column('order_created_at', sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint(
+                'order_id', 'item_id', 'order_created_at', name='order_items_pkey'),
+            sa.ForeignKeyConstraint(
+                ['order_id', 'order_created_at'], ['orders.id', 'orders.created_at'],
+                name='order_items_order_id_fkey'),
+            postgresql_partition_by='RANGE (order_created_at)',
+        )
+    else:
+        op.create_table(
+            'order_items',
+            *columns,
+            sa.PrimaryKeyConstraint('order_id', 'item_id', name='order_items_pkey'),
+            sa.ForeignKeyConstraint(
+                ['order_id'], ['orders.id'], name='order_items_order_id_fkey'),
+        )
+
+
+def _create_status_trigger() -> None:
+    op.execute("""
+        CREATE TRIGGER orders_status_notify
+        AFTER UPDATE OF status ON orders
+        FOR EACH ROW
+        WHEN (OLD.status IS DISTINCT FROM NEW.status)
+        EXECUTE FUNCTION notify_order_status()
+    """)
+
+
+def _rename_to_legacy() -> None:
+    # 新テーブルと名前が衝突しないよう、旧テーブルとそのインデックスを退避する
+    op.rename_table('order_items', 'order_items_legacy')
+    op.rename_table('orders', 'orders_legacy')
+    op.execute("ALTER INDEX order_items_pkey RENAME TO order_items_legacy_pkey")
+    op.execute("ALTER INDEX orders_pkey RENAME TO orders_legacy_pkey")
+    op.execute("ALTER INDEX ix_orders_id RENAME TO ix_orders_legacy_id")
+
+
+def upgrade() -> None:
+    _rename_to_legacy()
+
+    # 月単位のレンジパーティションテーブルの作成
+    _create_orders_table(partitioned=True)
+    _create_order_items_table(partitioned=True)
+    op.create_index('ix_orders_user_id_created_at', 'orders',
+                    ['user_id', 'created_at'])
+
+    # 既存データの最古の月から数か月先までのパーティションを作成
+    op.execute(f"""
+        DO $$
+        DECLARE
+            month timestamp;
+        BEGIN
+            FOR month IN
+                SELECT generate_series(
+                    date_trunc('month', LEAST(
+                        (SELECT min(created_at) FROM orders_legacy),
+                        timezone('Asia/Tokyo', now())
+                    )),
+                    date_trunc('month', timezone('Asia/Tokyo', now()))
+                        + interval '{MONTHS_AHEAD} months',
+                    interval '1 month'
+                )
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF orders FOR VALUES FROM (%L) TO (%L)',
+                    'orders_' || to_char(month, 'YYYY_MM'),
+                    month, month + interval '1 month'
+                );
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF order_items FOR VALUES FROM (%L) TO (%L)',
+                    'order_items_' || to_char(month, 'YYYY_MM'),
+                    month, month + interval '1 month'
+                );
+            END LOOP;
+        END
+        $$
+    """)
+
+    # 範囲外の行を受け止めるデフォルトパーティション
+    op.execute("CREATE TABLE orders_default PARTITION OF orders DEFAULT")
+    op.execute("CREATE TABLE order_items_default PARTITION OF order_items DEFAULT")
+
+    # データ移行
+    op.execute(f"""
+        INSERT INTO orders ({ORDER_COLUMNS})
+        SELECT {ORDER_COLUMNS} FROM orders_legacy
+    """)
+    op.execute("""
+        INSERT INTO order_items (order_id, item_id, quantity, price_at_time,
+                                 created_at, updated_at, order_created_at)
+        SELECT oi.order_id, oi.item_id, oi.quantity, oi.price_at_time,
+               oi.created_at, oi.updated_at, o.created_at
+        FROM order_items_legacy oi
+        JOIN orders_legacy o ON o.id = oi.order_id
+    """)
+
+    op.drop_table('order_items_legacy')
+    op.drop_table('orders_legacy')
+    _create_status_trigger()
+
+
+def downgrade() -> None:
+    _rename_to_legacy()
+
+    # 通常のテーブルに戻す
+    _create_orders_table(partitioned=False)
+    _create_order_items_table(partitioned=False)
+
+    op.execute(f"""
+        INSERT INTO orders ({ORDER_COLUMNS})
+        SELECT {ORDER_COLUMNS} FROM orders_legacy
+    """)
+    op.execute("""
+        INSERT INTO order_items (order_id, item_id, quantity, price_at_time,
+                                 created_at, updated_at)
+        SELECT order_id, item_id, quantity, price_at_time, created_at, updated_at
+        FROM order_items_legacy
+    """)
+
+    # パーティションは親テーブルと一緒に削除される
+    op.drop_table('order_items_legacy')
+    op.drop_table('orders_legacy')
+    _create_status_trigger()
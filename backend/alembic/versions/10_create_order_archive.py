@@ -0,0 +1,62 @@
+"""create_order_archive_tables
+
+Revision ID: 10_create_order_archive
+Revises: 09_partition_orders
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '10_create_order_archive'
+down_revision = '09_partition_orders'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # アーカイブ済み注文テーブルの作成（ほぼ読まれないため外部キーは持たない）
+    op.create_table(
+        'orders_archive',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('status', postgresql.ENUM('pending', 'processing', 'shipped', 'delivered', 'cancelled',
+                  name='orderstatus', create_type=False), nullable=False),
+        sa.Column('shipping_address', sa.Text(), nullable=True),
+        sa.Column('total_amount', sa.Float(), nullable=False),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('archived_at', sa.DateTime(timezone=True),
+                  server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index('ix_orders_archive_user_id', 'orders_archive', ['user_id'])
+
+    # アーカイブ済み注文-商品テーブルの作成
+    op.create_table(
+        'order_items_archive',
+        sa.Column('order_id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('item_id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('price_at_time', sa.Float(), nullable=False),
+        sa.Column('order_created_at', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    )
+
+    # アーカイブ対象（完了済み注文）を古い順に辿るための部分インデックス
+    op.create_index(
+        'ix_orders_completed_created_at', 'orders', ['created_at', 'id'],
+        postgresql_where=sa.text("status IN ('delivered', 'cancelled')"),
+    )
+
+
+def downgrade() -> None:
+    # テーブル削除
+    op.drop_index('ix_orders_completed_created_at', table_name='orders')
+    op.drop_table('order_items_archive')
+    op.drop_index('ix_orders_archive_user_id', table_name='orders_archive')
+    op.drop_table('orders_archive')
@@ -0,0 +1,75 @@
+"""create_item_recommendation_tables
+
+Revision ID: 11_create_item_recommendations
+Revises: 10_create_order_archive
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '11_create_item_recommendations'
+down_revision = '10_create_order_archive'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 商品ごとの購入注文数
+    op.create_table(
+        'item_order_counts',
+        sa.Column('item_id', postgresql.UUID(as_uuid=True),
+                  sa.ForeignKey('items.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('orders', sa.Integer(), nullable=False),
+    )
+
+    # 同じ注文で一緒に購入された商品ペアの注文数（両方向を保持する）
+    op.create_table(
+        'item_pair_counts',
+        sa.Column('item_id', postgresql.UUID(as_uuid=True),
+                  sa.ForeignKey('items.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('other_item_id', postgresql.UUID(as_uuid=True),
+                  sa.ForeignKey('items.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('orders', sa.Integer(), nullable=False),
+    )
+
+    # 商品ごとの上位K件のおすすめ
+    op.create_table(
+        'item_recommendations',
+        sa.Column('item_id', postgresql.UUID(as_uuid=True),
+                  sa.ForeignKey('items.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('rank', sa.SmallInteger(), primary_key=True),
+        sa.Column('recommended_item_id', postgresql.UUID(as_uuid=True),
+                  sa.ForeignKey('items.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('co_orders', sa.Integer(), nullable=False),
+        sa.Column('lift', sa.Float(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True),
+                  server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index('ix_item_recommendations_updated_at',
+                    'item_recommendations', ['updated_at'])
+
+    # 集計状態（1行のみ）
+    op.create_table(
+        'recommendation_state',
+        sa.Column('id', sa.SmallInteger(), primary_key=True,
+                  server_default=sa.text('1')),
+        sa.Column('orders_counted', sa.BigInteger(), nullable=False,
+                  server_default=sa.text('0')),
+        sa.Column('built_at', sa.DateTime(timezone=True), nullable=True),
+        sa.CheckConstraint('id = 1', name='ck_recommendation_state_single_row'),
+    )
+    op.execute("INSERT INTO recommendation_state (id) VALUES (1)")
+
+
+def downgrade() -> None:
+    # テーブル削除
+    op.drop_table('recommendation_state')
+    op.drop_index('ix_item_recommendations_updated_at',
+                  table_name='item_recommendations')
+    op.drop_table('item_recommendations')
+    op.drop_table('item_pair_counts')
+    op.drop_table('item_order_counts')
@@ -0,0 +1,40 @@
+"""add_order_search_indexes
+
+Revision ID: 12_add_order_search_indexes
+Revises: 11_create_item_recommendations
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '12_add_order_search_indexes'
+down_revision = '11_create_item_recommendations'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 注文一覧（新しい順）のキーセットページネーション用
+    # パーティションテーブルの親に作成すると各パーティションにも作成される
+    op.create_index('ix_orders_created_at_id', 'orders', ['created_at', 'id'])
+    # ステータスで絞り込み、新しい順に並べる検索用（未処理注文の一覧など）
+    op.create_index('ix_orders_status_created_at_id', 'orders',
+                    ['status', 'created_at', 'id'])
+    # 金額での絞り込み・並べ替え用
+    op.create_index('ix_orders_total_amount_id', 'orders', ['total_amount', 'id'])
+    # ユーザーごとの注文一覧もidまで含めてキーセットで辿れるようにする
+    op.create_index('ix_orders_user_id_created_at_id', 'orders',
+                    ['user_id', 'created_at', 'id'])
+    op.drop_index('ix_orders_user_id_created_at', table_name='orders')
+
+
+def downgrade() -> None:
+    # インデックス削除
+    op.create_index('ix_orders_user_id_created_at', 'orders',
+                    ['user_id', 'created_at'])
+    op.drop_index('ix_orders_user_id_created_at_id', table_name='orders')
+    op.drop_index('ix_orders_total_amount_id', table_name='orders')
+    op.drop_index('ix_orders_status_created_at_id', table_name='orders')
+    op.drop_index('ix_orders_created_at_id', table_name='orders')
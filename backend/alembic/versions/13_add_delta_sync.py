@@ -0,0 +1,91 @@
+"""add_delta_sync
+
+Revision ID: 13_add_delta_sync
+Revises: 12_add_order_search_indexes
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '13_add_delta_sync'
+down_revision = '12_add_order_search_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 差分同期用：更新日時順に前回のカーソル以降の行を辿る
+    op.create_index('ix_items_updated_at_id', 'items', ['updated_at', 'id'])
+    # ユーザーごとの注文の差分同期用（各パーティションにも作成される）
+    op.create_index('ix_orders_user_id_updated_at_id', 'orders',
+                    ['user_id', 'updated_at', 'id'])
+
+    # 削除された行の記録（クライアントに削除を伝えるため）
+    op.create_table(
+        'sync_tombstones',
+        sa.Column('id', sa.BigInteger(), sa.Identity(), primary_key=True),
+        sa.Column('entity', sa.String(50), nullable=False),
+        sa.Column('entity_id', postgresql.UUID(as_uuid=True), nullable=False),
+        # 注文の場合は所有ユーザー
+        sa.Column('owner_id', postgresql.UUID(as_uuid=True), nullable=True),
+        # updated_at と比較できるよう日本時間で保存する
+        sa.Column('deleted_at', sa.DateTime(),
+                  server_default=sa.text("timezone('Asia/Tokyo', clock_timestamp())"),
+                  nullable=False),
+    )
+    op.create_index('ix_sync_tombstones_entity_deleted_at_id', 'sync_tombstones',
+                    ['entity', 'deleted_at', 'id'])
+    op.create_index('ix_sync_tombstones_entity_owner_id_deleted_at_id',
+                    'sync_tombstones', ['entity', 'owner_id', 'deleted_at', 'id'],
+                    postgresql_where=sa.text('owner_id IS NOT NULL'))
+
+    # 行の削除時に削除記録を残すトリガー関数
+    # アーカイブへの移動は削除ではないため app.skip_tombstones で抑止できる
+    op.execute("""
+        CREATE OR REPLACE FUNCTION record_sync_tombstone() RETURNS trigger AS $$
+        BEGIN
+            IF current_setting('app.skip_tombstones', true) = 'on' THEN
+                RETURN OLD;
+            END IF;
+            IF TG_ARGV[0] = 'order' THEN
+                INSERT INTO sync_tombstones (entity, entity_id, owner_id)
+                VALUES (TG_ARGV[0], OLD.id, OLD.user_id);
+            ELSE
+                INSERT INTO sync_tombstones (entity, entity_id)
+                VALUES (TG_ARGV[0], OLD.id);
+            END IF;
+            RETURN OLD;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER items_sync_tombstone
+        AFTER DELETE ON items
+        FOR EACH ROW
+        EXECUTE FUNCTION record_sync_tombstone('item')
+    """)
+    # パーティションテーブルの親に作成すると各パーティションにも作成される
+    op.execute("""
+        CREATE TRIGGER orders_sync_tombstone
+        AFTER DELETE ON orders
+        FOR EACH ROW
+        EXECUTE FUNCTION record_sync_tombstone('order')
+    """)
+
+
+def downgrade() -> None:
+    # トリガー・関数・テーブル・インデックスの削除
+    op.execute("DROP TRIGGER IF EXISTS orders_sync_tombstone ON orders")
+    op.execute("DROP TRIGGER IF EXISTS items_sync_tombstone ON items")
+    op.execute("DROP FUNCTION IF EXISTS record_sync_tombstone()")
+    op.drop_index('ix_sync_tombstones_entity_owner_id_deleted_at_id',
+                  table_name='sync_tombstones')
+    op.drop_index('ix_sync_tombstones_entity_deleted_at_id',
+                  table_name='sync_tombstones')
+    op.drop_table('sync_tombstones')
+    op.drop_index('ix_orders_user_id_updated_at_id', table_name='orders')
+    op.drop_index('ix_items_updated_at_id', table_name='items')
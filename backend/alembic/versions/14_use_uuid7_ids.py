@@ -0,0 +1,58 @@
+"""use_uuid7_ids
+
+Revision ID: 14_use_uuid7_ids
+Revises: 13_add_delta_sync
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '14_use_uuid7_ids'
+down_revision = '13_add_delta_sync'
+branch_labels = None
+depends_on = None
+
+# UUIDv7 主キーを使うテーブル
+TABLES = ('users', 'items', 'orders')
+
+
+def upgrade() -> None:
+    # 時刻順の UUID (version 7) を生成する関数
+    # ランダムな UUID の先頭48ビットを Unix 時刻（ミリ秒）に置き換え、バージョンを7にする
+    op.execute("""
+        CREATE OR REPLACE FUNCTION uuid_generate_v7() RETURNS uuid AS $$
+            SELECT encode(
+                set_bit(
+                    set_bit(
+                        overlay(uuid_send(gen_random_uuid())
+                                PLACING substring(int8send(
+                                    floor(extract(epoch FROM clock_timestamp()) * 1000)::bigint
+                                ) FROM 3)
+                                FROM 1 FOR 6),
+                        52, 1),
+                    53, 1),
+                'hex')::uuid
+        $$ LANGUAGE sql VOLATILE
+    """)
+
+    # SQL で直接挿入した行も時刻順の ID になるようにデフォルトを変更
+    for table in TABLES:
+        op.execute(
+            f"ALTER TABLE {table} ALTER COLUMN id SET DEFAULT uuid_generate_v7()")
+
+    # 主キーと重複する id 単独のインデックスを削除（挿入時の書き込みを減らす）
+    # orders の主キー (id, created_at) も先頭列の id で検索できる
+    for table in TABLES:
+        op.drop_index(f'ix_{table}_id', table_name=table)
+
+
+def downgrade() -> None:
+    # インデックスとデフォルトを元に戻す
+    for table in TABLES:
+        op.create_index(f'ix_{table}_id', table, ['id'], unique=False)
+    for table in TABLES:
+        op.execute(
+            f"ALTER TABLE {table} ALTER COLUMN id SET DEFAULT gen_random_uuid()")
+    op.execute("DROP FUNCTION IF EXISTS uuid_generate_v7()")
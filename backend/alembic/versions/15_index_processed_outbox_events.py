@@ -0,0 +1,28 @@
+"""index_processed_outbox_events
+
+Revision ID: 15_index_processed_outbox_events
+Revises: 14_use_uuid7_ids
+Create Date: 2026-10-20 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '15_index_processed_outbox_events'
+down_revision = '14_use_uuid7_ids'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 保持期間を過ぎた処理済みイベントの削除用インデックス
+    op.create_index(
+        'ix_outbox_events_processed_at', 'outbox_events', ['processed_at'],
+        postgresql_where=sa.text('processed_at IS NOT NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_outbox_events_processed_at', table_name='outbox_events')
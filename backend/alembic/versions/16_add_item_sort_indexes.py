@@ -0,0 +1,30 @@
+"""add_item_sort_indexes
+
+Revision ID: 16_add_item_sort_indexes
+Revises: 15_index_processed_outbox_events
+Create Date: 2026-10-20 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '16_add_item_sort_indexes'
+down_revision = '15_index_processed_outbox_events'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 商品一覧の名前・価格・在庫での並べ替え用（同値はidで並べる）
+    # 名前順はコードポイント順なので COLLATE "C" で作成する
+    op.create_index('ix_items_name_c_id', 'items', [sa.text('name COLLATE "C"'), 'id'])
+    op.create_index('ix_items_price_id', 'items', ['price', 'id'])
+    op.create_index('ix_items_stock_id', 'items', ['stock', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_items_stock_id', table_name='items')
+    op.drop_index('ix_items_price_id', table_name='items')
+    op.drop_index('ix_items_name_c_id', table_name='items')
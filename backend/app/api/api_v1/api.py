@@ -1,9 +1,11 @@
 from fastapi import APIRouter
 
-from app.api.api_v1.endpoints import health, users, items, orders
+from app.api.api_v1.endpoints import auth, health, users, items, orders, reports
 
 api_router = APIRouter()
 api_router.include_router(health.router, prefix="/health", tags=["health"])
+api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
 api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(items.router, prefix="/items", tags=["items"])
 api_router.include_router(orders.router, prefix="/orders", tags=["orders"])
+api_router.include_router(reports.router, prefix="/reports", tags=["reports"])
@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends, Form, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.api.deps import get_current_user
+from app.api.negotiation import NegotiatedRoute
+from app.core.security import create_access_token
+from app.db.session import get_db
+from app.schemas.token import Token
+from app.schemas.user import User
+from app.services.user import UserService
+
+router = APIRouter(route_class=NegotiatedRoute)
+
+
+@router.post("/login", response_model=Token)
+async def login(
+    username: str = Form(..., description="The user's email"),
+    password: str = Form(...),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Exchange an email (as `username`) and password for an access token.
+
+    Takes the OAuth2 password flow form fields, so the docs' Authorize
+    button works against it.
+    """
+    user = await UserService.get_by_email(db, email=username)
+    # bcrypt is deliberately slow; keep it off the event loop. Unknown
+    # emails are checked too, so both failures take the same time.
+    if not await run_in_threadpool(UserService.authenticate, user, password):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Inactive user",
+        )
+    return Token(access_token=create_access_token(user.id))
+
+
+@router.get("/me", response_model=User)
+async def read_current_user(current_user: User = Depends(get_current_user)):
+    """
+    The user the bearer token belongs to.
+    """
+    return current_user
@@ -1,9 +1,14 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.negotiation import NegotiatedRoute
+from app.core.concurrency import concurrency_limiter
 from app.db.session import get_db
+from app.services.catalog import catalog_replica
+from app.services.order_events import order_status_broadcaster
+from app.services.outbox import OutboxService, outbox_metrics
 
-router = APIRouter()
+router = APIRouter(route_class=NegotiatedRoute)
 
 
 @router.get("")
@@ -21,4 +26,16 @@ async def health_check(db: AsyncSession = Depends(get_db)):
     return {
         "status": "ok",
         "database": db_status,
+        "concurrency": concurrency_limiter.snapshot(),
+        "order_events": order_status_broadcaster.snapshot(),
+        "catalog_replica": catalog_replica.snapshot(),
     }
+
+
+@router.get("/outbox")
+async def outbox_health(db: AsyncSession = Depends(get_db)):
+    """
+    Outbox backlog and this worker's delivery throughput and lag.
+    """
+    backlog = await OutboxService.get_backlog(db)
+    return {**backlog, **outbox_metrics.snapshot()}
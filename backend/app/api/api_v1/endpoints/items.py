@@ -1,26 +1,102 @@
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.deps import (
+    arrange_by_ids,
+    format_etag,
+    get_count_mode,
+    get_if_match,
+    get_query_ids,
+    raise_missing_or_modified,
+    set_total_count,
+)
+from app.api.negotiation import NegotiatedRoute
+from app.core.config import settings
 from app.db.session import get_db
-from app.schemas.item import Item, ItemCreate, ItemUpdate
+from app.schemas.batch import ByIdsResult, IdList
+from app.schemas.item import (
+    BoughtTogether,
+    BoughtTogetherItem,
+    Item,
+    ItemCreate,
+    ItemFilter,
+    ItemSort,
+    ItemStockSharding,
+    ItemUpdate,
+)
+from app.schemas.pagination import CountMode
+from app.schemas.sync import Changes
+from app.services.catalog import catalog_replica
 from app.services.item import ItemService
+from app.services.recommendation import recommendation_index
+from app.services.stock import StockService
 
-router = APIRouter()
+router = APIRouter(route_class=NegotiatedRoute)
+
+
+def get_item_filter(
+    name_prefix: Optional[str] = Query(
+        None, min_length=1, max_length=255,
+        description="Only items whose name starts with this (case-sensitive)"),
+    min_price: Optional[float] = Query(
+        None, ge=0, description="Only items costing at least this much"),
+    max_price: Optional[float] = Query(
+        None, ge=0, description="Only items costing at most this much"),
+    min_stock: Optional[int] = Query(
+        None, ge=0, description="Only items with at least this much stock"),
+    max_stock: Optional[int] = Query(
+        None, ge=0, description="Only items with at most this much stock"),
+) -> ItemFilter:
+    """Dependency collecting the item list filters."""
+    for name, low, high in (
+        ("price", min_price, max_price), ("stock", min_stock, max_stock)
+    ):
+        if low is not None and high is not None and low > high:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"min_{name} must not exceed max_{name}",
+            )
+    return ItemFilter(
+        name_prefix=name_prefix,
+        min_price=min_price,
+        max_price=max_price,
+        min_stock=min_stock,
+        max_stock=max_stock,
+    )
 
 
 @router.get("", response_model=List[Item])
 async def read_items(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1),
+    sort: Optional[ItemSort] = Query(
+        None, description="Sort key; a leading - sorts descending. "
+                          "Names sort by code point"),
+    filters: ItemFilter = Depends(get_item_filter),
+    count: CountMode = Depends(get_count_mode),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Retrieve items.
+
+    With CATALOG_REPLICA_ENABLED, lists are served from this worker's
+    in-memory copy of the catalog, which trails writes by up to the refresh
+    interval; exact and estimated counts are then both exact. The database
+    answers while the copy is loading, over its memory budget or lagging.
     """
-    items = await ItemService.get_all(db, skip=skip, limit=limit)
+    if catalog_replica.serves(settings.CATALOG_REPLICA_MAX_LAG):
+        items = catalog_replica.search(filters, sort=sort, skip=skip, limit=limit)
+        if count != CountMode.NONE:
+            set_total_count(response, catalog_replica.count(filters))
+        return items
+    items = await ItemService.search(
+        db, filters=filters, sort=sort, skip=skip, limit=limit)
+    set_total_count(response, await ItemService.count(db, mode=count, filters=filters))
     return items
 
 
@@ -36,9 +112,59 @@ async def create_item(
     return item
 
 
+@router.get("/by-ids", response_model=ByIdsResult[Item])
+async def read_items_by_ids(
+    ids: List[UUID] = Depends(get_query_ids),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get several items in one request, in the order the IDs were given.
+
+    IDs with no item are listed under `missing`.
+    """
+    items = await ItemService.get_by_ids(db, item_ids=ids)
+    found, missing = arrange_by_ids(ids, items)
+    return ByIdsResult[Item](results=found, missing=missing)
+
+
+@router.post("/by-ids", response_model=ByIdsResult[Item])
+async def read_items_by_ids_post(
+    ids_in: IdList,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Same as GET /by-ids, for ID lists too long for a query string.
+    """
+    items = await ItemService.get_by_ids(db, item_ids=ids_in.ids)
+    found, missing = arrange_by_ids(ids_in.ids, items)
+    return ByIdsResult[Item](results=found, missing=missing)
+
+
+@router.get("/changes", response_model=Changes[Item])
+async def read_item_changes(
+    since: Optional[str] = Query(
+        None, description="next_cursor from the previous sync; omit for a full load"),
+    limit: int = Query(500, ge=1, le=settings.SYNC_PAGE_MAX),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Items created, updated or deleted since the last sync.
+
+    Apply `changed` as upserts and `deleted` as removals, then keep
+    `next_cursor` for the next sync; while `has_more` is true, fetch again
+    right away. A cursor older than the tombstone retention gets 410: reload
+    everything by syncing without `since`.
+    """
+    items, deleted, next_cursor, has_more = await ItemService.changes(
+        db, since=since, limit=limit)
+    return Changes[Item](
+        changed=items, deleted=deleted, next_cursor=next_cursor, has_more=has_more)
+
+
 @router.get("/{item_id}", response_model=Item)
 async def read_item(
     item_id: UUID,
+    response: Response,
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -50,17 +176,92 @@ async def read_item(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Item not found",
         )
+    response.headers["ETag"] = format_etag(item.updated_at)
     return item
 
 
+@router.get("/{item_id}/bought-together", response_model=BoughtTogether)
+async def read_bought_together(
+    item_id: UUID,
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Items most often ordered together with this one, best first.
+
+    Served from this worker's in-memory index, which trails new orders by
+    the outbox delay plus the refresh interval.
+    """
+    neighbors = recommendation_index.get(item_id, limit)
+    if not neighbors and not await ItemService.get_by_id(db, item_id=item_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Item not found",
+        )
+    return BoughtTogether(
+        item_id=item_id,
+        items=[
+            BoughtTogetherItem(item_id=other, co_orders=co_orders, lift=lift)
+            for other, co_orders, lift in neighbors
+        ],
+    )
+
+
 @router.put("/{item_id}", response_model=Item)
 async def update_item(
     item_id: UUID,
     item_in: ItemUpdate,
+    response: Response,
+    expected_updated_at: Optional[List[datetime]] = Depends(get_if_match),
     db: AsyncSession = Depends(get_db),
 ):
     """
     Update an item.
+
+    Send the ETag from a previous response in If-Match to reject the update
+    with 412 if the item has changed since.
+    """
+    item = await ItemService.update_by_id(
+        db, item_id=item_id, obj_in=item_in, expected_updated_at=expected_updated_at
+    )
+    if not item:
+        await raise_missing_or_modified(
+            "Item", expected_updated_at,
+            lambda: ItemService.get_by_id(db, item_id=item_id))
+    response.headers["ETag"] = format_etag(item.updated_at)
+    return item
+
+
+@router.delete("/{item_id}", response_model=Item)
+async def delete_item(
+    item_id: UUID,
+    expected_updated_at: Optional[List[datetime]] = Depends(get_if_match),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Delete an item.
+    """
+    item = await ItemService.delete_by_id(
+        db, item_id=item_id, expected_updated_at=expected_updated_at
+    )
+    if not item:
+        await raise_missing_or_modified(
+            "Item", expected_updated_at,
+            lambda: ItemService.get_by_id(db, item_id=item_id))
+    return item
+
+
+@router.put("/{item_id}/stock-shards", response_model=Item)
+async def enable_stock_sharding(
+    item_id: UUID,
+    sharding_in: ItemStockSharding,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Flag an item as hot and spread its stock across shard rows.
+
+    Orders for hot items decrement a single shard instead of locking the
+    item row; items.stock is reconciled from the shards in the background.
     """
     item = await ItemService.get_by_id(db, item_id=item_id)
     if not item:
@@ -68,17 +269,16 @@ async def update_item(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Item not found",
         )
-    item = await ItemService.update(db, db_obj=item, obj_in=item_in)
-    return item
+    return await StockService.enable(db, item, shards=sharding_in.shards)
 
 
-@router.delete("/{item_id}", response_model=Item)
-async def delete_item(
+@router.delete("/{item_id}/stock-shards", response_model=Item)
+async def disable_stock_sharding(
     item_id: UUID,
     db: AsyncSession = Depends(get_db),
 ):
     """
-    Delete an item.
+    Fold a hot item's shards back into its stock column.
     """
     item = await ItemService.get_by_id(db, item_id=item_id)
     if not item:
@@ -86,5 +286,5 @@ async def delete_item(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Item not found",
         )
-    item = await ItemService.delete(db, db_obj=item)
-    return item
+    return await StockService.disable(db, item)
+
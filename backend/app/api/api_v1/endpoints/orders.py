@@ -1,32 +1,122 @@
+import asyncio
+import json
+from datetime import datetime
 from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
-from app.schemas.order import Order, OrderCreate, OrderUpdate
+from app.api.deps import (
+    arrange_by_ids,
+    format_etag,
+    get_count_mode,
+    get_if_match,
+    get_query_ids,
+    raise_missing_or_modified,
+    set_total_count,
+)
+from app.api.negotiation import JSON_CODEC, NegotiatedRoute, response_codec
+from app.core.config import settings
+from app.db.session import async_session_factory, get_db
+from app.models.order import OrderStatus
+from app.schemas.batch import ByIdsResult, IdList
+from app.schemas.order import (
+    Order,
+    OrderCreate,
+    OrderFilter,
+    OrderSort,
+    OrderStatusBulkResult,
+    OrderStatusBulkUpdate,
+    OrderUpdate,
+)
+from app.schemas.pagination import CountMode
+from app.schemas.sync import Changes
 from app.services.order import OrderService
+from app.services.order_events import order_status_broadcaster
 
-router = APIRouter()
+router = APIRouter(route_class=NegotiatedRoute)
+
+
+def get_order_filter(
+    user_id: Optional[UUID] = Query(
+        None, description="Filter orders by user ID"),
+    order_status: Optional[List[OrderStatus]] = Query(
+        None, alias="status", description="Only orders in these statuses"),
+    created_from: Optional[datetime] = Query(
+        None, description="Only orders created at or after this time"),
+    created_to: Optional[datetime] = Query(
+        None, description="Only orders created before this time"),
+    min_total: Optional[float] = Query(
+        None, ge=0, description="Only orders totalling at least this much"),
+    max_total: Optional[float] = Query(
+        None, ge=0, description="Only orders totalling at most this much"),
+) -> OrderFilter:
+    """Dependency collecting the order list filters."""
+    if min_total is not None and max_total is not None and min_total > max_total:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="min_total must not exceed max_total",
+        )
+    return OrderFilter(
+        user_id=user_id,
+        status=order_status,
+        created_from=created_from,
+        created_to=created_to,
+        min_total=min_total,
+        max_total=max_total,
+    )
 
 
 @router.get("", response_model=List[Order])
 async def read_orders(
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
-    user_id: Optional[UUID] = Query(
-        None, description="Filter orders by user ID"),
+    limit: int = Query(100, ge=1, le=1000),
+    sort: OrderSort = Query(
+        OrderSort.NEWEST, description="Sort key; a leading - sorts descending"),
+    cursor: Optional[str] = Query(
+        None, description="X-Next-Cursor from the previous page"),
+    filters: OrderFilter = Depends(get_order_filter),
+    count: CountMode = Depends(get_count_mode),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Retrieve orders.
+    Retrieve orders, newest first by default.
+
+    Page with the cursor returned in X-Next-Cursor rather than skip: it stays
+    fast on deep pages. Orders are partitioned by month, so bounding
+    created_at keeps the query to the partitions in range.
     """
-    if user_id:
-        orders = await OrderService.get_by_user_id(db, user_id=user_id, skip=skip, limit=limit)
+    if settings.ORDER_LIST_DB_JSON and response_codec() is JSON_CODEC:
+        body, next_cursor = await OrderService.search_json(
+            db, filters=filters, sort=sort, limit=limit, cursor=cursor, skip=skip)
+        # Postgres built the documents in the Order schema's shape; returning
+        # a Response skips validating and serialising them again, so the
+        # headers go on it rather than on the injected response
+        json_response = Response(
+            content=body, media_type="application/json", headers={"Vary": "Accept"})
+        result, headers = json_response, json_response
     else:
-        orders = await OrderService.get_all(db, skip=skip, limit=limit)
-    return orders
+        orders, next_cursor = await OrderService.search(
+            db, filters=filters, sort=sort, limit=limit, cursor=cursor, skip=skip)
+        result, headers = orders, response
+    if next_cursor:
+        headers.headers["X-Next-Cursor"] = next_cursor
+    set_total_count(headers, await OrderService.count(
+        db, mode=count, filters=filters))
+    return result
 
 
 @router.post("", response_model=Order, status_code=status.HTTP_201_CREATED)
@@ -41,9 +131,73 @@ async def create_order(
     return order
 
 
+@router.patch("/status", response_model=OrderStatusBulkResult)
+async def update_orders_status(
+    status_in: OrderStatusBulkUpdate,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Move many orders to a new status in one statement.
+
+    Invalid transitions (e.g. delivered -> pending) are skipped and reported
+    per ID instead of failing the whole request.
+    """
+    return await OrderService.bulk_update_status(db, obj_in=status_in)
+
+
+@router.get("/by-ids", response_model=ByIdsResult[Order])
+async def read_orders_by_ids(
+    ids: List[UUID] = Depends(get_query_ids),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get several orders in one request, in the order the IDs were given.
+
+    IDs with no order are listed under `missing`.
+    Archived orders are included.
+    """
+    orders = await OrderService.get_by_ids(db, order_ids=ids)
+    found, missing = arrange_by_ids(ids, orders)
+    return ByIdsResult[Order](results=found, missing=missing)
+
+
+@router.post("/by-ids", response_model=ByIdsResult[Order])
+async def read_orders_by_ids_post(
+    ids_in: IdList,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Same as GET /by-ids, for ID lists too long for a query string.
+    """
+    orders = await OrderService.get_by_ids(db, order_ids=ids_in.ids)
+    found, missing = arrange_by_ids(ids_in.ids, orders)
+    return ByIdsResult[Order](results=found, missing=missing)
+
+
+@router.get("/changes", response_model=Changes[Order])
+async def read_order_changes(
+    user_id: UUID = Query(..., description="Sync this user's orders"),
+    since: Optional[str] = Query(
+        None, description="next_cursor from the previous sync; omit for a full load"),
+    limit: int = Query(500, ge=1, le=settings.SYNC_PAGE_MAX),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    A user's orders created, updated or deleted since the last sync.
+
+    Works like GET /items/changes. Archived orders are not reported as
+    deleted.
+    """
+    orders, deleted, next_cursor, has_more = await OrderService.changes(
+        db, user_id=user_id, since=since, limit=limit)
+    return Changes[Order](
+        changed=orders, deleted=deleted, next_cursor=next_cursor, has_more=has_more)
+
+
 @router.get("/{order_id}", response_model=Order)
 async def read_order(
     order_id: UUID,
+    response: Response,
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -55,41 +209,155 @@ async def read_order(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Order not found",
         )
+    response.headers["ETag"] = format_etag(order.updated_at)
     return order
 
 
+async def _get_status_snapshot(order_id: UUID) -> Optional[dict]:
+    # Use a short-lived session so a long-lived stream doesn't pin a connection
+    async with async_session_factory() as db:
+        snapshot = await OrderService.get_status(db, order_id=order_id)
+    return jsonable_encoder(snapshot) if snapshot else None
+
+
+@router.get("/{order_id}/events")
+async def stream_order_status(order_id: UUID):
+    """
+    Stream an order's status changes as Server-Sent Events.
+
+    The first event is the current status; later events arrive as the order
+    changes. The stream ends if the client falls too far behind.
+    """
+    subscription = order_status_broadcaster.subscribe(order_id)
+    if subscription is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many subscribers",
+        )
+    snapshot = await _get_status_snapshot(order_id)
+    if not snapshot:
+        order_status_broadcaster.unsubscribe(subscription)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Order not found",
+        )
+
+    async def event_stream():
+        try:
+            yield f"event: status\ndata: {json.dumps(snapshot)}\n\n"
+            while True:
+                try:
+                    event = await subscription.get(settings.ORDER_EVENTS_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if event is None:
+                    break
+                yield f"event: status\ndata: {json.dumps(event)}\n\n"
+        finally:
+            order_status_broadcaster.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _wait_for_disconnect(websocket: WebSocket) -> None:
+    while (await websocket.receive())["type"] != "websocket.disconnect":
+        pass
+
+
+@router.websocket("/{order_id}/ws")
+async def order_status_websocket(websocket: WebSocket, order_id: UUID):
+    """
+    Push an order's status changes over a WebSocket.
+    """
+    subscription = order_status_broadcaster.subscribe(order_id)
+    if subscription is None:
+        await websocket.close(code=1013)
+        return
+    try:
+        snapshot = await _get_status_snapshot(order_id)
+        if not snapshot:
+            await websocket.close(code=1008)
+            return
+        await websocket.accept()
+        await websocket.send_json(snapshot)
+        # Watch for the client going away while we wait on events
+        disconnected = asyncio.ensure_future(_wait_for_disconnect(websocket))
+        try:
+            while True:
+                next_event = asyncio.ensure_future(subscription.queue.get())
+                done, _ = await asyncio.wait(
+                    {next_event, disconnected},
+                    timeout=settings.ORDER_EVENTS_HEARTBEAT,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if next_event not in done:
+                    next_event.cancel()
+                    if disconnected in done:
+                        return
+                    await websocket.send_json({"type": "ping"})
+                    continue
+                event = next_event.result()
+                if event is None:
+                    # Evicted as a slow consumer
+                    await websocket.close(code=1013)
+                    return
+                await websocket.send_json(event)
+        finally:
+            disconnected.cancel()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        order_status_broadcaster.unsubscribe(subscription)
+
+
 @router.put("/{order_id}", response_model=Order)
 async def update_order(
     order_id: UUID,
     order_in: OrderUpdate,
+    response: Response,
+    expected_updated_at: Optional[List[datetime]] = Depends(get_if_match),
     db: AsyncSession = Depends(get_db),
 ):
     """
     Update an order.
+
+    Send the ETag from a previous response in If-Match to reject the update
+    with 412 if the order has changed since. Archived orders can't be
+    changed and get 404.
     """
-    order = await OrderService.get_by_id(db, order_id=order_id)
+    order = await OrderService.update_by_id(
+        db, order_id=order_id, obj_in=order_in, expected_updated_at=expected_updated_at
+    )
     if not order:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Order not found",
-        )
-    order = await OrderService.update(db, db_obj=order, obj_in=order_in)
+        await raise_missing_or_modified(
+            "Order", expected_updated_at,
+            lambda: OrderService.get_status(db, order_id=order_id))
+    response.headers["ETag"] = format_etag(order.updated_at)
     return order
 
 
 @router.delete("/{order_id}", response_model=Order)
 async def delete_order(
     order_id: UUID,
+    expected_updated_at: Optional[List[datetime]] = Depends(get_if_match),
     db: AsyncSession = Depends(get_db),
 ):
     """
     Delete an order.
+
+    Archived orders can't be deleted and get 404, with or without If-Match.
     """
-    order = await OrderService.get_by_id(db, order_id=order_id)
+    order = await OrderService.delete_by_id(
+        db, order_id=order_id, expected_updated_at=expected_updated_at
+    )
     if not order:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Order not found",
-        )
-    order = await OrderService.delete(db, db_obj=order)
+        await raise_missing_or_modified(
+            "Order", expected_updated_at,
+            lambda: OrderService.get_status(db, order_id=order_id))
     return order
+
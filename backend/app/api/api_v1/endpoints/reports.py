@@ -0,0 +1,93 @@
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.negotiation import NegotiatedRoute
+from app.core.config import settings
+from app.db.session import get_db
+from app.models.base_model import JST
+from app.schemas.report import (
+    ItemMovingAverageReport,
+    OrderValueReport,
+    ReportPeriod,
+    RevenueReport,
+)
+from app.services.report import ReportService
+
+router = APIRouter(route_class=NegotiatedRoute)
+
+
+def get_date_range(
+    start: Optional[date] = Query(
+        None, description="First day of the report (default: 90 days before end)"),
+    end: Optional[date] = Query(
+        None, description="Last day of the report, inclusive (default: today)"),
+) -> Tuple[date, date]:
+    """Dependency resolving and validating a report's date range."""
+    end = end or datetime.now(JST).date()
+    start = start or end - timedelta(days=89)
+    if start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must not be after end",
+        )
+    if (end - start).days + 1 > settings.REPORT_MAX_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Reports may cover at most {settings.REPORT_MAX_DAYS} days",
+        )
+    return start, end
+
+
+@router.get("/revenue", response_model=RevenueReport)
+async def read_revenue(
+    period: ReportPeriod = ReportPeriod.DAY,
+    date_range: Tuple[date, date] = Depends(get_date_range),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Revenue, orders and units sold per day, week or month.
+    """
+    start, end = date_range
+    return await ReportService.revenue(db, period=period, start=start, end=end)
+
+
+@router.get("/order-values", response_model=OrderValueReport)
+async def read_order_values(
+    percentiles: List[float] = Query(
+        [50, 90, 95, 99], alias="p",
+        description="Percentiles to compute, e.g. ?p=50&p=99"),
+    date_range: Tuple[date, date] = Depends(get_date_range),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Order value percentiles.
+    """
+    if any(not 0 <= p <= 100 for p in percentiles):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Percentiles must be between 0 and 100",
+        )
+    start, end = date_range
+    return await ReportService.order_values(
+        db, start=start, end=end, percentiles=percentiles)
+
+
+@router.get("/items/moving-average", response_model=ItemMovingAverageReport)
+async def read_item_moving_average(
+    window: int = Query(7, ge=1, le=365, description="Moving average window in days"),
+    item_id: Optional[List[UUID]] = Query(
+        None, description="Items to report (default: top items by revenue)"),
+    top: int = Query(10, ge=1, le=100),
+    date_range: Tuple[date, date] = Depends(get_date_range),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Daily revenue and moving average per item.
+    """
+    start, end = date_range
+    return await ReportService.item_moving_average(
+        db, start=start, end=end, window=window, item_ids=item_id, top=top)
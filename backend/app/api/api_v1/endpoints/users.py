@@ -1,26 +1,42 @@
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.deps import (
+    arrange_by_ids,
+    format_etag,
+    get_count_mode,
+    get_if_match,
+    get_query_ids,
+    raise_missing_or_modified,
+    set_total_count,
+)
+from app.api.negotiation import NegotiatedRoute
 from app.db.session import get_db
+from app.schemas.batch import ByIdsResult, IdList
+from app.schemas.pagination import CountMode
 from app.schemas.user import User, UserCreate, UserUpdate
 from app.services.user import UserService
 
-router = APIRouter()
+router = APIRouter(route_class=NegotiatedRoute)
 
 
 @router.get("", response_model=List[User])
 async def read_users(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    count: CountMode = Depends(get_count_mode),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Retrieve users.
     """
     users = await UserService.get_all(db, skip=skip, limit=limit)
+    set_total_count(response, await UserService.count(db, mode=count))
     return users
 
 
@@ -36,9 +52,38 @@ async def create_user(
     return user
 
 
+@router.get("/by-ids", response_model=ByIdsResult[User])
+async def read_users_by_ids(
+    ids: List[UUID] = Depends(get_query_ids),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get several users in one request, in the order the IDs were given.
+
+    IDs with no user are listed under `missing`.
+    """
+    users = await UserService.get_by_ids(db, user_ids=ids)
+    found, missing = arrange_by_ids(ids, users)
+    return ByIdsResult[User](results=found, missing=missing)
+
+
+@router.post("/by-ids", response_model=ByIdsResult[User])
+async def read_users_by_ids_post(
+    ids_in: IdList,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Same as GET /by-ids, for ID lists too long for a query string.
+    """
+    users = await UserService.get_by_ids(db, user_ids=ids_in.ids)
+    found, missing = arrange_by_ids(ids_in.ids, users)
+    return ByIdsResult[User](results=found, missing=missing)
+
+
 @router.get("/{user_id}", response_model=User)
 async def read_user(
     user_id: UUID,
+    response: Response,
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -50,6 +95,7 @@ async def read_user(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found",
         )
+    response.headers["ETag"] = format_etag(user.updated_at)
     return user
 
 
@@ -57,34 +103,42 @@ async def read_user(
 async def update_user(
     user_id: UUID,
     user_in: UserUpdate,
+    response: Response,
+    expected_updated_at: Optional[List[datetime]] = Depends(get_if_match),
     db: AsyncSession = Depends(get_db),
 ):
     """
     Update a user.
+
+    Send the ETag from a previous response in If-Match to reject the update
+    with 412 if the user has changed since.
     """
-    user = await UserService.get_by_id(db, user_id=user_id)
+    user = await UserService.update_by_id(
+        db, user_id=user_id, obj_in=user_in, expected_updated_at=expected_updated_at
+    )
     if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found",
-        )
-    user = await UserService.update(db, db_obj=user, obj_in=user_in)
+        await raise_missing_or_modified(
+            "User", expected_updated_at,
+            lambda: UserService.get_by_id(db, user_id=user_id))
+    response.headers["ETag"] = format_etag(user.updated_at)
     return user
 
 
 @router.delete("/{user_id}", response_model=User)
 async def delete_user(
     user_id: UUID,
+    expected_updated_at: Optional[List[datetime]] = Depends(get_if_match),
     db: AsyncSession = Depends(get_db),
 ):
     """
     Delete a user.
     """
-    user = await UserService.get_by_id(db, user_id=user_id)
+    user = await UserService.delete_by_id(
+        db, user_id=user_id, expected_updated_at=expected_updated_at
+    )
     if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found",
-        )
-    user = await UserService.delete(db, db_obj=user)
+        await raise_missing_or_modified(
+            "User", expected_updated_at,
+            lambda: UserService.get_by_id(db, user_id=user_id))
     return user
+
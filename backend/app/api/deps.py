@@ -0,0 +1,155 @@
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Iterable, List, NoReturn, Optional, Sequence, Tuple
+from uuid import UUID
+
+from fastapi import Depends, Header, HTTPException, Query, Response, status
+from fastapi.security import OAuth2PasswordBearer
+from jose import JWTError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.security import verify_access_token
+from app.db.session import get_db
+from app.schemas.pagination import CountMode
+from app.schemas.user import User
+from app.services.user import UserService
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
+
+
+def format_etag(updated_at: datetime) -> str:
+    """Build the ETag for a resource from its updated_at timestamp."""
+    return f'"{updated_at.isoformat()}"'
+
+
+def get_count_mode(
+    count: CountMode = Query(
+        CountMode.NONE,
+        description="Send the total in X-Total-Count: exact (cached briefly), "
+                    "estimated from planner statistics, or none"),
+) -> CountMode:
+    """Dependency reading how a list endpoint should count its total."""
+    return count
+
+
+def set_total_count(response: Response, total: Optional[int]) -> None:
+    """Add the X-Total-Count header when a total was computed."""
+    if total is not None:
+        response.headers["X-Total-Count"] = str(total)
+
+
+def get_query_ids(
+    ids: List[UUID] = Query([], description="IDs to fetch, e.g. ?ids=...&ids=..."),
+) -> List[UUID]:
+    """Dependency validating the IDs of a GET /by-ids request."""
+    if not ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least one id is required",
+        )
+    if len(ids) > settings.BY_IDS_MAX:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.BY_IDS_MAX} ids may be fetched at once",
+        )
+    return ids
+
+
+def arrange_by_ids(
+    ids: Sequence[UUID], rows: Iterable[Any]
+) -> Tuple[List[Any], List[UUID]]:
+    """
+    Put fetched rows in the order their IDs were requested.
+
+    Returns the rows found, each once, and the requested IDs with no row.
+    """
+    by_id = {row.id: row for row in rows}
+    found, missing, seen = [], [], set()
+    for id_ in ids:
+        if id_ in seen:
+            continue
+        seen.add(id_)
+        if id_ in by_id:
+            found.append(by_id[id_])
+        else:
+            missing.append(id_)
+    return found, missing
+
+
+def get_if_match(
+    if_match: Optional[str] = Header(None),
+) -> Optional[List[datetime]]:
+    """
+    Dependency that parses an If-Match header into the accepted updated_at values.
+
+    Returns None when the header is absent or "*", meaning no precondition.
+    If-Match uses strong comparison, so weak tags (W/"...") are dropped and a
+    header of only weak tags yields an empty list that no row matches.
+    """
+    if if_match is None or if_match.strip() == "*":
+        return None
+    accepted = []
+    for tag in if_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            continue
+        try:
+            accepted.append(datetime.fromisoformat(tag.strip('"')))
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid If-Match header",
+            )
+    return accepted
+
+
+async def raise_missing_or_modified(
+    resource: str,
+    expected_updated_at: Optional[List[datetime]],
+    find: Callable[[], Awaitable[Any]],
+) -> NoReturn:
+    """
+    Raise 412 if a conditional write missed a row that still exists, else 404.
+
+    `find` looks the row up and is only awaited when If-Match was sent.
+    """
+    if expected_updated_at is not None and await find():
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail=f"{resource} has been modified",
+        )
+    raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"{resource} not found",
+    )
+
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db),
+) -> User:
+    """
+    Dependency resolving the bearer token to an active user.
+
+    Verified tokens and user rows are cached per worker, so most requests
+    authenticate without a database round-trip; the session only checks out
+    a connection on a cache miss.
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    try:
+        user_id = UUID(verify_access_token(token))
+    except (JWTError, ValueError):
+        raise credentials_exception
+    user = await UserService.get_cached(db, user_id=user_id)
+    if user is None:
+        raise credentials_exception
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Inactive user",
+        )
+    return user
@@ -0,0 +1,175 @@
+import contextvars
+import json
+from functools import lru_cache
+from typing import Any, Callable, Dict, Mapping, NamedTuple, Optional
+
+import cbor2
+import msgpack
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from fastapi.utils import is_body_allowed_for_status_code
+from starlette.background import BackgroundTask
+from starlette.exceptions import HTTPException as StarletteHTTPException
+
+
+class Codec(NamedTuple):
+    """How one media type is written and read."""
+    media_type: str
+    encode: Callable[[Any], bytes]
+    decode: Callable[[bytes], Any]
+
+
+def _encode_json(content: Any) -> bytes:
+    # Same output as JSONResponse
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+JSON_CODEC = Codec("application/json", _encode_json, json.loads)
+MSGPACK_CODEC = Codec("application/msgpack", msgpack.packb, msgpack.unpackb)
+CBOR_CODEC = Codec("application/cbor", cbor2.dumps, cbor2.loads)
+
+_CODECS: Dict[str, Codec] = {
+    "application/json": JSON_CODEC,
+    "application/msgpack": MSGPACK_CODEC,
+    "application/vnd.msgpack": MSGPACK_CODEC,
+    "application/x-msgpack": MSGPACK_CODEC,
+    "application/cbor": CBOR_CODEC,
+}
+
+# Codec the current request's response is written with
+_response_codec: contextvars.ContextVar[Codec] = contextvars.ContextVar(
+    "response_codec", default=JSON_CODEC)
+
+
+def _media_type(header: str) -> str:
+    return header.split(";", 1)[0].strip().lower()
+
+
+@lru_cache(maxsize=256)
+def negotiate(accept: Optional[str]) -> Codec:
+    """
+    The codec an Accept header prefers, JSON when it names none we support.
+
+    Media types are ranked by their q value; among equal ones the first
+    listed wins. Wildcards are ignored, so `*/*` gets JSON.
+    """
+    best, best_q = JSON_CODEC, 0.0
+    for part in (accept or "").split(","):
+        media_type, _, params = part.partition(";")
+        codec = _CODECS.get(media_type.strip().lower())
+        if codec is None:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > best_q:
+            best, best_q = codec, q
+    return best
+
+
+def response_codec() -> Codec:
+    """The codec negotiated for the response of the current request."""
+    return _response_codec.get()
+
+
+class NegotiatedResponse(JSONResponse):
+    """
+    Response written in the media type the request's Accept header asked for.
+
+    Content is the same JSON-compatible data FastAPI would put in a
+    JSONResponse, so every format carries the same fields and values.
+    """
+
+    def __init__(
+        self,
+        content: Any,
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+        media_type: Optional[str] = None,
+        background: Optional[BackgroundTask] = None,
+        codec: Optional[Codec] = None,
+    ) -> None:
+        self.codec = codec or _response_codec.get()
+        super().__init__(
+            content, status_code, headers, media_type or self.codec.media_type, background)
+        self.headers.add_vary_header("Accept")
+
+    def render(self, content: Any) -> bytes:
+        return self.codec.encode(content)
+
+
+class _DecodedBodyRequest(Request):
+    """A request with a MessagePack or CBOR body, which FastAPI reads as JSON."""
+
+    def __init__(self, request: Request, codec: Codec) -> None:
+        scope = dict(request.scope)
+        scope["headers"] = [
+            (name, b"application/json") if name == b"content-type" else (name, value)
+            for name, value in request.scope["headers"]
+        ]
+        super().__init__(scope, request.receive)
+        self._codec = codec
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            self._json = self._codec.decode(await self.body())
+        return self._json
+
+
+class NegotiatedRoute(APIRoute):
+    """
+    Route accepting and returning JSON, MessagePack or CBOR.
+
+    Request bodies are decoded by their Content-Type and then validated by
+    the endpoint's schemas exactly as a JSON body would be; a body that
+    can't be decoded gets the same 400 as malformed JSON. Responses are
+    written in the format the Accept header prefers.
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def negotiated_handler(request: Request) -> Response:
+            codec = _CODECS.get(_media_type(request.headers.get("content-type", "")))
+            if codec is not None and codec is not JSON_CODEC:
+                request = _DecodedBodyRequest(request, codec)
+            token = _response_codec.set(negotiate(request.headers.get("accept")))
+            try:
+                return await handler(request)
+            finally:
+                _response_codec.reset(token)
+
+        return negotiated_handler
+
+
+async def http_exception_handler(
+    request: Request, exc: StarletteHTTPException
+) -> Response:
+    """FastAPI's HTTPException handler, in the negotiated format."""
+    headers = getattr(exc, "headers", None)
+    if not is_body_allowed_for_status_code(exc.status_code):
+        return Response(status_code=exc.status_code, headers=headers)
+    return NegotiatedResponse(
+        {"detail": exc.detail}, status_code=exc.status_code, headers=headers,
+        codec=negotiate(request.headers.get("accept")),
+    )
+
+
+async def request_validation_exception_handler(
+    request: Request, exc: RequestValidationError
+) -> Response:
+    """FastAPI's 422 handler, in the negotiated format."""
+    return NegotiatedResponse(
+        {"detail": jsonable_encoder(exc.errors())}, status_code=422,
+        codec=negotiate(request.headers.get("accept")),
+    )
@@ -0,0 +1,175 @@
+import enum
+import math
+import time
+from typing import Dict, Optional
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+from app.db.session import PoolWaitStats, pool_wait_stats
+
+
+class Priority(enum.IntEnum):
+    """Admission priority of a request; lower values are shed last."""
+    CRITICAL = 0
+    NORMAL = 1
+    SHEDDABLE = 2
+
+
+# Fraction of the current limit each priority class may occupy.
+# Catalog browsing is rejected first so health checks and checkout keep a reserve.
+PRIORITY_SHARE: Dict[Priority, float] = {
+    Priority.CRITICAL: 1.0,
+    Priority.NORMAL: 0.9,
+    Priority.SHEDDABLE: 0.7,
+}
+
+
+def classify_request(method: str, path: str) -> Optional[Priority]:
+    """Map a request to its admission priority, or None to bypass the limiter."""
+    api = settings.API_V1_STR
+    path = path.rstrip("/")
+    if path.endswith("/events"):
+        # Long-lived streams would hold a slot for their whole lifetime
+        return None
+    if path.startswith(f"{api}/health"):
+        return Priority.CRITICAL
+    if method == "POST" and path == f"{api}/orders":
+        return Priority.CRITICAL
+    if method == "GET" and path.startswith(f"{api}/items"):
+        return Priority.SHEDDABLE
+    return Priority.NORMAL
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Gradient-based concurrency limiter.
+
+    The limit grows while short-term latency stays within `tolerance` of the
+    long-term baseline and shrinks proportionally once it does not. Connection
+    pool wait above `pool_wait_threshold` triggers a multiplicative decrease,
+    since it means the database, not the app, is the bottleneck.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        tolerance: float = 2.0,
+        pool_wait_threshold: float = 0.05,
+        backoff_ratio: float = 0.9,
+        smoothing: float = 0.2,
+        pool_stats: Optional[PoolWaitStats] = None,
+    ) -> None:
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.tolerance = tolerance
+        self.pool_wait_threshold = pool_wait_threshold
+        self.backoff_ratio = backoff_ratio
+        self.smoothing = smoothing
+        self.pool_stats = pool_stats
+        self.limit = float(initial_limit)
+        self.inflight = 0
+        self.short_rtt = 0.0
+        self.long_rtt = 0.0
+        self.rejected = 0
+
+    @classmethod
+    def from_settings(cls) -> "AdaptiveConcurrencyLimiter":
+        """Build a limiter from application settings."""
+        return cls(
+            initial_limit=settings.CONCURRENCY_LIMIT_INITIAL,
+            min_limit=settings.CONCURRENCY_LIMIT_MIN,
+            max_limit=settings.CONCURRENCY_LIMIT_MAX,
+            tolerance=settings.CONCURRENCY_LATENCY_TOLERANCE,
+            pool_wait_threshold=settings.CONCURRENCY_POOL_WAIT_THRESHOLD,
+            pool_stats=pool_wait_stats,
+        )
+
+    def try_acquire(self, priority: Priority = Priority.NORMAL) -> bool:
+        """Reserve a slot for a request, or return False if saturated."""
+        if self.inflight >= self.limit * PRIORITY_SHARE[priority]:
+            self.rejected += 1
+            return False
+        self.inflight += 1
+        return True
+
+    def release(self, latency: float) -> None:
+        """Free a slot and feed the observed latency into the limit."""
+        inflight = self.inflight
+        self.inflight -= 1
+        self._update(latency, inflight)
+
+    def _update(self, latency: float, inflight: int) -> None:
+        if self.long_rtt == 0.0:
+            self.short_rtt = self.long_rtt = latency
+        else:
+            self.short_rtt += 0.1 * (latency - self.short_rtt)
+            self.long_rtt += 0.01 * (latency - self.long_rtt)
+            # Let the baseline recover quickly after a slow period
+            if self.long_rtt > 2 * self.short_rtt:
+                self.long_rtt *= 0.95
+
+        pool_wait = self.pool_stats.recent_wait() if self.pool_stats else 0.0
+        if pool_wait > self.pool_wait_threshold:
+            new_limit = self.limit * self.backoff_ratio
+        else:
+            gradient = self.tolerance * self.long_rtt / max(self.short_rtt, 1e-9)
+            gradient = max(0.5, min(1.0, gradient))
+            new_limit = self.limit * gradient + math.sqrt(self.limit)
+            # Don't grow the limit while most of it is unused
+            if inflight < self.limit / 2:
+                new_limit = min(new_limit, self.limit)
+
+        limit = (1 - self.smoothing) * self.limit + self.smoothing * new_limit
+        self.limit = max(float(self.min_limit), min(float(self.max_limit), limit))
+
+    def snapshot(self) -> Dict[str, float]:
+        """Current limiter state for diagnostics."""
+        return {
+            "limit": round(self.limit, 2),
+            "inflight": self.inflight,
+            "short_rtt": self.short_rtt,
+            "long_rtt": self.long_rtt,
+            "pool_wait": self.pool_stats.recent_wait() if self.pool_stats else 0.0,
+            "rejected": self.rejected,
+        }
+
+
+concurrency_limiter = AdaptiveConcurrencyLimiter.from_settings()
+
+
+class ConcurrencyLimitMiddleware:
+    """ASGI middleware that sheds load with 503 once the limiter is saturated."""
+
+    def __init__(
+        self, app: ASGIApp, limiter: Optional[AdaptiveConcurrencyLimiter] = None
+    ) -> None:
+        self.app = app
+        self.limiter = limiter or concurrency_limiter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        priority = classify_request(scope["method"], scope["path"])
+        if priority is None:
+            await self.app(scope, receive, send)
+            return
+        if not self.limiter.try_acquire(priority):
+            response = JSONResponse(
+                {"detail": "Service temporarily overloaded"},
+                status_code=503,
+                headers={"Retry-After": str(settings.CONCURRENCY_RETRY_AFTER)},
+            )
+            await response(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.limiter.release(time.perf_counter() - start)
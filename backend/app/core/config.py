@@ -14,6 +14,16 @@ class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
     SECRET_KEY: str = "your-secret-key-here"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8  # 8 days
+    # Verified tokens remembered per worker
+    AUTH_TOKEN_CACHE_MAX_ENTRIES: int = 10_000
+    # How long an authenticated user row is reused without a database read
+    AUTH_USER_CACHE_TTL: float = 30.0
+    AUTH_USER_CACHE_MAX_ENTRIES: int = 10_000
+    # Most IDs one /by-ids request may resolve
+    BY_IDS_MAX: int = 100
+    # How long an exact X-Total-Count is reused for the same filters
+    COUNT_CACHE_TTL: float = 10.0
+    COUNT_CACHE_MAX_ENTRIES: int = 1024
 
     # CORS settings
     BACKEND_CORS_ORIGINS: List[Union[str, AnyHttpUrl]] = [
@@ -48,5 +58,127 @@ class Settings(BaseSettings):
             path=f"{values.data.get('POSTGRES_DB') or ''}",
         )
 
+    # Connection pool settings
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+
+    # Statement cache settings
+    # asyncpg's per-connection prepared statement cache (0 disables it)
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    # SQLAlchemy's asyncpg adapter cache of prepared statements per connection
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 100
+    # SQLAlchemy's compiled SQL cache, shared by all connections of the engine
+    DB_COMPILED_CACHE_SIZE: int = 500
+    # Safe for PgBouncer in transaction pooling mode: disables prepared
+    # statement reuse and gives each statement a unique name
+    DB_PGBOUNCER_MODE: bool = False
+    # Prefix statements with the service method that issued them, e.g.
+    # /* service:ItemService.get_all */, to trace pg_stat_statements entries
+    DB_QUERY_COMMENTS: bool = True
+
+    # Adaptive concurrency limit settings
+    CONCURRENCY_LIMIT_ENABLED: bool = True
+    CONCURRENCY_LIMIT_INITIAL: int = 20
+    CONCURRENCY_LIMIT_MIN: int = 4
+    CONCURRENCY_LIMIT_MAX: int = 200
+    # How far short-term latency may exceed the long-term baseline
+    CONCURRENCY_LATENCY_TOLERANCE: float = 2.0
+    # Pool checkout wait (seconds) above which the limit backs off
+    CONCURRENCY_POOL_WAIT_THRESHOLD: float = 0.05
+    CONCURRENCY_RETRY_AFTER: int = 1
+
+    # Rate limit settings
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"  # "memory" or "postgres"
+    RATE_LIMIT_DEFAULT: str = "120/minute"
+    # Per-route buckets keyed by "METHOD /path/prefix"; the longest prefix wins
+    RATE_LIMIT_ROUTES: Dict[str, str] = {
+        "GET /api/v1/items": "60/minute",
+        "POST /api/v1/auth/login": "10/minute",
+    }
+    RATE_LIMIT_API_KEY_HEADER: str = "X-API-Key"
+    RATE_LIMIT_TRUST_FORWARDED: bool = False
+    RATE_LIMIT_MAX_KEYS: int = 100_000
+    # Tokens a worker leases from the shared bucket per database round-trip
+    RATE_LIMIT_SHARED_BATCH: int = 10
+
+    # Hot item stock sharding settings
+    STOCK_SHARD_COUNT: int = 8
+    STOCK_RECONCILE_ENABLED: bool = True
+    STOCK_RECONCILE_INTERVAL: float = 5.0
+
+    # Outbox worker settings
+    OUTBOX_ENABLED: bool = True
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_POLL_INTERVAL: float = 1.0
+    OUTBOX_MAX_ATTEMPTS: int = 10
+    OUTBOX_BACKOFF_BASE: float = 2.0
+    OUTBOX_BACKOFF_MAX: float = 300.0
+    # Processed events are kept this long for inspection, then deleted
+    OUTBOX_RETENTION_DAYS: int = 7
+    OUTBOX_PRUNE_ENABLED: bool = True
+    OUTBOX_PRUNE_INTERVAL: float = 3600.0
+
+    # Live order status push settings
+    ORDER_EVENTS_ENABLED: bool = True
+    # Events buffered per subscriber before it is evicted as a slow consumer
+    ORDER_EVENTS_QUEUE_SIZE: int = 16
+    ORDER_EVENTS_MAX_SUBSCRIBERS: int = 10000
+    ORDER_EVENTS_HEARTBEAT: float = 15.0
+
+    # Order partition maintenance settings
+    ORDER_PARTITIONS_ENABLED: bool = True
+    # Future monthly partitions kept ahead of the current month
+    ORDER_PARTITION_MONTHS_AHEAD: int = 3
+    ORDER_PARTITION_CHECK_INTERVAL: float = 3600.0
+
+    # Order archival settings
+    ORDER_ARCHIVE_ENABLED: bool = True
+    # Delivered and cancelled orders older than this are archived
+    ORDER_ARCHIVE_RETENTION_DAYS: int = 365
+    ORDER_ARCHIVE_BATCH_SIZE: int = 500
+    ORDER_ARCHIVE_BATCH_PAUSE: float = 0.1
+    ORDER_ARCHIVE_INTERVAL: float = 3600.0
+
+    # Order list settings
+    # Have Postgres build the GET /orders response documents instead of the ORM
+    ORDER_LIST_DB_JSON: bool = True
+
+    # In-memory catalog replica settings
+    # Serve GET /items from a per-worker copy of the items table
+    CATALOG_REPLICA_ENABLED: bool = False
+    CATALOG_REPLICA_REFRESH_INTERVAL: float = 1.0
+    # Memory one worker's replica may take; past it GET /items reads the database
+    CATALOG_REPLICA_MAX_BYTES: int = 256 * 1024 * 1024
+    # How long an over-budget replica waits before loading again
+    CATALOG_REPLICA_RETRY_INTERVAL: float = 600.0
+    # Replica lag past which GET /items reads the database
+    CATALOG_REPLICA_MAX_LAG: float = 30.0
+
+    # Reporting settings
+    REPORT_CACHE_TTL: float = 300.0
+    REPORT_CACHE_MAX_ENTRIES: int = 256
+    # Longest date range a single report may cover
+    REPORT_MAX_DAYS: int = 1096
+
+    # Frequently-bought-together recommendation settings
+    RECOMMENDATIONS_ENABLED: bool = True
+    RECOMMENDATION_TOP_K: int = 10
+    # Fewest shared orders before a pair is recommended
+    RECOMMENDATION_MIN_SUPPORT: int = 2
+    # Orders with more distinct items than this are not counted
+    RECOMMENDATION_MAX_BASKET: int = 50
+    RECOMMENDATION_REFRESH_INTERVAL: float = 30.0
+
+    # Delta-sync feed settings
+    # Changes younger than this are held back until their transactions commit
+    SYNC_SETTLE_SECONDS: float = 5.0
+    SYNC_PAGE_MAX: int = 1000
+    # Deletes are remembered this long; older cursors must reload everything
+    SYNC_TOMBSTONE_RETENTION_DAYS: int = 30
+    SYNC_TOMBSTONE_PRUNE_ENABLED: bool = True
+    SYNC_TOMBSTONE_PRUNE_INTERVAL: float = 3600.0
+
 
 settings = Settings()
@@ -0,0 +1,346 @@
+import hashlib
+import logging
+import math
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_PERIODS = {
+    **dict.fromkeys(("s", "sec", "secs", "second", "seconds"), 1),
+    **dict.fromkeys(("m", "min", "mins", "minute", "minutes"), 60),
+    **dict.fromkeys(("h", "hr", "hrs", "hour", "hours"), 3600),
+    **dict.fromkeys(("d", "day", "days"), 86400),
+}
+
+
+class RateLimitRule:
+    """A token bucket definition: `capacity` tokens refilled over `period` seconds."""
+
+    __slots__ = ("capacity", "period", "rate")
+
+    def __init__(self, capacity: int, period: float) -> None:
+        self.capacity = capacity
+        self.period = period
+        self.rate = capacity / period
+
+    @classmethod
+    def parse(cls, value: str, setting: str = "rate limit") -> "RateLimitRule":
+        """
+        Parse a rule such as "60/minute", "5/min" or "10/5" (10 per 5 seconds).
+
+        Raises ValueError naming `setting` and the accepted units when the
+        rule can't be read.
+        """
+        count, _, period = value.partition("/")
+        period = period.strip().lower()
+        try:
+            capacity = int(count)
+            seconds = _PERIODS[period] if period in _PERIODS else float(period)
+            if capacity <= 0 or not 0 < seconds < math.inf:
+                raise ValueError(value)
+        except ValueError:
+            raise ValueError(
+                f"Invalid {setting} {value!r}: expected <count>/<period>, where the "
+                f"period is a number of seconds or one of s, sec, second, m, min, "
+                f"minute, h, hr, hour, d or day (plurals allowed)"
+            ) from None
+        return cls(capacity, seconds)
+
+
+class RateLimitResult:
+    """Outcome of a single rate limit check."""
+
+    __slots__ = ("allowed", "limit", "remaining", "reset", "retry_after")
+
+    def __init__(
+        self, allowed: bool, limit: int, remaining: float, reset: float, retry_after: float
+    ) -> None:
+        self.allowed = allowed
+        self.limit = limit
+        self.remaining = remaining
+        self.reset = reset
+        self.retry_after = retry_after
+
+    def headers(self) -> List[Tuple[bytes, bytes]]:
+        """Standard RateLimit-* response headers."""
+        headers = [
+            (b"ratelimit-limit", str(self.limit).encode()),
+            (b"ratelimit-remaining", str(max(0, int(self.remaining))).encode()),
+            (b"ratelimit-reset", str(math.ceil(self.reset)).encode()),
+        ]
+        if not self.allowed:
+            headers.append((b"retry-after", str(math.ceil(self.retry_after)).encode()))
+        return headers
+
+
+class TokenBucket:
+    """In-process token bucket refilled lazily on access."""
+
+    __slots__ = ("tokens", "updated_at")
+
+    def __init__(self, tokens: float, now: float) -> None:
+        self.tokens = tokens
+        self.updated_at = now
+
+    def consume(self, rule: RateLimitRule, now: float, cost: float = 1.0) -> RateLimitResult:
+        """Take `cost` tokens if available."""
+        tokens = min(rule.capacity, self.tokens + (now - self.updated_at) * rule.rate)
+        self.updated_at = now
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+        self.tokens = tokens
+        return RateLimitResult(
+            allowed=allowed,
+            limit=rule.capacity,
+            remaining=tokens,
+            reset=(rule.capacity - tokens) / rule.rate,
+            retry_after=0.0 if allowed else (cost - tokens) / rule.rate,
+        )
+
+
+class InMemoryRateLimitBackend:
+    """Per-worker buckets kept in a bounded LRU."""
+
+    def __init__(self, max_keys: int = 100_000) -> None:
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    def hit(self, key: str, rule: RateLimitRule) -> RateLimitResult:
+        """Consume one token for `key`."""
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(rule.capacity, now)
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket.consume(rule, now)
+
+
+# Tokens in the shared bucket after refilling for the time since its last update
+_REFILLED = """LEAST(
+    CAST(:capacity AS double precision),
+    b.tokens + CAST(EXTRACT(EPOCH FROM clock_timestamp() - b.updated_at) AS double precision)
+        * CAST(:rate AS double precision)
+)"""
+
+# Refill the shared bucket and lease up to :batch whole tokens in one statement
+_LEASE_SQL = text(
+    f"""
+    INSERT INTO rate_limit_buckets AS b (key, tokens, granted, updated_at)
+    VALUES (
+        :key,
+        CAST(:capacity AS double precision) - LEAST(:batch, :capacity),
+        LEAST(:batch, :capacity),
+        clock_timestamp()
+    )
+    ON CONFLICT (key) DO UPDATE SET
+        granted = LEAST(:batch, FLOOR({_REFILLED})),
+        tokens = {_REFILLED} - LEAST(:batch, FLOOR({_REFILLED})),
+        updated_at = clock_timestamp()
+    RETURNING tokens, granted
+    """
+)
+
+
+class _Lease:
+    __slots__ = ("tokens", "shared_remaining", "expires_at")
+
+    def __init__(self, tokens: int, shared_remaining: float, expires_at: float) -> None:
+        self.tokens = tokens
+        self.shared_remaining = shared_remaining
+        self.expires_at = expires_at
+
+
+class PostgresRateLimitBackend:
+    """
+    Quota shared by all workers through the `rate_limit_buckets` table.
+
+    Workers lease tokens from the shared bucket in batches and spend them
+    locally, so only one request in `batch` pays a database round-trip.
+    Unused leased tokens lapse after `lease_ttl` seconds.
+    """
+
+    def __init__(self, batch: int = 10, lease_ttl: float = 1.0, max_keys: int = 100_000) -> None:
+        self.batch = batch
+        self.lease_ttl = lease_ttl
+        self.max_keys = max_keys
+        self._leases: "OrderedDict[str, _Lease]" = OrderedDict()
+
+    async def hit(self, key: str, rule: RateLimitRule) -> RateLimitResult:
+        """Consume one token for `key`, leasing more from Postgres when needed."""
+        now = time.monotonic()
+        lease = self._leases.get(key)
+        if lease is None or lease.expires_at <= now:
+            lease = await self._lease(key, rule, now)
+
+        allowed = lease.tokens > 0
+        if allowed:
+            lease.tokens -= 1
+            if lease.tokens == 0:
+                # Lease spent; the next request goes back to the shared bucket
+                lease.expires_at = now
+        remaining = lease.tokens + lease.shared_remaining
+        return RateLimitResult(
+            allowed=allowed,
+            limit=rule.capacity,
+            remaining=remaining,
+            reset=(rule.capacity - remaining) / rule.rate,
+            retry_after=0.0 if allowed else (1 - lease.shared_remaining) / rule.rate,
+        )
+
+    async def _lease(self, key: str, rule: RateLimitRule, now: float) -> _Lease:
+        from app.db.session import engine
+
+        async with engine.begin() as conn:
+            row = (
+                await conn.execute(
+                    _LEASE_SQL,
+                    {
+                        "key": key,
+                        "capacity": rule.capacity,
+                        "rate": rule.rate,
+                        "batch": self.batch,
+                    },
+                )
+            ).one()
+        granted, shared_remaining = int(row.granted), float(row.tokens)
+        ttl = self.lease_ttl
+        if granted == 0:
+            # Throttled: don't ask again before the shared bucket has a token
+            ttl = min(ttl, (1 - shared_remaining) / rule.rate)
+        lease = _Lease(granted, shared_remaining, now + ttl)
+        self._leases[key] = lease
+        self._leases.move_to_end(key)
+        if len(self._leases) > self.max_keys:
+            self._leases.popitem(last=False)
+        return lease
+
+
+class RateLimiter:
+    """Resolves the bucket for a request and checks it against the backends."""
+
+    def __init__(
+        self,
+        default_rule: RateLimitRule,
+        route_rules: Optional[Dict[str, RateLimitRule]] = None,
+        shared_backend: Optional[PostgresRateLimitBackend] = None,
+        max_keys: int = 100_000,
+    ) -> None:
+        self.default_rule = default_rule
+        self.route_rules: List[Tuple[str, str, RateLimitRule]] = []
+        for route, rule in (route_rules or {}).items():
+            method, _, prefix = route.partition(" ")
+            self.route_rules.append((method.upper(), prefix.rstrip("/"), rule))
+        # Longest prefix first so the most specific rule wins
+        self.route_rules.sort(key=lambda r: len(r[1]), reverse=True)
+        self.local = InMemoryRateLimitBackend(max_keys=max_keys)
+        self.shared = shared_backend
+
+    @classmethod
+    def from_settings(cls) -> "RateLimiter":
+        """Build a limiter from application settings."""
+        shared = None
+        if settings.RATE_LIMIT_BACKEND == "postgres":
+            shared = PostgresRateLimitBackend(
+                batch=settings.RATE_LIMIT_SHARED_BATCH, max_keys=settings.RATE_LIMIT_MAX_KEYS
+            )
+        return cls(
+            default_rule=RateLimitRule.parse(
+                settings.RATE_LIMIT_DEFAULT, "RATE_LIMIT_DEFAULT"),
+            route_rules={
+                route: RateLimitRule.parse(rule, f"RATE_LIMIT_ROUTES[{route!r}]")
+                for route, rule in settings.RATE_LIMIT_ROUTES.items()
+            },
+            shared_backend=shared,
+            max_keys=settings.RATE_LIMIT_MAX_KEYS,
+        )
+
+    def resolve(self, method: str, path: str) -> Tuple[str, RateLimitRule]:
+        """
+        Return the bucket name and rule that apply to a request.
+
+        A route prefix matches whole path segments, so "/api/v1/items" covers
+        "/api/v1/items/1" but not "/api/v1/itemsearch".
+        """
+        for rule_method, prefix, rule in self.route_rules:
+            if rule_method == method and (
+                path == prefix or path.startswith(prefix + "/")
+            ):
+                return f"{rule_method} {prefix}", rule
+        return "default", self.default_rule
+
+    async def check(self, client: str, method: str, path: str) -> RateLimitResult:
+        """Consume a token for `client` on the bucket matching the request."""
+        bucket, rule = self.resolve(method, path)
+        key = f"{client}|{bucket}"
+        # The local bucket rejects abusive clients without touching the database
+        result = self.local.hit(key, rule)
+        if not result.allowed or self.shared is None:
+            return result
+        return await self.shared.hit(key, rule)
+
+
+def client_identifier(scope: Scope) -> str:
+    """Identify the caller by API key when present, otherwise by IP address."""
+    headers = Headers(scope=scope)
+    api_key = headers.get(settings.RATE_LIMIT_API_KEY_HEADER)
+    if api_key:
+        digest = hashlib.blake2b(api_key.encode(), digest_size=12).hexdigest()
+        return f"key:{digest}"
+    if settings.RATE_LIMIT_TRUST_FORWARDED:
+        # The last entry was appended by our proxy; earlier ones are client-supplied
+        forwarded = headers.get("x-forwarded-for")
+        if forwarded:
+            return f"ip:{forwarded.split(',')[-1].strip()}"
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+class RateLimitMiddleware:
+    """ASGI middleware enforcing per-client token buckets with RateLimit-* headers."""
+
+    def __init__(self, app: ASGIApp, limiter: Optional[RateLimiter] = None) -> None:
+        self.app = app
+        self.limiter = limiter or RateLimiter.from_settings()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            result = await self.limiter.check(
+                client_identifier(scope), scope["method"], scope["path"]
+            )
+        except Exception as e:
+            # Fail open: an unreachable shared backend must not take the API down
+            logger.error(f"Rate limit check failed, allowing request: {e}")
+            await self.app(scope, receive, send)
+            return
+        headers = result.headers()
+        if not result.allowed:
+            response = JSONResponse({"detail": "Rate limit exceeded"}, status_code=429)
+            response.raw_headers.extend(headers)
+            await response(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
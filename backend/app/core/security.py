@@ -1,7 +1,9 @@
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Any, Union
+from typing import Any, Optional, Tuple, Union
 
-from jose import jwt
+from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
@@ -14,6 +16,8 @@ if not hasattr(bcrypt, "__about__"):
 # Setup passlib context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+ALGORITHM = "HS256"
+
 
 def create_access_token(
     subject: Union[str, Any], expires_delta: timedelta = None
@@ -28,10 +32,64 @@ def create_access_token(
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
     to_encode = {"exp": expire, "sub": str(subject)}
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm="HS256")
+    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 
+class VerifiedTokenCache:
+    """
+    Bounded LRU of tokens whose signature has already been checked.
+
+    Maps a token to its subject and expiry so repeat requests skip the
+    signature check; entries stop matching once the token expires.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+
+    def get(self, token: str) -> Optional[str]:
+        entry = self._entries.get(token)
+        if entry is None:
+            return None
+        subject, expires_at = entry
+        if expires_at <= time.time():
+            del self._entries[token]
+            return None
+        self._entries.move_to_end(token)
+        return subject
+
+    def set(self, token: str, subject: str, expires_at: float) -> None:
+        self._entries[token] = (subject, expires_at)
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+verified_tokens = VerifiedTokenCache(max_entries=settings.AUTH_TOKEN_CACHE_MAX_ENTRIES)
+
+
+def verify_access_token(token: str) -> str:
+    """
+    Return the subject of a valid access token.
+
+    Raises JWTError when the token is malformed, badly signed, expired or
+    has no subject.
+    """
+    subject = verified_tokens.get(token)
+    if subject is not None:
+        return subject
+    claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
+    subject, expires_at = claims.get("sub"), claims.get("exp")
+    if not subject or expires_at is None:
+        raise JWTError("Token has no subject or expiry")
+    verified_tokens.set(token, subject, float(expires_at))
+    return subject
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verify a password against a hash.
@@ -39,6 +97,13 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_dummy_password() -> None:
+    """
+    Take as long as verify_password, for logins with an unknown email.
+    """
+    pwd_context.dummy_verify()
+
+
 def get_password_hash(password: str) -> str:
     """
     Hash a password.
@@ -4,5 +4,15 @@ from app.db.base_class import Base
 # Import your models here
 from app.models.user import User
 from app.models.item import Item
+from app.models.item_stock_shard import ItemStockShard
+from app.models.item_recommendation import (
+    ItemOrderCount,
+    ItemPairCount,
+    ItemRecommendation,
+    RecommendationState,
+)
 from app.models.order import Order
 from app.models.order_item import OrderItem
+from app.models.order_archive import OrderArchive, OrderItemArchive
+from app.models.outbox_event import OutboxEvent
+from app.models.sync_tombstone import SyncTombstone
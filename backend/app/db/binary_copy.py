@@ -0,0 +1,37 @@
+import io
+import struct
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+_COPY_SIGNATURE = b"PGCOPY\n\xff\r\n\x00"
+
+
+def parse_binary_copy(buffer: bytes, dtype: np.dtype) -> np.ndarray:
+    """
+    Map a binary COPY stream onto a NumPy structured array without a per-row loop.
+
+    Only works when every column is NOT NULL and fixed width, so each row has
+    the same layout: an int16 field count, then an int32 length and the
+    big-endian value per column, as described by `dtype`.
+    """
+    if not buffer.startswith(_COPY_SIGNATURE):
+        raise ValueError("Not a binary COPY stream")
+    (extension_length,) = struct.unpack_from(">i", buffer, 15)
+    offset = 19 + extension_length
+    # Trailer is a single int16 field count of -1
+    count = (len(buffer) - offset - 2) // dtype.itemsize
+    return np.frombuffer(buffer, dtype=dtype, count=count, offset=offset)
+
+
+async def copy_query_to_array(
+    db: AsyncSession, query: str, *args, dtype: np.dtype
+) -> np.ndarray:
+    """Run `query` ($1-style parameters) as a binary COPY into a structured array."""
+    connection = await db.connection()
+    raw = await connection.get_raw_connection()
+    buffer = io.BytesIO()
+    await raw.driver_connection.copy_from_query(
+        query, *args, output=buffer, format="binary"
+    )
+    return parse_binary_copy(buffer.getvalue(), dtype)
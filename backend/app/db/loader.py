@@ -0,0 +1,125 @@
+import asyncio
+from typing import (
+    Any, Dict, Generic, Hashable, List, Optional, Sequence, Type, TypeVar,
+)
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.base_class import Base
+from app.db.statements import by_ids
+
+ModelType = TypeVar("ModelType", bound=Base)
+
+_LOADERS_KEY = "loaders"
+_LOCK_KEY = "loader_lock"
+
+
+class Loader(Generic[ModelType]):
+    """
+    Batches primary key lookups of one model within a session.
+
+    Every `load` call made in the same event-loop tick is resolved by a single
+    `WHERE id = ANY(:ids)` query, and results (including misses) are memoized
+    until the session commits or rolls back. Sessions are request-scoped, so
+    the memo never outlives a request. Use `get_loader` rather than creating
+    loaders directly.
+
+    The query runs inline in the first of those callers to resume, on the
+    session itself. Like any other statement on an AsyncSession, a load must
+    not run concurrently with other queries on the same session, e.g. by
+    gathering it with `db.execute`; loads gathered with each other are fine,
+    as loaders of one session take turns.
+    """
+
+    def __init__(self, db: AsyncSession, model: Type[ModelType]) -> None:
+        self.db = db
+        self.model = model
+        self._futures: Dict[Hashable, asyncio.Future] = {}
+        self._queue: List[Hashable] = []
+
+    async def load(self, key: Hashable) -> Optional[ModelType]:
+        """Get one row by primary key, or None."""
+        future = self._futures.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._futures[key] = future
+            self._queue.append(key)
+            # Let the coroutines scheduled this tick queue their keys too; the
+            # first to resume queries for all of them
+            await asyncio.sleep(0)
+            if self._queue:
+                await self._dispatch()
+        return await future
+
+    async def load_many(self, keys: Sequence[Hashable]) -> List[Optional[ModelType]]:
+        """Get rows by primary key, in the order of `keys`, None for misses."""
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def clear(self) -> None:
+        """Forget memoized rows; lookups already queued still complete."""
+        self._futures = {
+            key: future for key, future in self._futures.items() if not future.done()
+        }
+
+    async def _dispatch(self) -> None:
+        keys, self._queue = self._queue, []
+        futures = [self._futures[key] for key in keys]
+        try:
+            # An AsyncSession runs one statement at a time, so loaders of the
+            # same session take turns
+            async with _session_lock(self.db):
+                result = await self.db.execute(by_ids(self.model), {"ids": keys})
+                rows = {row.id: row for row in result.scalars().all()}
+        except asyncio.CancelledError:
+            # The caller running the query was cancelled; don't leave the
+            # others waiting for a result that will never come
+            self._fail(keys, futures, None)
+            raise
+        except Exception as e:
+            self._fail(keys, futures, e)
+            return
+        for key, future in zip(keys, futures):
+            if not future.done():
+                future.set_result(rows.get(key))
+
+    def _fail(
+        self, keys: List[Hashable], futures: List[asyncio.Future], error: Optional[Exception]
+    ) -> None:
+        """Fail a batch's lookups with `error`, or cancel them if None."""
+        for key, future in zip(keys, futures):
+            # Failures are not memoized
+            if self._futures.get(key) is future:
+                del self._futures[key]
+            if future.done():
+                continue
+            if error is None:
+                future.cancel()
+            else:
+                future.set_exception(error)
+
+
+def _session_lock(db: AsyncSession) -> asyncio.Lock:
+    lock = db.info.get(_LOCK_KEY)
+    if lock is None:
+        lock = db.info[_LOCK_KEY] = asyncio.Lock()
+    return lock
+
+
+def _clear_loaders(session: Any, *args: Any) -> None:
+    for loader in session.info.get(_LOADERS_KEY, {}).values():
+        loader.clear()
+
+
+def get_loader(db: AsyncSession, model: Type[ModelType]) -> Loader[ModelType]:
+    """The session's loader for `model`, created on first use."""
+    loaders = db.info.get(_LOADERS_KEY)
+    if loaders is None:
+        loaders = db.info[_LOADERS_KEY] = {}
+        # Rows may change once the transaction ends; drop the memo
+        event.listen(db.sync_session, "after_commit", _clear_loaders)
+        event.listen(db.sync_session, "after_rollback", _clear_loaders)
+    loader = loaders.get(model)
+    if loader is None:
+        loader = loaders[model] = Loader(db, model)
+    return loader
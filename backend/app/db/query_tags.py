@@ -0,0 +1,66 @@
+import contextvars
+import functools
+import inspect
+import re
+from typing import Any, Optional, Type, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+T = TypeVar("T")
+
+# Service methods the current statement is issued from, outermost first
+_call_site: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "call_site", default=None)
+
+# Matches the comment added by `add_query_comments`
+CALL_SITE_COMMENT = re.compile(r"/\* service:([\w.>]+) \*/")
+
+
+def current_call_site() -> Optional[str]:
+    """The tagged service methods on the current call stack, e.g. "A.b>C.d"."""
+    return _call_site.get()
+
+
+def _tagged(site: str, fn):
+    @functools.wraps(fn)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        parent = _call_site.get()
+        token = _call_site.set(f"{parent}>{site}" if parent else site)
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            _call_site.reset(token)
+    return wrapper
+
+
+def tag_queries(cls: Type[T]) -> Type[T]:
+    """
+    Class decorator labelling the SQL issued by a service's async static methods.
+
+    While `ItemService.get_all` runs, its statements carry a
+    `/* service:ItemService.get_all */` comment, so pg_stat_statements and
+    pg_stat_activity can be traced back to the call site.
+    """
+    for name, attr in list(vars(cls).items()):
+        if isinstance(attr, staticmethod) and inspect.iscoroutinefunction(attr.__func__):
+            setattr(cls, name, staticmethod(
+                _tagged(f"{cls.__name__}.{name}", attr.__func__)))
+    return cls
+
+
+def _comment_statement(conn, cursor, statement, parameters, context, executemany):
+    site = _call_site.get()
+    if site is not None:
+        statement = f"/* service:{site} */ {statement}"
+    return statement, parameters
+
+
+def add_query_comments(engine: Engine) -> None:
+    """
+    Prefix statements run on `engine` with the tagged call site.
+
+    pg_stat_statements ignores comments when grouping, so a statement shared
+    by several call sites is shown with the comment of the first one seen.
+    """
+    event.listen(engine, "before_cursor_execute", _comment_statement, retval=True)
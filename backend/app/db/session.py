@@ -1,7 +1,74 @@
+import time
+from typing import Any, Dict
+from uuid import uuid4
+
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.core.config import settings
+from app.db.query_tags import add_query_comments
+
+
+class PoolWaitStats:
+    """Tracks how long requests wait to check out a pooled connection."""
+
+    def __init__(self, alpha: float = 0.2, stale_after: float = 1.0) -> None:
+        self.alpha = alpha
+        self.stale_after = stale_after
+        self.ewma = 0.0
+        self.last_wait = 0.0
+        self.checkouts = 0
+        self._updated_at = 0.0
+
+    def record(self, seconds: float) -> None:
+        """Record a single checkout wait."""
+        self.last_wait = seconds
+        self.ewma += self.alpha * (seconds - self.ewma)
+        self.checkouts += 1
+        self._updated_at = time.monotonic()
+
+    def recent_wait(self) -> float:
+        """Smoothed wait time, or 0 when no checkout happened recently."""
+        if time.monotonic() - self._updated_at > self.stale_after:
+            return 0.0
+        return self.ewma
+
+
+pool_wait_stats = PoolWaitStats()
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """Async queue pool that reports checkout wait time to pool_wait_stats."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_wait_stats.record(time.perf_counter() - start)
+
+
+def asyncpg_connect_args() -> Dict[str, Any]:
+    """
+    asyncpg connection arguments for the configured statement caching.
+
+    PgBouncer in transaction mode may run consecutive statements of one client
+    on different server connections, so a prepared statement cached on one
+    may not exist (or may clash by name) on the next. PgBouncer mode turns
+    off both statement caches and names every statement uniquely.
+    """
+    if settings.DB_PGBOUNCER_MODE:
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    return {
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+    }
+
 
 # Create async engine
 engine = create_async_engine(
@@ -10,8 +77,17 @@ engine = create_async_engine(
     ),
     echo=False,
     future=True,
+    poolclass=InstrumentedAsyncPool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    query_cache_size=settings.DB_COMPILED_CACHE_SIZE,
+    connect_args=asyncpg_connect_args(),
 )
 
+if settings.DB_QUERY_COMMENTS:
+    add_query_comments(engine.sync_engine)
+
 # Create async session factory
 async_session_factory = sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False
@@ -0,0 +1,81 @@
+from functools import lru_cache
+from typing import Type
+
+from sqlalchemy import any_, bindparam, func, select
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from sqlalchemy.orm import selectinload
+from sqlalchemy.sql import Select
+
+from app.db.base_class import Base
+from app.models.item import Item
+from app.models.item_stock_shard import ItemStockShard
+from app.models.order import Order
+from app.models.order_archive import OrderArchive, OrderItemArchive
+from app.models.order_item import OrderItem
+from app.models.user import User
+
+# Statements for the hot service queries, built once at import. Values are
+# passed as bound parameters, e.g. db.execute(ITEM_BY_NAME, {"name": name}).
+# SQLAlchemy memoizes the cache key of a statement object, so executions skip
+# rebuilding the construct and its options and go straight to the compiled
+# cache. Statements are immutable and safe to share between sessions.
+# Queries shaped by their arguments (filters, sorts, cursors) are built per call.
+
+_UUID_ARRAY = ARRAY(PG_UUID(as_uuid=True))
+
+
+def _page(stmt: Select) -> Select:
+    return stmt.offset(bindparam("skip")).limit(bindparam("limit"))
+
+
+# Items
+ITEMS = select(Item)
+ITEM_BY_NAME = select(Item).where(Item.name == bindparam("name"))
+ITEMS_PAGE = _page(select(Item))
+
+# Users
+USERS = select(User)
+USER_BY_EMAIL = select(User).where(User.email == bindparam("email"))
+USERS_PAGE = _page(select(User))
+
+# Orders, with their line items and the items on them
+ORDERS_WITH_ITEMS = select(Order).options(
+    selectinload(Order.order_items).selectinload(OrderItem.item))
+ORDERS = select(Order)
+ORDER_BY_ID = ORDERS_WITH_ITEMS.where(Order.id == bindparam("order_id"))
+ORDERS_BY_IDS = ORDERS_WITH_ITEMS.where(
+    Order.id == any_(bindparam("ids", type_=_UUID_ARRAY)))
+ORDER_STATUS = select(
+    Order.id, Order.user_id, Order.status, Order.updated_at
+).where(Order.id == bindparam("order_id"))
+
+# Archived orders
+ARCHIVED_ORDERS_BY_IDS = select(OrderArchive).where(
+    OrderArchive.id == any_(bindparam("ids", type_=_UUID_ARRAY)))
+ARCHIVED_ORDER_LINES = (
+    select(OrderItemArchive, Item)
+    .outerjoin(Item, Item.id == OrderItemArchive.item_id)
+    .where(OrderItemArchive.order_id == any_(bindparam("ids", type_=_UUID_ARRAY)))
+)
+
+# Stock shards of hot items
+STOCK_TOTAL = select(func.coalesce(func.sum(ItemStockShard.stock), 0)).where(
+    ItemStockShard.item_id == bindparam("item_id"))
+LOCK_STOCK_SHARD_NOS = (
+    select(ItemStockShard.shard_no)
+    .where(ItemStockShard.item_id == bindparam("item_id"))
+    .with_for_update()
+)
+LOCK_STOCK_SHARDS = (
+    select(ItemStockShard)
+    .where(ItemStockShard.item_id == bindparam("item_id"))
+    .order_by(ItemStockShard.shard_no)
+    .with_for_update()
+    .execution_options(populate_existing=True)
+)
+
+
+@lru_cache(maxsize=None)
+def by_ids(model: Type[Base]) -> Select:
+    """`SELECT ... WHERE id = ANY(:ids)` for `model`, built once per model."""
+    return select(model).where(model.id == any_(bindparam("ids", type_=_UUID_ARRAY)))
@@ -116,6 +116,7 @@ async def seed_orders_with_items(db: AsyncSession, users: List[User], items: Lis
             for item_data in order_items_data:
                 order_item = OrderItem(
                     order_id=order.id,
+                    order_created_at=order.created_at,
                     item_id=item_data["item"].id,
                     quantity=item_data["quantity"],
                     price_at_time=item_data["price_at_time"]
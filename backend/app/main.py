@@ -1,15 +1,98 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from app.api.api_v1.api import api_router
 from fastapi import FastAPI
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.exceptions import HTTPException as StarletteHTTPException
 
+from app.api.negotiation import (
+    NegotiatedResponse,
+    http_exception_handler,
+    request_validation_exception_handler,
+)
+from app.core.concurrency import ConcurrencyLimitMiddleware
 from app.core.config import settings
+from app.core.rate_limit import RateLimitMiddleware
+from app.services.archive import run_order_archiver
+from app.services.catalog import run_catalog_refresher
+from app.services.order_events import order_status_broadcaster
+from app.services.outbox import run_outbox_pruner, run_outbox_worker
+from app.services.partition import run_partition_maintainer
+from app.services.recommendation import run_recommendation_refresher
+from app.services.stock import run_stock_reconciler
+from app.services.sync import run_tombstone_pruner
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop per-worker background tasks."""
+    tasks = []
+    if settings.STOCK_RECONCILE_ENABLED:
+        tasks.append(asyncio.create_task(
+            run_stock_reconciler(settings.STOCK_RECONCILE_INTERVAL)))
+    if settings.OUTBOX_ENABLED:
+        tasks.append(asyncio.create_task(run_outbox_worker(
+            settings.OUTBOX_BATCH_SIZE,
+            settings.OUTBOX_POLL_INTERVAL,
+            settings.OUTBOX_MAX_ATTEMPTS,
+        )))
+    if settings.OUTBOX_PRUNE_ENABLED:
+        tasks.append(asyncio.create_task(run_outbox_pruner(
+            settings.OUTBOX_RETENTION_DAYS,
+            settings.OUTBOX_PRUNE_INTERVAL,
+        )))
+    if settings.ORDER_EVENTS_ENABLED:
+        tasks.append(asyncio.create_task(order_status_broadcaster.run()))
+    if settings.ORDER_PARTITIONS_ENABLED:
+        tasks.append(asyncio.create_task(run_partition_maintainer(
+            settings.ORDER_PARTITION_MONTHS_AHEAD,
+            settings.ORDER_PARTITION_CHECK_INTERVAL,
+        )))
+    if settings.ORDER_ARCHIVE_ENABLED:
+        tasks.append(asyncio.create_task(run_order_archiver(
+            settings.ORDER_ARCHIVE_RETENTION_DAYS,
+            settings.ORDER_ARCHIVE_BATCH_SIZE,
+            settings.ORDER_ARCHIVE_INTERVAL,
+            settings.ORDER_ARCHIVE_BATCH_PAUSE,
+        )))
+    if settings.RECOMMENDATIONS_ENABLED:
+        tasks.append(asyncio.create_task(run_recommendation_refresher(
+            settings.RECOMMENDATION_REFRESH_INTERVAL)))
+    if settings.CATALOG_REPLICA_ENABLED:
+        tasks.append(asyncio.create_task(run_catalog_refresher(
+            settings.CATALOG_REPLICA_REFRESH_INTERVAL)))
+    if settings.SYNC_TOMBSTONE_PRUNE_ENABLED:
+        tasks.append(asyncio.create_task(run_tombstone_pruner(
+            settings.SYNC_TOMBSTONE_RETENTION_DAYS,
+            settings.SYNC_TOMBSTONE_PRUNE_INTERVAL,
+        )))
+    yield
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
     description=settings.DESCRIPTION,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan,
+    # JSON, MessagePack or CBOR, as the Accept header asks
+    default_response_class=NegotiatedResponse,
 )
+app.add_exception_handler(StarletteHTTPException, http_exception_handler)
+app.add_exception_handler(RequestValidationError, request_validation_exception_handler)
+
+# Shed load before requests queue up on the database connection pool
+if settings.CONCURRENCY_LIMIT_ENABLED:
+    app.add_middleware(ConcurrencyLimitMiddleware)
+
+# Reject over-quota clients before they take a concurrency slot
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
 
 # Set all CORS enabled origins
 app.add_middleware(
@@ -18,6 +101,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count", "X-Next-Cursor"],
 )
 
 
@@ -1,4 +1,3 @@
-import uuid
 from datetime import datetime
 from typing import Any
 from zoneinfo import ZoneInfo
@@ -7,6 +6,8 @@ from sqlalchemy import Column, DateTime
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 
+from app.core.ids import uuid7
+
 
 # 日本のタイムゾーン
 JST = ZoneInfo("Asia/Tokyo")
@@ -15,11 +16,11 @@ JST = ZoneInfo("Asia/Tokyo")
 class BaseModel:
     """Base model class that includes common columns for all models."""
 
+    # 時刻順の UUID (v7) で主キーインデックスへの挿入を末尾に集める
     id = Column(
         UUID(as_uuid=True),
         primary_key=True,
-        default=uuid.uuid4,
-        index=True
+        default=uuid7,
     )
 
     # 現在時刻は日本時間で設定
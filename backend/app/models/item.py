@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Float, Text
+from sqlalchemy import Boolean, Column, Index, String, Integer, Float, Text, text
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base
 from app.models.base_model import BaseModel
@@ -9,12 +9,22 @@ class Item(Base, BaseModel):
 
     # テーブル名を明示的に指定
     __tablename__ = "items"
+    __table_args__ = (
+        # 名前・価格・在庫での並べ替え用（同値はidで並べる）
+        # 名前順はコードポイント順なので COLLATE "C" で作成する
+        Index("ix_items_name_c_id", text('name COLLATE "C"'), "id"),
+        Index("ix_items_price_id", "price", "id"),
+        Index("ix_items_stock_id", "stock", "id"),
+    )
 
     name = Column(String(255), index=True, nullable=False)
     description = Column(Text, nullable=True)
     price = Column(Float, nullable=False)
     stock = Column(Integer, nullable=False, default=0)
     image_url = Column(String(255), nullable=True)
+    # 在庫をシャード行に分散して管理する人気商品かどうか
+    is_hot = Column(Boolean, nullable=False, default=False)
 
     # リレーションシップ
     order_items = relationship("OrderItem", back_populates="item")
+    stock_shards = relationship("ItemStockShard", back_populates="item")
@@ -0,0 +1,70 @@
+from sqlalchemy import (
+    BigInteger,
+    CheckConstraint,
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Integer,
+    SmallInteger,
+)
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+
+from app.db.base_class import Base
+
+
+class ItemOrderCount(Base):
+    """Number of counted orders containing an item."""
+
+    # テーブル名を明示的に指定
+    __tablename__ = "item_order_counts"
+
+    item_id = Column(UUID(as_uuid=True), ForeignKey(
+        "items.id", ondelete="CASCADE"), primary_key=True)
+    orders = Column(Integer, nullable=False)
+
+
+class ItemPairCount(Base):
+    """Number of counted orders containing both items; stored in both directions."""
+
+    # テーブル名を明示的に指定
+    __tablename__ = "item_pair_counts"
+
+    item_id = Column(UUID(as_uuid=True), ForeignKey(
+        "items.id", ondelete="CASCADE"), primary_key=True)
+    other_item_id = Column(UUID(as_uuid=True), ForeignKey(
+        "items.id", ondelete="CASCADE"), primary_key=True)
+    orders = Column(Integer, nullable=False)
+
+
+class ItemRecommendation(Base):
+    """One of an item's top-K frequently-bought-together neighbors."""
+
+    # テーブル名を明示的に指定
+    __tablename__ = "item_recommendations"
+
+    item_id = Column(UUID(as_uuid=True), ForeignKey(
+        "items.id", ondelete="CASCADE"), primary_key=True)
+    rank = Column(SmallInteger, primary_key=True)
+    recommended_item_id = Column(UUID(as_uuid=True), ForeignKey(
+        "items.id", ondelete="CASCADE"), nullable=False)
+    co_orders = Column(Integer, nullable=False)
+    lift = Column(Float, nullable=False)
+    # インデックスの差分読み込みに使用する
+    updated_at = Column(DateTime(timezone=True),
+                        server_default=func.now(), nullable=False, index=True)
+
+
+class RecommendationState(Base):
+    """Single row tracking the co-occurrence counts as a whole."""
+
+    # テーブル名を明示的に指定
+    __tablename__ = "recommendation_state"
+    __table_args__ = (
+        CheckConstraint("id = 1", name="ck_recommendation_state_single_row"),
+    )
+
+    id = Column(SmallInteger, primary_key=True, default=1)
+    orders_counted = Column(BigInteger, nullable=False, default=0)
+    built_at = Column(DateTime(timezone=True), nullable=True)
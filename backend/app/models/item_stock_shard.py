@@ -0,0 +1,24 @@
+from sqlalchemy import CheckConstraint, Column, Integer, ForeignKey
+from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.db.base_class import Base
+
+
+class ItemStockShard(Base):
+    """Sub-counter holding part of a hot item's stock."""
+
+    # テーブル名を明示的に指定
+    __tablename__ = "item_stock_shards"
+    __table_args__ = (
+        CheckConstraint("stock >= 0", name="ck_item_stock_shards_stock"),
+    )
+
+    # Primary key using composite key
+    item_id = Column(UUID(as_uuid=True), ForeignKey(
+        "items.id", ondelete="CASCADE"), primary_key=True, nullable=False)
+    shard_no = Column(Integer, primary_key=True, nullable=False)
+    stock = Column(Integer, nullable=False, default=0)
+
+    # リレーションシップ
+    item = relationship("Item", back_populates="stock_shards")
@@ -1,10 +1,12 @@
-from sqlalchemy import Column, String, Float, Text, ForeignKey, Enum
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, String, Float, Text, ForeignKey, Enum
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 import enum
 
 from app.db.base_class import Base
-from app.models.base_model import BaseModel
+from app.models.base_model import JST, BaseModel
 
 
 class OrderStatus(str, enum.Enum):
@@ -15,12 +17,29 @@ class OrderStatus(str, enum.Enum):
     CANCELLED = "cancelled"
 
 
+# 許可されるステータス遷移（遷移元 -> 遷移先）
+ORDER_STATUS_TRANSITIONS = {
+    OrderStatus.PENDING: {OrderStatus.PROCESSING, OrderStatus.CANCELLED},
+    OrderStatus.PROCESSING: {OrderStatus.SHIPPED, OrderStatus.CANCELLED},
+    OrderStatus.SHIPPED: {OrderStatus.DELIVERED},
+    OrderStatus.DELIVERED: set(),
+    OrderStatus.CANCELLED: set(),
+}
+
+
 class Order(Base, BaseModel):
     """Order model for storing order related data."""
 
     # テーブル名を明示的に指定
     __tablename__ = "orders"
 
+    # 月単位のパーティションキーのため主キーに含める
+    created_at = Column(
+        DateTime,
+        primary_key=True,
+        default=lambda: datetime.now(JST).replace(tzinfo=None),
+        nullable=False
+    )
     user_id = Column(UUID(as_uuid=True), ForeignKey(
         "users.id"), nullable=False)
     status = Column(Enum(OrderStatus, values_callable=lambda obj: [e.value for e in obj]),
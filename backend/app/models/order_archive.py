@@ -0,0 +1,40 @@
+from sqlalchemy import Column, DateTime, Enum, Float, Integer, Text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+
+from app.db.base_class import Base
+from app.models.order import OrderStatus
+
+
+class OrderArchive(Base):
+    """Completed order moved out of the live orders table."""
+
+    # テーブル名を明示的に指定
+    __tablename__ = "orders_archive"
+
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+    user_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    status = Column(Enum(OrderStatus, values_callable=lambda obj: [e.value for e in obj]),
+                    nullable=False)
+    shipping_address = Column(Text, nullable=True)
+    total_amount = Column(Float, nullable=False)
+    notes = Column(Text, nullable=True)
+    archived_at = Column(DateTime(timezone=True),
+                         server_default=func.now(), nullable=False)
+
+
+class OrderItemArchive(Base):
+    """Line item of an archived order."""
+
+    # テーブル名を明示的に指定
+    __tablename__ = "order_items_archive"
+
+    order_id = Column(UUID(as_uuid=True), primary_key=True)
+    item_id = Column(UUID(as_uuid=True), primary_key=True)
+    quantity = Column(Integer, nullable=False)
+    price_at_time = Column(Float, nullable=False)
+    order_created_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, Float, ForeignKey, ForeignKeyConstraint, DateTime
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
@@ -11,14 +11,21 @@ class OrderItem(Base):
 
     # テーブル名を明示的に指定
     __tablename__ = "order_items"
+    # 注文テーブルはパーティションキーを含む複合キーで参照する
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["order_id", "order_created_at"], ["orders.id", "orders.created_at"]
+        ),
+    )
 
     # Primary key using composite key
-    order_id = Column(UUID(as_uuid=True), ForeignKey(
-        "orders.id"), primary_key=True, nullable=False)
+    order_id = Column(UUID(as_uuid=True), primary_key=True, nullable=False)
     item_id = Column(UUID(as_uuid=True), ForeignKey(
         "items.id"), primary_key=True, nullable=False)
     quantity = Column(Integer, nullable=False, default=1)
     price_at_time = Column(Float, nullable=False)  # 購入時の価格を保存
+    # 注文の作成日時（注文と同じ月のパーティションに格納するためのキー）
+    order_created_at = Column(DateTime, nullable=False)
 
     # Add created_at and updated_at for consistency with other models
     created_at = Column(DateTime(timezone=True),
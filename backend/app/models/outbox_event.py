@@ -0,0 +1,37 @@
+from sqlalchemy import BigInteger, Column, DateTime, Identity, Index, Integer, String, Text, text
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.sql import func
+
+from app.db.base_class import Base
+
+
+class OutboxEvent(Base):
+    """Side effect recorded in the same transaction as the change that caused it."""
+
+    # テーブル名を明示的に指定
+    __tablename__ = "outbox_events"
+    __table_args__ = (
+        Index(
+            "ix_outbox_events_pending", "available_at", "id",
+            postgresql_where=text("processed_at IS NULL AND failed_at IS NULL"),
+        ),
+        # 保持期間を過ぎた処理済みイベントの削除用
+        Index(
+            "ix_outbox_events_processed_at", "processed_at",
+            postgresql_where=text("processed_at IS NOT NULL"),
+        ),
+    )
+
+    id = Column(BigInteger, Identity(), primary_key=True)
+    event_type = Column(String(100), nullable=False)
+    aggregate_id = Column(UUID(as_uuid=True), nullable=False)
+    payload = Column(JSONB, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True),
+                        server_default=func.now(), nullable=False)
+    # リトライ時はバックオフ後の時刻まで処理を遅らせる
+    available_at = Column(DateTime(timezone=True),
+                          server_default=func.now(), nullable=False)
+    processed_at = Column(DateTime(timezone=True), nullable=True)
+    failed_at = Column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,32 @@
+from sqlalchemy import BigInteger, Column, DateTime, Identity, Index, String, text
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.db.base_class import Base
+
+
+class SyncTombstone(Base):
+    """Record of a deleted row, so delta-sync clients learn about the delete."""
+
+    # テーブル名を明示的に指定
+    __tablename__ = "sync_tombstones"
+    __table_args__ = (
+        Index("ix_sync_tombstones_entity_deleted_at_id", "entity", "deleted_at", "id"),
+        Index(
+            "ix_sync_tombstones_entity_owner_id_deleted_at_id",
+            "entity", "owner_id", "deleted_at", "id",
+            postgresql_where=text("owner_id IS NOT NULL"),
+        ),
+    )
+
+    # 削除トリガーが記録する（アプリケーションからは書き込まない）
+    id = Column(BigInteger, Identity(), primary_key=True)
+    entity = Column(String(50), nullable=False)
+    entity_id = Column(UUID(as_uuid=True), nullable=False)
+    # 注文の場合は所有ユーザー
+    owner_id = Column(UUID(as_uuid=True), nullable=True)
+    # updated_at と比較できるよう日本時間で保存する
+    deleted_at = Column(
+        DateTime,
+        server_default=text("timezone('Asia/Tokyo', clock_timestamp())"),
+        nullable=False,
+    )
@@ -0,0 +1,19 @@
+from typing import Generic, List, TypeVar
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+
+class IdList(BaseModel):
+    """Schema for a batch of IDs to fetch."""
+    ids: List[UUID] = Field(..., min_length=1, max_length=settings.BY_IDS_MAX)
+
+
+class ByIdsResult(BaseModel, Generic[T]):
+    """Schema for a batch fetch: found rows in request order, then the misses."""
+    results: List[T]
+    missing: List[UUID]
@@ -1,5 +1,6 @@
+import enum
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 
 from pydantic import BaseModel, Field
@@ -28,9 +29,34 @@ class ItemUpdate(BaseModel):
     image_url: Optional[str] = None
 
 
+class ItemStockSharding(BaseModel):
+    """Schema for spreading a hot item's stock across shard rows."""
+    shards: int = Field(..., gt=0, le=256)
+
+
+class ItemSort(str, enum.Enum):
+    """Sort keys for item lists; a leading "-" sorts descending."""
+    NAME = "name"
+    NAME_DESC = "-name"
+    PRICE = "price"
+    PRICE_DESC = "-price"
+    STOCK = "stock"
+    STOCK_DESC = "-stock"
+
+
+class ItemFilter(BaseModel):
+    """Schema for filtering item lists; every condition is optional."""
+    name_prefix: Optional[str] = Field(None, min_length=1, max_length=255)
+    min_price: Optional[float] = Field(None, ge=0)
+    max_price: Optional[float] = Field(None, ge=0)
+    min_stock: Optional[int] = Field(None, ge=0)
+    max_stock: Optional[int] = Field(None, ge=0)
+
+
 class ItemInDBBase(ItemBase):
     """Base schema for Item data in the database."""
     id: UUID
+    is_hot: bool = False
     created_at: datetime
     updated_at: datetime
 
@@ -41,3 +67,16 @@ class ItemInDBBase(ItemBase):
 class Item(ItemInDBBase):
     """Schema for Item data."""
     pass
+
+
+class BoughtTogetherItem(BaseModel):
+    """An item frequently ordered together with another."""
+    item_id: UUID
+    co_orders: int
+    lift: float
+
+
+class BoughtTogether(BaseModel):
+    """Schema for an item's frequently-bought-together recommendations."""
+    item_id: UUID
+    items: List[BoughtTogetherItem]
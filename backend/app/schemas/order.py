@@ -1,4 +1,5 @@
 from app.schemas.item import Item as ItemSchema
+import enum
 from datetime import datetime
 from typing import List, Optional
 from uuid import UUID
@@ -34,6 +35,24 @@ class OrderCreate(OrderBase):
     items: List[OrderItemCreate]
 
 
+class OrderSort(str, enum.Enum):
+    """Sort keys for order lists; a leading "-" sorts descending."""
+    NEWEST = "-created_at"
+    OLDEST = "created_at"
+    HIGHEST_TOTAL = "-total_amount"
+    LOWEST_TOTAL = "total_amount"
+
+
+class OrderFilter(BaseModel):
+    """Schema for filtering order lists; every condition is optional."""
+    user_id: Optional[UUID] = None
+    status: Optional[List[OrderStatus]] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+    min_total: Optional[float] = Field(None, ge=0)
+    max_total: Optional[float] = Field(None, ge=0)
+
+
 class OrderUpdate(BaseModel):
     """Schema for updating an order."""
     status: Optional[OrderStatus] = None
@@ -69,3 +88,31 @@ class Order(OrderInDBBase):
 
     class Config:
         from_attributes = True
+
+
+class OrderStatusBulkUpdate(BaseModel):
+    """Schema for moving many orders to a new status at once."""
+    ids: List[UUID] = Field(..., min_length=1, max_length=10000)
+    from_status: Optional[OrderStatus] = None
+    to_status: OrderStatus
+
+
+class OrderStatusOutcome(str, enum.Enum):
+    """What a bulk status change did to a single order."""
+    UPDATED = "updated"
+    NOT_FOUND = "not_found"
+    STATUS_MISMATCH = "status_mismatch"
+    INVALID_TRANSITION = "invalid_transition"
+
+
+class OrderStatusResult(BaseModel):
+    """Outcome of a bulk status change for a single order."""
+    id: UUID
+    outcome: OrderStatusOutcome
+    previous_status: Optional[OrderStatus] = None
+
+
+class OrderStatusBulkResult(BaseModel):
+    """Schema for the result of a bulk status change."""
+    updated: int
+    results: List[OrderStatusResult]
@@ -0,0 +1,8 @@
+import enum
+
+
+class CountMode(str, enum.Enum):
+    """How a list endpoint computes its X-Total-Count header."""
+    EXACT = "exact"
+    ESTIMATED = "estimated"
+    NONE = "none"
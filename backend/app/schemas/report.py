@@ -0,0 +1,55 @@
+import enum
+from datetime import date
+from typing import Dict, List
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class ReportPeriod(str, enum.Enum):
+    """Bucket size of a revenue time series."""
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+
+class RevenuePoint(BaseModel):
+    """Revenue of one period."""
+    period_start: date
+    revenue: float
+    orders: int
+    units: int
+
+
+class RevenueReport(BaseModel):
+    """Revenue time series of non-cancelled orders."""
+    period: ReportPeriod
+    start: date
+    end: date
+    points: List[RevenuePoint]
+
+
+class OrderValueReport(BaseModel):
+    """Distribution of order values, keyed by percentile (e.g. "p95")."""
+    start: date
+    end: date
+    orders: int
+    mean: float
+    percentiles: Dict[str, float]
+
+
+class ItemMovingAverage(BaseModel):
+    """Daily revenue of one item and its trailing moving average."""
+    item_id: UUID
+    total_revenue: float
+    revenue: List[float]
+    moving_average: List[float]
+
+
+class ItemMovingAverageReport(BaseModel):
+    """Per-item daily revenue series, aligned on `days`."""
+    start: date
+    end: date
+    window: int
+    days: List[date]
+    items: List[ItemMovingAverage]
@@ -0,0 +1,18 @@
+from typing import Generic, List, TypeVar
+from uuid import UUID
+
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+
+class Changes(BaseModel, Generic[T]):
+    """Schema for one page of a delta-sync feed."""
+    # Rows created or updated since the cursor, oldest change first
+    changed: List[T]
+    # IDs of rows deleted since the cursor
+    deleted: List[UUID]
+    # Pass back as `since` to get the changes after this page
+    next_cursor: str
+    # More changes are ready now; fetch again without waiting
+    has_more: bool
@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+
+
+class Token(BaseModel):
+    """Schema for an issued access token."""
+    access_token: str
+    token_type: str = "bearer"
@@ -0,0 +1,164 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.db.query_tags import tag_queries
+from app.db.statements import ARCHIVED_ORDER_LINES, ARCHIVED_ORDERS_BY_IDS
+from app.db.session import async_session_factory
+from app.models.base_model import JST
+from app.models.order import Order, OrderStatus
+from app.models.order_item import OrderItem
+
+logger = logging.getLogger(__name__)
+
+# Statuses after which an order no longer changes
+ARCHIVABLE_STATUSES = (OrderStatus.DELIVERED, OrderStatus.CANCELLED)
+
+# Move one batch of old completed orders and their lines in a single statement.
+# Each batch commits on its own, so an interrupted run loses at most the batch
+# in flight and simply resumes from the oldest remaining order. Orders locked
+# by other transactions are skipped rather than waited on.
+_ARCHIVE_BATCH_SQL = text(
+    """
+    WITH batch AS (
+        SELECT id, created_at FROM orders
+        WHERE status IN ('delivered', 'cancelled') AND created_at < :cutoff
+        ORDER BY created_at, id
+        LIMIT :batch_size
+        FOR UPDATE SKIP LOCKED
+    ), moved_items AS (
+        DELETE FROM order_items AS oi
+        USING batch
+        WHERE oi.order_id = batch.id AND oi.order_created_at = batch.created_at
+        RETURNING oi.order_id, oi.item_id, oi.quantity, oi.price_at_time,
+                  oi.order_created_at, oi.created_at, oi.updated_at
+    ), archived_items AS (
+        INSERT INTO order_items_archive (order_id, item_id, quantity, price_at_time,
+                                         order_created_at, created_at, updated_at)
+        SELECT * FROM moved_items
+    ), moved AS (
+        DELETE FROM orders AS o
+        USING batch
+        WHERE o.id = batch.id AND o.created_at = batch.created_at
+        RETURNING o.id, o.created_at, o.updated_at, o.user_id, o.status,
+                  o.shipping_address, o.total_amount, o.notes
+    ), archived AS (
+        INSERT INTO orders_archive (id, created_at, updated_at, user_id, status,
+                                    shipping_address, total_amount, notes)
+        SELECT * FROM moved
+        RETURNING 1
+    )
+    SELECT count(*) FROM archived
+    """
+)
+
+
+@tag_queries
+class ArchiveService:
+    """Service for archiving completed orders out of the live tables."""
+
+    @staticmethod
+    async def archive_batch(db: AsyncSession, cutoff: datetime, batch_size: int) -> int:
+        """Archive up to `batch_size` completed orders created before `cutoff`."""
+        # Archived orders still exist; keep them out of the delta-sync deletes
+        await db.execute(text("SET LOCAL app.skip_tombstones = 'on'"))
+        result = await db.execute(
+            _ARCHIVE_BATCH_SQL, {"cutoff": cutoff, "batch_size": batch_size}
+        )
+        archived = result.scalar_one()
+        await db.commit()
+        return archived
+
+    @staticmethod
+    async def count_archivable(db: AsyncSession, cutoff: datetime) -> int:
+        """Count completed orders created before `cutoff`."""
+        result = await db.execute(
+            select(func.count())
+            .select_from(Order)
+            .where(Order.status.in_(ARCHIVABLE_STATUSES), Order.created_at < cutoff)
+        )
+        return result.scalar_one()
+
+    @staticmethod
+    async def get_order(db: AsyncSession, order_id: UUID) -> Optional[Order]:
+        """
+        Get an archived order as a detached Order with its line items.
+
+        The result has the same shape as a live order so callers can serialise
+        it as usual, but it is not attached to the session.
+        """
+        orders = await ArchiveService.get_orders(db, [order_id])
+        return orders[0] if orders else None
+
+    @staticmethod
+    async def get_orders(db: AsyncSession, order_ids: Sequence[UUID]) -> List[Order]:
+        """Get several archived orders, in no particular order, with two queries."""
+        archived = (await db.execute(
+            ARCHIVED_ORDERS_BY_IDS, {"ids": list(order_ids)}
+        )).scalars().all()
+        if not archived:
+            return []
+        result = await db.execute(
+            ARCHIVED_ORDER_LINES, {"ids": [a.id for a in archived]})
+        lines: Dict[UUID, List[OrderItem]] = {a.id: [] for a in archived}
+        for line, item in result.all():
+            order_item = OrderItem(
+                order_id=line.order_id,
+                order_created_at=line.order_created_at,
+                item_id=line.item_id,
+                quantity=line.quantity,
+                price_at_time=line.price_at_time,
+            )
+            # Bypass the Item.order_items backref, which would lazy-load
+            set_committed_value(order_item, "item", item)
+            lines[line.order_id].append(order_item)
+
+        orders = []
+        for archived_order in archived:
+            order = Order(
+                id=archived_order.id,
+                created_at=archived_order.created_at,
+                updated_at=archived_order.updated_at,
+                user_id=archived_order.user_id,
+                status=archived_order.status,
+                shipping_address=archived_order.shipping_address,
+                total_amount=archived_order.total_amount,
+                notes=archived_order.notes,
+            )
+            set_committed_value(order, "order_items", lines[archived_order.id])
+            orders.append(order)
+        return orders
+
+
+def archive_cutoff(retention_days: int) -> datetime:
+    """Creation time before which completed orders are archived."""
+    return datetime.now(JST).replace(tzinfo=None) - timedelta(days=retention_days)
+
+
+async def run_order_archiver(
+    retention_days: int, batch_size: int, interval: float, batch_pause: float
+) -> None:
+    """Background task archiving completed orders past the retention window."""
+    while True:
+        archived = 0
+        try:
+            cutoff = archive_cutoff(retention_days)
+            while True:
+                async with async_session_factory() as db:
+                    moved = await ArchiveService.archive_batch(db, cutoff, batch_size)
+                archived += moved
+                if moved < batch_size:
+                    break
+                # Leave room for regular traffic between batches
+                await asyncio.sleep(batch_pause)
+        except Exception as e:
+            logger.error(f"Order archival failed: {e}")
+        if archived:
+            logger.info(f"Archived {archived} orders created before {cutoff}")
+        await asyncio.sleep(interval)
@@ -0,0 +1,366 @@
+import asyncio
+import logging
+import sys
+import time
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import async_session_factory
+from app.models.item import Item
+from app.models.sync_tombstone import SyncTombstone
+from app.schemas.item import ItemFilter, ItemSort
+
+logger = logging.getLogger(__name__)
+
+# Columns copied into the replica, in CatalogItem argument order
+_COLUMNS = (
+    Item.id, Item.name, Item.description, Item.price, Item.stock,
+    Item.image_url, Item.is_hot, Item.created_at, Item.updated_at,
+)
+
+# Columns with a sorted secondary index of (value, id) entries
+_INDEXED = ("name", "price", "stock")
+
+# Rows fetched per round-trip during a full load
+_LOAD_BATCH = 5000
+
+# Largest id, for inclusive upper bounds on (value, id) entries
+_MAX_ID = (1 << 128) - 1
+
+# Per item beyond its own objects: a dict slot, plus an index entry and a
+# list slot in each index. Small ints and shared strings are counted anyway,
+# so the total errs on the high side.
+_OVERHEAD_BYTES = 3 * 8 + len(_INDEXED) * (sys.getsizeof((0.0, _MAX_ID)) + 8)
+
+
+class CatalogItem:
+    """One row of the items table, readable by the Item schema."""
+
+    __slots__ = (
+        "id", "name", "description", "price", "stock",
+        "image_url", "is_hot", "created_at", "updated_at",
+    )
+
+    def __init__(
+        self, id, name, description, price, stock, image_url, is_hot, created_at, updated_at
+    ) -> None:
+        self.id = id
+        self.name = name
+        self.description = description
+        self.price = price
+        self.stock = stock
+        self.image_url = image_url
+        self.is_hot = is_hot
+        self.created_at = created_at
+        self.updated_at = updated_at
+
+
+def _footprint(item: CatalogItem) -> int:
+    """Approximate bytes an item takes in the replica, its index entries included."""
+    return (
+        sys.getsizeof(item) + sys.getsizeof(item.id) + sys.getsizeof(item.id.int)
+        + sys.getsizeof(item.name) + sys.getsizeof(item.description)
+        + sys.getsizeof(item.price) + sys.getsizeof(item.stock)
+        + sys.getsizeof(item.image_url) + sys.getsizeof(item.created_at)
+        + sys.getsizeof(item.updated_at) + _OVERHEAD_BYTES
+    )
+
+
+def _after_prefix(prefix: str) -> Optional[str]:
+    """The smallest string sorting after every string starting with `prefix`."""
+    prefix = prefix.rstrip(chr(sys.maxunicode))
+    if not prefix:
+        return None
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class CatalogReplica:
+    """
+    Per-worker copy of the items table, indexed on name, price and stock.
+
+    Filtered and sorted item lists are answered from memory. The first
+    refresh loads every item; later ones reload the items whose updated_at
+    moved, re-reading a short overlap to catch transactions that committed
+    late, and drop items that have a sync tombstone. Changes are fetched
+    before any is applied, so a list never sees a refresh half done.
+
+    Past `max_bytes` the replica empties itself and lists go back to the
+    database until a reload, tried every `retry_interval` seconds, fits.
+    """
+
+    def __init__(
+        self, max_bytes: int, retry_interval: float = 600.0, overlap: float = 60.0
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.retry_interval = retry_interval
+        self.overlap = timedelta(seconds=overlap)
+        self._items: Dict[int, CatalogItem] = {}
+        self._indexes: Dict[str, List[Tuple[object, int]]] = {c: [] for c in _INDEXED}
+        self.bytes = 0
+        self._loaded_through: Optional[datetime] = None
+        self._deleted_through: Optional[datetime] = None
+        # When the last successful refresh started (monotonic clock)
+        self._refreshed_at: Optional[float] = None
+        self._over_budget_at: Optional[float] = None
+        self.refresh_seconds = 0.0
+        self.changes = 0
+
+    def lag(self) -> Optional[float]:
+        """
+        Seconds since the last successful refresh began reading.
+
+        Changes committed since then may be missing from the replica.
+        None while nothing is loaded.
+        """
+        if self._refreshed_at is None:
+            return None
+        return time.monotonic() - self._refreshed_at
+
+    def serves(self, max_lag: float) -> bool:
+        """Whether lists may be answered from the replica rather than the database."""
+        lag = self.lag()
+        return lag is not None and lag <= max_lag
+
+    def search(
+        self, filters: ItemFilter, sort: Optional[ItemSort], skip: int, limit: int
+    ) -> List[CatalogItem]:
+        """
+        A page of the items matching `filters`, sorted like ItemService.search.
+
+        The scan starts from the narrowest index range the filters select.
+        A sorted list walks the sort column's index in order and stops once
+        the page is full, unless the filters select far fewer items than
+        that range holds; then those are sorted instead. Without a sort the
+        order is unspecified.
+        """
+        return list(islice(self._matches(filters, sort), skip, skip + limit))
+
+    def count(self, filters: ItemFilter) -> int:
+        """Number of items matching `filters`."""
+        return sum(1 for _ in self._matches(filters, None))
+
+    def _ranges(self, filters: ItemFilter) -> Dict[str, Tuple[int, int]]:
+        """Positions in each filtered column's index holding the matching entries."""
+        ranges = {}
+        if filters.name_prefix is not None:
+            names = self._indexes["name"]
+            after = _after_prefix(filters.name_prefix)
+            ranges["name"] = (
+                bisect_left(names, (filters.name_prefix,)),
+                len(names) if after is None else bisect_left(names, (after,)),
+            )
+        for column, low, high in (
+            ("price", filters.min_price, filters.max_price),
+            ("stock", filters.min_stock, filters.max_stock),
+        ):
+            if low is None and high is None:
+                continue
+            index = self._indexes[column]
+            ranges[column] = (
+                0 if low is None else bisect_left(index, (low,)),
+                len(index) if high is None else bisect_right(index, (high, _MAX_ID)),
+            )
+        return ranges
+
+    def _scan(
+        self, column: str, bounds: Tuple[int, int], descending: bool = False
+    ) -> Iterator[CatalogItem]:
+        """Items in a range of `column`'s index, in index order."""
+        index, items = self._indexes[column], self._items
+        low, high = bounds
+        positions = range(high - 1, low - 1, -1) if descending else range(low, high)
+        for position in positions:
+            yield items[index[position][1]]
+
+    def _matches(
+        self, filters: ItemFilter, sort: Optional[ItemSort]
+    ) -> Iterator[CatalogItem]:
+        ranges = self._ranges(filters)
+        if not ranges and sort is None:
+            yield from self._items.values()
+            return
+
+        checks = []
+        if filters.name_prefix is not None:
+            checks.append(lambda item: item.name.startswith(filters.name_prefix))
+        if filters.min_price is not None:
+            checks.append(lambda item: item.price >= filters.min_price)
+        if filters.max_price is not None:
+            checks.append(lambda item: item.price <= filters.max_price)
+        if filters.min_stock is not None:
+            checks.append(lambda item: item.stock >= filters.min_stock)
+        if filters.max_stock is not None:
+            checks.append(lambda item: item.stock <= filters.max_stock)
+
+        def matching(candidates: Iterator[CatalogItem]) -> Iterator[CatalogItem]:
+            for item in candidates:
+                if all(check(item) for check in checks):
+                    yield item
+
+        narrowest = min(ranges, key=lambda c: ranges[c][1] - ranges[c][0], default=None)
+        if sort is None:
+            yield from matching(self._scan(narrowest, ranges[narrowest]))
+            return
+
+        column = sort.value.lstrip("-")
+        descending = sort.value.startswith("-")
+        bounds = ranges.get(column, (0, len(self._items)))
+        if narrowest is not None and narrowest != column:
+            low, high = ranges[narrowest]
+            if (high - low) * 8 < bounds[1] - bounds[0]:
+                found = list(matching(self._scan(narrowest, ranges[narrowest])))
+                found.sort(key=lambda item: (getattr(item, column), item.id.int),
+                           reverse=descending)
+                yield from found
+                return
+        yield from matching(self._scan(column, bounds, descending))
+
+    def _index(self, key: int, item: CatalogItem) -> None:
+        for column, index in self._indexes.items():
+            insort(index, (getattr(item, column), key))
+
+    def _unindex(self, key: int, item: CatalogItem) -> None:
+        for column, index in self._indexes.items():
+            del index[bisect_left(index, (getattr(item, column), key))]
+
+    def _upsert(self, item: CatalogItem) -> bool:
+        key = item.id.int
+        old = self._items.get(key)
+        if old is not None:
+            if old.updated_at == item.updated_at:
+                return False
+            self._unindex(key, old)
+            self.bytes -= _footprint(old)
+        self._items[key] = item
+        self._index(key, item)
+        self.bytes += _footprint(item)
+        return True
+
+    def _remove(self, key: int) -> bool:
+        old = self._items.pop(key, None)
+        if old is None:
+            return False
+        self._unindex(key, old)
+        self.bytes -= _footprint(old)
+        return True
+
+    def _drop(self) -> None:
+        """Empty the replica after it outgrew its budget."""
+        logger.error(
+            f"Catalog replica exceeds {self.max_bytes} bytes; "
+            f"serving item lists from the database"
+        )
+        self._items = {}
+        self._indexes = {c: [] for c in _INDEXED}
+        self.bytes = 0
+        self._loaded_through = self._deleted_through = None
+        self._refreshed_at = None
+        self._over_budget_at = time.monotonic()
+
+    async def refresh(self, db: AsyncSession) -> int:
+        """Load changed and deleted items; returns how many changed the replica."""
+        if (self._over_budget_at is not None
+                and time.monotonic() - self._over_budget_at < self.retry_interval):
+            return 0
+        started = time.monotonic()
+        if self._loaded_through is None:
+            changed = await self._load(db)
+        else:
+            changed = await self._apply_changes(db)
+        if self.bytes > self.max_bytes:
+            self._drop()
+            return 0
+        self._over_budget_at = None
+        self._refreshed_at = started
+        self.refresh_seconds = time.monotonic() - started
+        self.changes += changed
+        return changed
+
+    async def _load(self, db: AsyncSession) -> int:
+        """Replace the replica with every item, reading them in batches."""
+        now = (await db.execute(select(func.timezone("Asia/Tokyo", func.now())))).scalar()
+        items: Dict[int, CatalogItem] = {}
+        size = 0
+        result = await db.stream(
+            select(*_COLUMNS).execution_options(yield_per=_LOAD_BATCH))
+        async for rows in result.partitions():
+            for row in rows:
+                item = CatalogItem(*row)
+                items[item.id.int] = item
+                size += _footprint(item)
+            if size > self.max_bytes:
+                # Stop reading; refresh() drops the replica
+                await result.close()
+                self.bytes = size
+                return 0
+
+        self._items = items
+        self._indexes = {
+            column: sorted((getattr(item, column), key) for key, item in items.items())
+            for column in _INDEXED
+        }
+        self.bytes = size
+        self._loaded_through = self._deleted_through = now
+        return len(items)
+
+    async def _apply_changes(self, db: AsyncSession) -> int:
+        rows = (await db.execute(
+            select(*_COLUMNS)
+            .where(Item.updated_at > self._loaded_through - self.overlap)
+        )).all()
+        deletes = (await db.execute(
+            select(SyncTombstone.entity_id, SyncTombstone.deleted_at)
+            .where(
+                SyncTombstone.entity == "item",
+                SyncTombstone.deleted_at > self._deleted_through - self.overlap,
+            )
+        )).all()
+
+        changed = 0
+        for row in rows:
+            changed += self._upsert(CatalogItem(*row))
+        for entity_id, _ in deletes:
+            changed += self._remove(entity_id.int)
+        if rows:
+            self._loaded_through = max(
+                self._loaded_through, max(row.updated_at for row in rows))
+        if deletes:
+            self._deleted_through = max(
+                self._deleted_through, max(row.deleted_at for row in deletes))
+        return changed
+
+    def snapshot(self) -> Dict[str, object]:
+        lag = self.lag()
+        return {
+            "items": len(self._items),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "over_budget": self._over_budget_at is not None,
+            "loaded_through": self._loaded_through,
+            "lag_seconds": None if lag is None else round(lag, 3),
+            "refresh_seconds": round(self.refresh_seconds, 3),
+            "changes": self.changes,
+        }
+
+
+catalog_replica = CatalogReplica(
+    max_bytes=settings.CATALOG_REPLICA_MAX_BYTES,
+    retry_interval=settings.CATALOG_REPLICA_RETRY_INTERVAL,
+)
+
+
+async def run_catalog_refresher(interval: float) -> None:
+    """Background task keeping this worker's catalog replica current."""
+    while True:
+        try:
+            async with async_session_factory() as db:
+                await catalog_replica.refresh(db)
+        except Exception as e:
+            logger.error(f"Catalog replica refresh failed: {e}")
+        await asyncio.sleep(interval)
@@ -1,35 +1,116 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
 from uuid import UUID
 
 from fastapi import HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import delete, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.db.loader import get_loader
+from app.db.query_tags import tag_queries
+from app.db.statements import ITEM_BY_NAME, ITEMS, ITEMS_PAGE
 from app.models.item import Item
-from app.schemas.item import ItemCreate, ItemUpdate
+from app.schemas.item import ItemCreate, ItemFilter, ItemSort, ItemUpdate
+from app.schemas.pagination import CountMode
+from app.services.count import CountService
+from app.services.stock import StockService
+from app.services.sync import SyncService
 
 
+def _filter_items(stmt, filters: ItemFilter):
+    """Apply list filters to a query on Item."""
+    if filters.name_prefix is not None:
+        # Matched under "C" so the code-point name index serves the prefix
+        stmt = stmt.where(
+            Item.name.collate("C").startswith(filters.name_prefix, autoescape=True))
+    if filters.min_price is not None:
+        stmt = stmt.where(Item.price >= filters.min_price)
+    if filters.max_price is not None:
+        stmt = stmt.where(Item.price <= filters.max_price)
+    if filters.min_stock is not None:
+        stmt = stmt.where(Item.stock >= filters.min_stock)
+    if filters.max_stock is not None:
+        stmt = stmt.where(Item.stock <= filters.max_stock)
+    return stmt
+
+
+@tag_queries
 class ItemService:
     """Service for Item related operations."""
 
     @staticmethod
     async def get_by_id(db: AsyncSession, item_id: UUID) -> Optional[Item]:
-        """Get an item by ID."""
-        result = await db.execute(select(Item).where(Item.id == item_id))
-        return result.scalars().first()
+        """
+        Get an item by ID.
+
+        Lookups made concurrently within a request share one query, and
+        repeated lookups are answered from the request's memo until it commits.
+        """
+        return await get_loader(db, Item).load(item_id)
+
+    @staticmethod
+    async def get_by_ids(db: AsyncSession, item_ids: Sequence[UUID]) -> List[Item]:
+        """Get items by ID with a single query, in no particular order."""
+        items = await get_loader(db, Item).load_many(item_ids)
+        return [item for item in items if item is not None]
 
     @staticmethod
     async def get_by_name(db: AsyncSession, name: str) -> Optional[Item]:
         """Get an item by name."""
-        result = await db.execute(select(Item).where(Item.name == name))
+        result = await db.execute(ITEM_BY_NAME, {"name": name})
         return result.scalars().first()
 
     @staticmethod
     async def get_all(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Item]:
         """Get all items."""
-        result = await db.execute(select(Item).offset(skip).limit(limit))
+        result = await db.execute(ITEMS_PAGE, {"skip": skip, "limit": limit})
         return result.scalars().all()
 
+    @staticmethod
+    async def search(
+        db: AsyncSession,
+        filters: ItemFilter,
+        sort: Optional[ItemSort] = None,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> List[Item]:
+        """
+        Get a page of items matching the list filters, sorted by `sort`.
+
+        Names sort by code point, the same order the catalog replica uses,
+        and ties are broken by id. Without a sort the order is unspecified.
+        """
+        if sort is None and filters == ItemFilter():
+            return await ItemService.get_all(db, skip=skip, limit=limit)
+        stmt = _filter_items(ITEMS, filters)
+        if sort is not None:
+            column = getattr(Item, sort.value.lstrip("-"))
+            if column is Item.name:
+                column = column.collate("C")
+            descending = sort.value.startswith("-")
+            stmt = stmt.order_by(
+                column.desc() if descending else column.asc(),
+                Item.id.desc() if descending else Item.id.asc(),
+            )
+        result = await db.execute(stmt.offset(skip).limit(limit))
+        return result.scalars().all()
+
+    @staticmethod
+    async def changes(
+        db: AsyncSession, since: Optional[str], limit: int
+    ) -> Tuple[List[Item], List[UUID], str, bool]:
+        """Items changed and deleted since a delta-sync cursor (see SyncService)."""
+        return await SyncService.changes(
+            db, ITEMS, Item, "item", since=since, limit=limit)
+
+    @staticmethod
+    async def count(
+        db: AsyncSession, mode: CountMode, filters: Optional[ItemFilter] = None
+    ) -> Optional[int]:
+        """Total number of items matching the list filters, if any."""
+        stmt = ITEMS if filters is None else _filter_items(ITEMS, filters)
+        return await CountService.count(db, stmt, mode)
+
     @staticmethod
     async def create(db: AsyncSession, obj_in: ItemCreate) -> Item:
         """Create a new item."""
@@ -61,9 +142,49 @@ class ItemService:
         await db.refresh(db_obj)
         return db_obj
 
+    @staticmethod
+    async def update_by_id(
+        db: AsyncSession,
+        item_id: UUID,
+        obj_in: ItemUpdate,
+        expected_updated_at: Optional[List[datetime]] = None,
+    ) -> Optional[Item]:
+        """
+        Update an item with a single UPDATE ... RETURNING statement.
+
+        Returns None when no row matched, either because the item does not
+        exist or because its updated_at is not in expected_updated_at.
+        """
+        stmt = update(Item).where(Item.id == item_id)
+        if expected_updated_at is not None:
+            stmt = stmt.where(Item.updated_at.in_(expected_updated_at))
+        update_data = obj_in.dict(exclude_unset=True)
+        result = await db.execute(stmt.values(**update_data).returning(Item))
+        item = result.scalars().first()
+        if item is not None and item.is_hot and "stock" in update_data:
+            # Restock of a hot item: spread the new total over its shards
+            await StockService.distribute(db, item.id, item.stock)
+        await db.commit()
+        return item
+
     @staticmethod
     async def delete(db: AsyncSession, db_obj: Item) -> Item:
         """Delete an item."""
         await db.delete(db_obj)
         await db.commit()
         return db_obj
+
+    @staticmethod
+    async def delete_by_id(
+        db: AsyncSession,
+        item_id: UUID,
+        expected_updated_at: Optional[List[datetime]] = None,
+    ) -> Optional[Item]:
+        """Delete an item with a single DELETE ... RETURNING statement."""
+        stmt = delete(Item).where(Item.id == item_id)
+        if expected_updated_at is not None:
+            stmt = stmt.where(Item.updated_at.in_(expected_updated_at))
+        result = await db.execute(stmt.returning(Item))
+        item = result.scalars().first()
+        await db.commit()
+        return item
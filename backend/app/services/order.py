@@ -1,60 +1,353 @@
-from typing import List, Optional
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
 from uuid import UUID
 
 from fastapi import HTTPException, status
-from sqlalchemy import select, insert
+from sqlalchemy import (
+    JSON, BigInteger, DateTime, Float, Text, any_, bindparam, case, cast, delete, func,
+    literal, select, insert, tuple_, update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.sql import Select
 
-from app.models.order import Order
+from app.db.loader import get_loader
+from app.db.query_tags import tag_queries
+from app.db.statements import (
+    ORDER_BY_ID,
+    ORDER_STATUS,
+    ORDERS,
+    ORDERS_BY_IDS,
+    ORDERS_WITH_ITEMS,
+)
+from app.models.order import ORDER_STATUS_TRANSITIONS, Order, OrderStatus
 from app.models.order_item import OrderItem
 from app.models.item import Item
 from app.models.user import User
-from app.schemas.order import OrderCreate, OrderUpdate
+from app.schemas.item import Item as ItemSchema
+from app.schemas.order import (
+    Order as OrderSchema,
+    OrderCreate,
+    OrderFilter,
+    OrderSort,
+    OrderStatusBulkResult,
+    OrderStatusBulkUpdate,
+    OrderStatusOutcome,
+    OrderStatusResult,
+    OrderUpdate,
+)
+from app.schemas.pagination import CountMode
+from app.services.archive import ArchiveService
+from app.services.count import CountService
+from app.services.outbox import OutboxService
+from app.services.stock import StockService
+from app.services.sync import SyncService
 
 
+def _created_between(
+    stmt, created_from: Optional[datetime], created_to: Optional[datetime]
+):
+    """Bound a query on Order.created_at so Postgres can skip partitions."""
+    if created_from is not None:
+        stmt = stmt.where(Order.created_at >= created_from)
+    if created_to is not None:
+        stmt = stmt.where(Order.created_at < created_to)
+    return stmt
+
+
+def _filter_orders(stmt, filters: OrderFilter):
+    """Apply list filters to a query on Order."""
+    if filters.user_id is not None:
+        stmt = stmt.where(Order.user_id == filters.user_id)
+    if filters.status:
+        stmt = stmt.where(Order.status.in_(filters.status))
+    if filters.min_total is not None:
+        stmt = stmt.where(Order.total_amount >= filters.min_total)
+    if filters.max_total is not None:
+        stmt = stmt.where(Order.total_amount <= filters.max_total)
+    return _created_between(stmt, filters.created_from, filters.created_to)
+
+
+def encode_order_cursor(sort: OrderSort, order: Order) -> str:
+    """
+    Opaque cursor pointing just past `order` in a list sorted by `sort`.
+
+    `order` may also be a row with the sort column and id.
+    """
+    value = getattr(order, sort.value.lstrip("-"))
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps([sort.value, value, str(order.id)])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _decode_order_cursor(sort: OrderSort, cursor: str) -> Tuple[Any, UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, value, order_id = json.loads(base64.urlsafe_b64decode(padded))
+        if cursor_sort != sort.value:
+            raise ValueError("cursor belongs to another sort")
+        if sort in (OrderSort.NEWEST, OrderSort.OLDEST):
+            value = datetime.fromisoformat(value)
+        else:
+            value = float(value)
+        return value, UUID(order_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+
+
+def _schema_columns(model, schema) -> List[Any]:
+    """The model's columns for the fields of a response schema, in field order."""
+    return [getattr(model, name) for name in schema.model_fields if name != "items"]
+
+
+def _json_value(column) -> Any:
+    """
+    `column` formatted for row_to_json the way the response would write it.
+
+    Postgres writes 10.0 as 10 and trims trailing zeros from fractional
+    seconds; the JSON encoder writes 10.0 and pydantic six-digit
+    microseconds, omitted when zero. Floats are passed through as json so
+    they stay numbers. Non-integral floats from 1e15 to 1e16, which Postgres
+    writes in exponent form, are not expected in these columns.
+    """
+    if isinstance(column.type, DateTime):
+        # Naive timestamps, as all order and item timestamps are
+        return func.replace(
+            func.to_char(column, 'YYYY-MM-DD"T"HH24:MI:SS.US'), ".000000", "")
+    if isinstance(column.type, Float):
+        return cast(case(
+            (
+                (column == func.trunc(column)) & (func.abs(column) < 1e16),
+                cast(cast(column, BigInteger), Text).op("||")(".0"),
+            ),
+            else_=cast(column, Text),
+        ), JSON)
+    return column
+
+
+def _row_json(rows) -> Any:
+    """A subquery row as compact JSON text, keys in column order."""
+    return cast(func.row_to_json(rows.table_valued()), Text)
+
+
+def _document_columns(columns) -> List[Any]:
+    """`columns` formatted with _json_value, keeping their names."""
+    return [_json_value(column).label(column.key) for column in columns]
+
+
+# The items of an order as the Order response schema lists them, built by
+# Postgres. The lines are read from the order's own partition, and each item
+# is looked up by primary key.
+_ORDER_ITEMS_JSON = cast(
+    select(func.coalesce(
+        literal("[").op("||")(func.string_agg(
+            select(_row_json(
+                select(*_document_columns(_schema_columns(Item, ItemSchema)))
+                .where(Item.id == OrderItem.item_id)
+                .correlate(OrderItem)
+                .subquery("item")
+            )).scalar_subquery(),
+            ",",
+        )).op("||")("]"),
+        "[]",
+    ))
+    .where(OrderItem.order_id == Order.id,
+           OrderItem.order_created_at == Order.created_at)
+    .scalar_subquery(),
+    JSON,
+)
+
+
+def _after_cursor(stmt, sort: OrderSort, cursor: str):
+    """Keyset condition selecting the rows after `cursor`."""
+    value, order_id = _decode_order_cursor(sort, cursor)
+    column = getattr(Order, sort.value.lstrip("-"))
+    descending = sort.value.startswith("-")
+    position = tuple_(column, Order.id)
+    stmt = stmt.where(position < (value, order_id) if descending
+                      else position > (value, order_id))
+    # Row comparisons don't prune partitions; a plain bound on the key does
+    if column is Order.created_at:
+        stmt = stmt.where(column <= value if descending else column >= value)
+    return stmt
+
+
+def _sorted_orders(
+    stmt, filters: OrderFilter, sort: OrderSort, cursor: Optional[str]
+):
+    """Filter a query on Order, seek past `cursor` and sort it by `sort`."""
+    column = getattr(Order, sort.value.lstrip("-"))
+    descending = sort.value.startswith("-")
+    stmt = _filter_orders(stmt, filters)
+    if cursor is not None:
+        stmt = _after_cursor(stmt, sort, cursor)
+    return stmt.order_by(
+        column.desc() if descending else column.asc(),
+        Order.id.desc() if descending else Order.id.asc(),
+    )
+
+
+@tag_queries
 class OrderService:
     """Service for Order related operations."""
 
     @staticmethod
-    async def get_by_id(db: AsyncSession, order_id: UUID) -> Optional[Order]:
-        """Get an order by ID."""
-        result = await db.execute(
-            select(Order)
-            .options(selectinload(Order.order_items).selectinload(OrderItem.item))
-            .where(Order.id == order_id)
-        )
-        return result.scalars().first()
+    async def get_by_id(
+        db: AsyncSession,
+        order_id: UUID,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ) -> Optional[Order]:
+        """
+        Get an order by ID.
+
+        Orders are partitioned by created_at month; passing the range the
+        order was created in limits the lookup to those partitions. Orders
+        that have been archived are read from the archive tables instead.
+        """
+        stmt = _created_between(ORDER_BY_ID, created_from, created_to)
+        result = await db.execute(stmt, {"order_id": order_id})
+        order = result.scalars().first()
+        if order is None:
+            order = await ArchiveService.get_order(db, order_id)
+        return order
 
     @staticmethod
-    async def get_by_user_id(db: AsyncSession, user_id: UUID, skip: int = 0, limit: int = 100) -> List[Order]:
-        """Get orders by user ID."""
-        result = await db.execute(
-            select(Order)
-            .options(selectinload(Order.order_items).selectinload(OrderItem.item))
-            .where(Order.user_id == user_id)
-            .offset(skip)
-            .limit(limit)
+    async def get_by_ids(db: AsyncSession, order_ids: Sequence[UUID]) -> List[Order]:
+        """
+        Get orders by ID with their items, in no particular order.
+
+        IDs not found in the live tables are looked up in the archive.
+        """
+        result = await db.execute(ORDERS_BY_IDS, {"ids": list(order_ids)})
+        orders = list(result.scalars().all())
+        found = {order.id for order in orders}
+        missing = [order_id for order_id in order_ids if order_id not in found]
+        if missing:
+            orders.extend(await ArchiveService.get_orders(db, missing))
+        return orders
+
+    @staticmethod
+    async def get_status(db: AsyncSession, order_id: UUID) -> Optional[dict]:
+        """Get just an order's status fields, without loading its items."""
+        result = await db.execute(ORDER_STATUS, {"order_id": order_id})
+        row = result.first()
+        return dict(row._mapping) if row else None
+
+    @staticmethod
+    def search_statement(
+        filters: OrderFilter, sort: OrderSort, cursor: Optional[str] = None
+    ) -> Select:
+        """The sorted, filtered order query behind `search`, without paging."""
+        return _sorted_orders(ORDERS_WITH_ITEMS, filters, sort, cursor)
+
+    @staticmethod
+    async def search(
+        db: AsyncSession,
+        filters: OrderFilter,
+        sort: OrderSort = OrderSort.NEWEST,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        skip: int = 0,
+    ) -> Tuple[List[Order], Optional[str]]:
+        """
+        Get a page of orders matching `filters`, sorted by `sort`.
+
+        Pass the returned cursor back to get the next page; it is None on the
+        last page. Unlike `skip`, a cursor seeks straight to the next row
+        through the sort's index however deep the page is.
+        """
+        stmt = OrderService.search_statement(filters, sort, cursor)
+        result = await db.execute(stmt.offset(skip).limit(limit))
+        orders = result.scalars().all()
+        next_cursor = (
+            encode_order_cursor(sort, orders[-1])
+            if orders and len(orders) == limit else None
         )
-        return result.scalars().all()
+        return orders, next_cursor
 
     @staticmethod
-    async def get_all(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Order]:
-        """Get all orders."""
-        result = await db.execute(
-            select(Order)
-            .options(selectinload(Order.order_items).selectinload(OrderItem.item))
-            .offset(skip)
-            .limit(limit)
+    async def search_json(
+        db: AsyncSession,
+        filters: OrderFilter,
+        sort: OrderSort = OrderSort.NEWEST,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        skip: int = 0,
+    ) -> Tuple[bytes, Optional[str]]:
+        """
+        Same page as `search`, as a JSON array of Order response documents.
+
+        Postgres builds each order with its items in one query, so no ORM
+        objects or pydantic models are created; the documents are only
+        joined into an array here.
+        """
+        page = _sorted_orders(
+            select(*_schema_columns(Order, OrderSchema),
+                   _ORDER_ITEMS_JSON.label("items")),
+            filters, sort, cursor,
+        ).offset(skip).limit(limit).subquery("page")
+        # row_to_json keeps the schema's field order and adds no whitespace
+        document = select(_row_json(
+            select(*_document_columns(c for c in page.c if c.key != "items"),
+                   page.c["items"])
+            .correlate(page)
+            .subquery("document")
+        )).scalar_subquery()
+        column = page.c[sort.value.lstrip("-")]
+        descending = sort.value.startswith("-")
+        rows = (await db.execute(
+            select(document.label("document"), page.c.id, column)
+            .order_by(column.desc() if descending else column.asc(),
+                      page.c.id.desc() if descending else page.c.id.asc())
+        )).all()
+        body = "[" + ",".join(row.document for row in rows) + "]"
+        next_cursor = (
+            encode_order_cursor(sort, rows[-1])
+            if rows and len(rows) == limit else None
         )
-        return result.scalars().all()
+        return body.encode(), next_cursor
+
+    @staticmethod
+    async def changes(
+        db: AsyncSession, user_id: UUID, since: Optional[str], limit: int
+    ) -> Tuple[List[Order], List[UUID], str, bool]:
+        """
+        A user's orders changed and deleted since a delta-sync cursor.
+
+        Archiving is not a delete: archived orders stay on the client.
+        """
+        stmt = ORDERS_WITH_ITEMS.where(Order.user_id == user_id)
+        return await SyncService.changes(
+            db, stmt, Order, "order", since=since, limit=limit, owner_id=user_id)
+
+    @staticmethod
+    async def count(
+        db: AsyncSession, mode: CountMode, filters: OrderFilter
+    ) -> Optional[int]:
+        """Total number of orders matching the list filters."""
+        return await CountService.count(
+            db, _filter_orders(ORDERS, filters), mode)
 
     @staticmethod
     async def create(db: AsyncSession, obj_in: OrderCreate) -> Order:
-        """Create a new order."""
+        """
+        Create a new order.
+
+        The order, its line items, the stock changes and the order.created
+        outbox event are committed in a single transaction, so an order is
+        never stored without its event.
+        """
         # Verify user exists
-        user_query = await db.execute(select(User).where(User.id == obj_in.user_id))
-        user = user_query.scalars().first()
+        user = await get_loader(db, User).load(obj_in.user_id)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -70,36 +363,44 @@ class OrderService:
             notes=obj_in.notes,
         )
         db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
+        # Flush for the order's id and created_at without committing
+        await db.flush()
 
-        # Add order items
-        for item_data in obj_in.items:
+        # Add order items, fetching all of them in one query
+        items = await get_loader(db, Item).load_many(
+            [item_data.item_id for item_data in obj_in.items])
+        # Reserve stock in item_id order so concurrent orders sharing items
+        # lock their stock rows in the same order and can't deadlock
+        lines = sorted(zip(obj_in.items, items), key=lambda line: line[0].item_id)
+        for item_data, item in lines:
             # Verify item exists
-            item_query = await db.execute(select(Item).where(Item.id == item_data.item_id))
-            item = item_query.scalars().first()
             if not item:
-                # Rollback order creation if item doesn't exist
-                await db.delete(db_obj)
-                await db.commit()
+                # Discard the order if an item doesn't exist
+                await db.rollback()
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail=f"Item with ID {item_data.item_id} not found",
                 )
 
-            # Check stock availability
-            if item.stock < item_data.quantity:
-                # Rollback order creation if stock is insufficient
-                await db.delete(db_obj)
-                await db.commit()
+            # Check stock availability; hot items reserve from a stock shard
+            if item.is_hot:
+                in_stock = await StockService.decrement(
+                    db, item.id, item_data.quantity)
+            else:
+                in_stock = item.stock >= item_data.quantity
+            if not in_stock:
+                detail = f"Insufficient stock for item {item.name}"
+                # Discard the order and any shard reservations so far
+                await db.rollback()
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Insufficient stock for item {item.name}",
+                    detail=detail,
                 )
 
             # Add to order_items
             order_item = OrderItem(
                 order_id=db_obj.id,
+                order_created_at=db_obj.created_at,
                 item_id=item_data.item_id,
                 quantity=item_data.quantity,
                 price_at_time=item_data.price_at_time or item.price,
@@ -107,8 +408,30 @@ class OrderService:
             db.add(order_item)
 
             # Update item stock
-            item.stock -= item_data.quantity
-            db.add(item)
+            if not item.is_hot:
+                item.stock -= item_data.quantity
+                db.add(item)
+
+        # Side effects run from the outbox, committed together with the order
+        OutboxService.add(
+            db,
+            event_type="order.created",
+            aggregate_id=db_obj.id,
+            payload={
+                "order_id": str(db_obj.id),
+                "user_id": str(db_obj.user_id),
+                "status": db_obj.status.value,
+                "total_amount": db_obj.total_amount,
+                "items": [
+                    {
+                        "item_id": str(item_data.item_id),
+                        "quantity": item_data.quantity,
+                        "price_at_time": item_data.price_at_time,
+                    }
+                    for item_data in obj_in.items
+                ],
+            },
+        )
 
         await db.commit()
         return await OrderService.get_by_id(db, db_obj.id)
@@ -129,9 +452,153 @@ class OrderService:
         await db.refresh(db_obj)
         return db_obj
 
+    @staticmethod
+    async def update_by_id(
+        db: AsyncSession,
+        order_id: UUID,
+        obj_in: OrderUpdate,
+        expected_updated_at: Optional[List[datetime]] = None,
+    ) -> Optional[Order]:
+        """
+        Update an order with a single UPDATE ... RETURNING statement.
+
+        The line items for the response are loaded from the returned row, so
+        the order itself is never read separately. Returns None when no row
+        matched, either because the order does not exist or because its
+        updated_at is not in expected_updated_at.
+        """
+        stmt = update(Order).where(Order.id == order_id)
+        if expected_updated_at is not None:
+            stmt = stmt.where(Order.updated_at.in_(expected_updated_at))
+        update_data = obj_in.dict(exclude_unset=True)
+        result = await db.execute(
+            stmt.values(**update_data)
+            .returning(Order)
+            .options(selectinload(Order.order_items).selectinload(OrderItem.item))
+        )
+        order = result.scalars().first()
+        await db.commit()
+        return order
+
     @staticmethod
     async def delete(db: AsyncSession, db_obj: Order) -> Order:
         """Delete an order."""
         await db.delete(db_obj)
         await db.commit()
         return db_obj
+
+    @staticmethod
+    async def delete_by_id(
+        db: AsyncSession,
+        order_id: UUID,
+        expected_updated_at: Optional[List[datetime]] = None,
+    ) -> Optional[Order]:
+        """
+        Delete an order and its line items with DELETE ... RETURNING.
+
+        Both deletes run in one transaction; the returned line items are
+        attached to the deleted order so the response still lists its items.
+        """
+        stmt = delete(Order).where(Order.id == order_id)
+        if expected_updated_at is not None:
+            stmt = stmt.where(Order.updated_at.in_(expected_updated_at))
+            # Only remove the lines if the order itself still matches
+            lines_filter = OrderItem.order_id.in_(
+                select(Order.id).where(
+                    Order.id == order_id, Order.updated_at.in_(expected_updated_at)
+                )
+            )
+        else:
+            lines_filter = OrderItem.order_id == order_id
+
+        lines_result = await db.execute(
+            delete(OrderItem)
+            .where(lines_filter)
+            .returning(OrderItem)
+            .options(selectinload(OrderItem.item))
+        )
+        order_items = lines_result.scalars().all()
+
+        result = await db.execute(stmt.returning(Order))
+        order = result.scalars().first()
+        if not order:
+            await db.rollback()
+            return None
+
+        set_committed_value(order, "order_items", list(order_items))
+        await db.commit()
+        return order
+
+    @staticmethod
+    async def bulk_update_status(
+        db: AsyncSession, obj_in: OrderStatusBulkUpdate
+    ) -> OrderStatusBulkResult:
+        """
+        Move many orders to a new status with one set-based UPDATE.
+
+        Only orders whose current status may transition to to_status (and
+        matches from_status, when given) are updated. The same statement
+        reports each requested ID's previous status so every ID gets an
+        outcome, in request order. Repeated IDs get a single outcome.
+        """
+        allowed_from = [
+            current
+            for current, targets in ORDER_STATUS_TRANSITIONS.items()
+            if obj_in.to_status in targets
+            and (obj_in.from_status is None or current == obj_in.from_status)
+        ]
+
+        orders = Order.__table__
+        ids = bindparam(
+            "ids", list(dict.fromkeys(obj_in.ids)), type_=ARRAY(PG_UUID(as_uuid=True)))
+        updated = (
+            update(orders)
+            .where(orders.c.id == any_(ids), orders.c.status.in_(allowed_from))
+            .values(
+                status=obj_in.to_status,
+                updated_at=func.timezone("Asia/Tokyo", func.now()),
+            )
+            .returning(orders.c.id)
+            .cte("updated")
+        )
+        requested = (
+            func.unnest(ids)
+            .table_valued("id", with_ordinality="ordinality")
+            .render_derived(name="requested")
+        )
+        # The outer SELECT sees the pre-update snapshot, i.e. the previous status
+        stmt = (
+            select(
+                requested.c.id,
+                orders.c.status,
+                updated.c.id.is_not(None).label("was_updated"),
+                select(func.count()).select_from(updated).scalar_subquery()
+                .label("updated_count"),
+            )
+            .select_from(requested)
+            .outerjoin(orders, orders.c.id == requested.c.id)
+            .outerjoin(updated, updated.c.id == requested.c.id)
+            .order_by(requested.c.ordinality)
+        )
+        rows = (await db.execute(stmt)).all()
+        await db.commit()
+
+        results = []
+        for order_id, previous, was_updated, _ in rows:
+            previous = OrderStatus(previous) if previous is not None else None
+            if previous is None:
+                outcome = OrderStatusOutcome.NOT_FOUND
+            elif was_updated:
+                outcome = OrderStatusOutcome.UPDATED
+            elif obj_in.from_status is not None and previous != obj_in.from_status:
+                outcome = OrderStatusOutcome.STATUS_MISMATCH
+            else:
+                outcome = OrderStatusOutcome.INVALID_TRANSITION
+            results.append(
+                OrderStatusResult(id=order_id, outcome=outcome, previous_status=previous)
+            )
+
+        return OrderStatusBulkResult(
+            updated=rows[0].updated_count if rows else 0,
+            results=results,
+        )
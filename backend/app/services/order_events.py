@@ -0,0 +1,138 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from typing import Any, Dict, Optional, Set
+from uuid import UUID
+
+import asyncpg
+
+from app.core.config import settings
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+# Channel the orders_status_notify trigger publishes to
+ORDER_STATUS_CHANNEL = "order_status"
+
+
+class OrderStatusSubscription:
+    """A subscriber's bounded queue of status events for one order."""
+
+    def __init__(self, order_id: UUID, maxsize: int) -> None:
+        self.order_id = order_id
+        self.queue: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue(maxsize)
+        self.evicted = False
+
+    def push(self, event: Dict[str, Any]) -> bool:
+        """Queue an event; returns False if the subscriber has fallen behind."""
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    def evict(self) -> None:
+        """Drop buffered events and wake the consumer with the end marker."""
+        self.evicted = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+    async def get(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """Next event, or None once evicted. Raises TimeoutError when idle."""
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+
+class OrderStatusBroadcaster:
+    """
+    Fans order status NOTIFYs out to in-process subscribers.
+
+    Each worker holds one dedicated LISTEN connection, outside the SQLAlchemy
+    pool, no matter how many clients are subscribed. Subscribers whose queue
+    is full are evicted instead of buffering without bound.
+    """
+
+    def __init__(self, queue_size: int, max_subscribers: int) -> None:
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self._subscribers: Dict[UUID, Set[OrderStatusSubscription]] = defaultdict(set)
+        self._count = 0
+        self.delivered = 0
+        self.evicted = 0
+        self.connected = False
+
+    def subscribe(self, order_id: UUID) -> Optional[OrderStatusSubscription]:
+        """Register a subscriber, or return None when at capacity."""
+        if self._count >= self.max_subscribers:
+            return None
+        subscription = OrderStatusSubscription(order_id, self.queue_size)
+        self._subscribers[order_id].add(subscription)
+        self._count += 1
+        return subscription
+
+    def unsubscribe(self, subscription: OrderStatusSubscription) -> None:
+        subscribers = self._subscribers.get(subscription.order_id)
+        if subscribers and subscription in subscribers:
+            subscribers.discard(subscription)
+            self._count -= 1
+            if not subscribers:
+                del self._subscribers[subscription.order_id]
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        """Deliver an event to every subscriber of its order."""
+        order_id = UUID(event["id"])
+        for subscription in list(self._subscribers.get(order_id, ())):
+            if subscription.push(event):
+                self.delivered += 1
+            else:
+                subscription.evict()
+                self.unsubscribe(subscription)
+                self.evicted += 1
+
+    def _on_notify(self, connection: Any, pid: int, channel: str, payload: str) -> None:
+        try:
+            self.publish(json.loads(payload))
+        except (ValueError, KeyError) as e:
+            logger.error(f"Ignoring malformed {channel} notification: {e}")
+
+    async def run(self) -> None:
+        """Hold the LISTEN connection open, reconnecting with backoff."""
+        # Same connection parameters as the pool, without going through it
+        cargs, cparams = engine.dialect.create_connect_args(engine.url)
+        delay = 1.0
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(*cargs, **cparams)
+                terminated = asyncio.Event()
+                connection.add_termination_listener(lambda _: terminated.set())
+                await connection.add_listener(ORDER_STATUS_CHANNEL, self._on_notify)
+                self.connected = True
+                delay = 1.0
+                await terminated.wait()
+                logger.warning("Order status LISTEN connection lost")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Order status LISTEN connection failed: {e}")
+            finally:
+                self.connected = False
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "connected": self.connected,
+            "subscribers": self._count,
+            "delivered": self.delivered,
+            "evicted": self.evicted,
+        }
+
+
+order_status_broadcaster = OrderStatusBroadcaster(
+    queue_size=settings.ORDER_EVENTS_QUEUE_SIZE,
+    max_subscribers=settings.ORDER_EVENTS_MAX_SUBSCRIBERS,
+)
@@ -0,0 +1,203 @@
+import asyncio
+import logging
+import random
+import time
+from collections import defaultdict, deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Tuple
+from uuid import UUID
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.query_tags import tag_queries
+from app.db.session import async_session_factory
+from app.models.outbox_event import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+OutboxHandler = Callable[[OutboxEvent], Awaitable[None]]
+
+_handlers: Dict[str, List[OutboxHandler]] = defaultdict(list)
+
+
+def register_handler(event_type: str) -> Callable[[OutboxHandler], OutboxHandler]:
+    """
+    Decorator registering an async handler for an outbox event type.
+
+    Delivery is at-least-once: a failing handler causes every handler of the
+    event to run again on retry, so handlers must be idempotent.
+    """
+    def decorator(handler: OutboxHandler) -> OutboxHandler:
+        _handlers[event_type].append(handler)
+        return handler
+    return decorator
+
+
+class OutboxMetrics:
+    """Throughput and delivery lag of the outbox worker in this process."""
+
+    def __init__(self, window: float = 60.0) -> None:
+        self.window = window
+        self.processed = 0
+        self.retried = 0
+        self.failed = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self._recent: Deque[Tuple[float, int]] = deque()
+
+    def record_batch(self, processed: int, lags: List[float]) -> None:
+        now = time.monotonic()
+        self.processed += processed
+        if processed:
+            self._recent.append((now, processed))
+        while self._recent and now - self._recent[0][0] > self.window:
+            self._recent.popleft()
+        if lags:
+            self.last_lag = lags[-1]
+            self.max_lag = max(self.max_lag, max(lags))
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "processed": self.processed,
+            "retried": self.retried,
+            "failed": self.failed,
+            "throughput_per_second": round(
+                sum(count for _, count in self._recent) / self.window, 3
+            ),
+            "last_delivery_lag_seconds": round(self.last_lag, 3),
+            "max_delivery_lag_seconds": round(self.max_lag, 3),
+        }
+
+
+outbox_metrics = OutboxMetrics()
+
+
+@tag_queries
+class OutboxService:
+    """Service for the transactional outbox."""
+
+    @staticmethod
+    def add(
+        db: AsyncSession, event_type: str, aggregate_id: UUID, payload: Dict[str, Any]
+    ) -> OutboxEvent:
+        """Stage an event; it is written when the caller's transaction commits."""
+        event = OutboxEvent(
+            event_type=event_type, aggregate_id=aggregate_id, payload=payload
+        )
+        db.add(event)
+        return event
+
+    @staticmethod
+    async def process_batch(
+        db: AsyncSession, batch_size: int, max_attempts: int
+    ) -> int:
+        """
+        Claim and handle up to `batch_size` due events.
+
+        Rows are claimed with FOR UPDATE SKIP LOCKED so several workers can
+        drain the table concurrently. Returns the number of events claimed.
+        """
+        result = await db.execute(
+            select(OutboxEvent)
+            .where(
+                OutboxEvent.processed_at.is_(None),
+                OutboxEvent.failed_at.is_(None),
+                OutboxEvent.available_at <= func.now(),
+            )
+            .order_by(OutboxEvent.available_at, OutboxEvent.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        events = result.scalars().all()
+
+        lags = []
+        for event in events:
+            try:
+                for handler in _handlers.get(event.event_type, []):
+                    await handler(event)
+            except Exception as e:
+                event.attempts += 1
+                event.last_error = repr(e)[:1000]
+                if event.attempts >= max_attempts:
+                    event.failed_at = func.now()
+                    outbox_metrics.failed += 1
+                    logger.error(
+                        f"Outbox event {event.id} ({event.event_type}) failed "
+                        f"after {event.attempts} attempts: {e}"
+                    )
+                else:
+                    event.available_at = func.now() + timedelta(
+                        seconds=_backoff(event.attempts)
+                    )
+                    outbox_metrics.retried += 1
+                continue
+            event.processed_at = func.now()
+            lags.append((datetime.now(timezone.utc) - event.created_at).total_seconds())
+
+        await db.commit()
+        outbox_metrics.record_batch(len(lags), lags)
+        return len(events)
+
+    @staticmethod
+    async def get_backlog(db: AsyncSession) -> Dict[str, Any]:
+        """Count pending events and the age of the oldest one."""
+        result = await db.execute(
+            select(func.count(), func.min(OutboxEvent.created_at)).where(
+                OutboxEvent.processed_at.is_(None),
+                OutboxEvent.failed_at.is_(None),
+            )
+        )
+        pending, oldest = result.one()
+        age = (datetime.now(timezone.utc) - oldest).total_seconds() if oldest else 0.0
+        return {"pending": pending, "oldest_pending_age_seconds": round(age, 3)}
+
+    @staticmethod
+    async def prune_processed(db: AsyncSession, retention_days: int) -> int:
+        """
+        Delete events processed longer than the retention ago; returns how many.
+
+        Events that failed for good are kept until they are dealt with.
+        """
+        result = await db.execute(
+            delete(OutboxEvent)
+            .where(OutboxEvent.processed_at < func.now() - timedelta(days=retention_days))
+        )
+        await db.commit()
+        return result.rowcount
+
+
+def _backoff(attempts: int) -> float:
+    """Exponential backoff with full jitter."""
+    ceiling = min(settings.OUTBOX_BACKOFF_MAX, settings.OUTBOX_BACKOFF_BASE * 2 ** (attempts - 1))
+    return random.uniform(0, ceiling)
+
+
+async def run_outbox_worker(
+    batch_size: int, poll_interval: float, max_attempts: int
+) -> None:
+    """Background task that drains the outbox in batches."""
+    while True:
+        try:
+            async with async_session_factory() as db:
+                claimed = await OutboxService.process_batch(db, batch_size, max_attempts)
+        except Exception as e:
+            logger.error(f"Outbox batch failed: {e}")
+            claimed = 0
+        # Keep draining while batches come back full
+        if claimed < batch_size:
+            await asyncio.sleep(poll_interval)
+
+
+async def run_outbox_pruner(retention_days: int, interval: float) -> None:
+    """Background task keeping processed events from piling up in the outbox."""
+    while True:
+        try:
+            async with async_session_factory() as db:
+                pruned = await OutboxService.prune_processed(db, retention_days)
+            if pruned:
+                logger.info(f"Pruned {pruned} processed outbox events")
+        except Exception as e:
+            logger.error(f"Outbox pruning failed: {e}")
+        await asyncio.sleep(interval)
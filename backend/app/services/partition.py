@@ -0,0 +1,94 @@
+import asyncio
+import logging
+from datetime import date, datetime
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.query_tags import tag_queries
+from app.db.session import async_session_factory
+from app.models.base_model import JST
+
+logger = logging.getLogger(__name__)
+
+# Tables range-partitioned by the month their order was created in
+PARTITIONED_TABLES = ("orders", "order_items")
+
+# Arbitrary key serialising partition DDL across workers
+_PARTITION_LOCK_KEY = 0x6F72646572
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    """Name of a table's partition for the month starting at `month`."""
+    return f"{table}_{month:%Y_%m}"
+
+
+@tag_queries
+class PartitionService:
+    """Service for the monthly partitions of orders and order_items."""
+
+    @staticmethod
+    async def ensure_order_partitions(
+        db: AsyncSession, months_ahead: int, months_back: int = 0
+    ) -> List[str]:
+        """
+        Create the partitions from `months_back` months before the current
+        month to `months_ahead` months after it.
+
+        Returns the names of the partitions that were created. A month whose
+        rows already landed in the default partition can't get its own
+        partition until those rows are moved, so it is logged and skipped.
+        """
+        await db.execute(
+            text("SELECT pg_advisory_xact_lock(:key)"), {"key": _PARTITION_LOCK_KEY}
+        )
+        result = await db.execute(text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = ANY(:tables)"
+        ), {"tables": list(PARTITIONED_TABLES)})
+        existing = set(result.scalars().all())
+
+        current = datetime.now(JST).date().replace(day=1)
+        created = []
+        for offset in range(-months_back, months_ahead + 1):
+            start = _add_months(current, offset)
+            end = _add_months(start, 1)
+            for table in PARTITIONED_TABLES:
+                name = partition_name(table, start)
+                if name in existing:
+                    continue
+                try:
+                    async with db.begin_nested():
+                        await db.execute(text(
+                            f"CREATE TABLE {name} PARTITION OF {table} "
+                            f"FOR VALUES FROM ('{start}') TO ('{end}')"
+                        ))
+                except DBAPIError as e:
+                    logger.error(f"Could not create partition {name}: {e}")
+                    continue
+                created.append(name)
+
+        await db.commit()
+        return created
+
+
+async def run_partition_maintainer(months_ahead: int, interval: float) -> None:
+    """Background task keeping future order partitions created."""
+    while True:
+        try:
+            async with async_session_factory() as db:
+                created = await PartitionService.ensure_order_partitions(db, months_ahead)
+            if created:
+                logger.info(f"Created order partitions: {', '.join(created)}")
+        except Exception as e:
+            logger.error(f"Order partition maintenance failed: {e}")
+        await asyncio.sleep(interval)
@@ -0,0 +1,357 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import bindparam, select, text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from sqlalchemy.ext.asyncio import AsyncSession, async_object_session
+
+from app.core.config import settings
+from app.db.binary_copy import copy_query_to_array
+from app.db.query_tags import tag_queries
+from app.db.session import async_session_factory
+from app.models.item_recommendation import ItemRecommendation, RecommendationState
+from app.models.order import OrderStatus
+from app.models.outbox_event import OutboxEvent
+from app.services.outbox import register_handler
+
+logger = logging.getLogger(__name__)
+
+# Baskets of non-cancelled orders, live and archived
+_BASKETS_SQL = """
+    SELECT oi.order_id, oi.item_id
+    FROM order_items AS oi
+    JOIN orders AS o ON o.id = oi.order_id AND o.created_at = oi.order_created_at
+    WHERE o.status <> 'cancelled'
+    UNION ALL
+    SELECT oi.order_id, oi.item_id
+    FROM order_items_archive AS oi
+    JOIN orders_archive AS o ON o.id = oi.order_id
+    JOIN items AS i ON i.id = oi.item_id
+    WHERE o.status <> 'cancelled'
+"""
+
+_BASKET_DTYPE = np.dtype([
+    ("fields", ">i2"),
+    ("order_len", ">i4"), ("order_id", "V16"),
+    ("item_len", ">i4"), ("item_id", "V16"),
+])
+
+_IDS = bindparam("ids", type_=ARRAY(PG_UUID(as_uuid=True)))
+
+# Rows are written in key order so concurrent workers lock them in the same order
+_COUNT_ITEMS_SQL = text(
+    """
+    INSERT INTO item_order_counts (item_id, orders)
+    SELECT id, 1 FROM unnest(:ids) AS id ORDER BY id
+    ON CONFLICT (item_id) DO UPDATE SET orders = item_order_counts.orders + 1
+    """
+).bindparams(_IDS)
+
+_COUNT_PAIRS_SQL = text(
+    """
+    INSERT INTO item_pair_counts (item_id, other_item_id, orders)
+    SELECT a, b, 1 FROM unnest(:ids) AS a, unnest(:ids) AS b
+    WHERE a <> b
+    ORDER BY a, b
+    ON CONFLICT (item_id, other_item_id)
+    DO UPDATE SET orders = item_pair_counts.orders + 1
+    """
+).bindparams(_IDS)
+
+# Rank an item's neighbors by lift, i.e. P(other | item) / P(other). For a
+# fixed item that orders the same as co-orders / orders of the other item.
+_TOP_K_SQL = text(
+    """
+    INSERT INTO item_recommendations (item_id, rank, recommended_item_id, co_orders, lift)
+    SELECT item_id, rank, other_item_id, co_orders, lift
+    FROM (
+        SELECT p.item_id, p.other_item_id, p.orders AS co_orders,
+               p.orders * s.orders_counted::float / (a.orders * b.orders) AS lift,
+               row_number() OVER (
+                   PARTITION BY p.item_id
+                   ORDER BY p.orders::float / b.orders DESC, p.orders DESC, p.other_item_id
+               ) AS rank
+        FROM item_pair_counts AS p
+        JOIN item_order_counts AS a ON a.item_id = p.item_id
+        JOIN item_order_counts AS b ON b.item_id = p.other_item_id
+        CROSS JOIN recommendation_state AS s
+        WHERE p.item_id = ANY(:ids) AND p.orders >= :min_support
+    ) AS ranked
+    WHERE rank <= :top_k
+    """
+).bindparams(_IDS)
+
+
+def co_occurrence(
+    order_index: np.ndarray, item_index: np.ndarray, max_basket: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, int]:
+    """
+    Count how many orders contain each item and each ordered item pair.
+
+    Takes one (order, item) pair per order line as dense integer codes.
+    Baskets larger than `max_basket` are skipped, since their pairs grow
+    quadratically and say little about what goes together. Returns the
+    sparse pair counts as (item, other_item, orders) arrays, the per-item
+    order counts and the number of orders counted.
+    """
+    order_sizes = np.bincount(order_index)
+    keep = order_sizes[order_index] <= max_basket
+    order_index, item_index = order_index[keep], item_index[keep]
+
+    by_order = np.argsort(order_index, kind="stable")
+    orders, items = order_index[by_order], item_index[by_order]
+    sizes = np.bincount(orders)
+    starts = np.cumsum(sizes) - sizes
+
+    # Pair every line with every line of its own order
+    partners = sizes[orders]
+    left = np.repeat(items, partners)
+    first_partner = np.repeat(starts[orders], partners)
+    offset = np.arange(partners.sum()) - np.repeat(np.cumsum(partners) - partners, partners)
+    right = items[first_partner + offset]
+    distinct = left != right
+
+    n_items = int(item_index.max()) + 1 if len(item_index) else 0
+    codes, pair_orders = np.unique(
+        left[distinct].astype(np.int64) * n_items + right[distinct], return_counts=True
+    )
+    item_orders = np.bincount(item_index, minlength=n_items)
+    return (
+        codes // max(n_items, 1),
+        codes % max(n_items, 1),
+        pair_orders,
+        item_orders,
+        int(np.count_nonzero(sizes)),
+    )
+
+
+def top_k(
+    item: np.ndarray,
+    other: np.ndarray,
+    pair_orders: np.ndarray,
+    item_orders: np.ndarray,
+    total_orders: int,
+    k: int,
+    min_support: int,
+) -> Tuple[np.ndarray, ...]:
+    """Pick each item's `k` highest-lift neighbors with at least `min_support` co-orders."""
+    supported = pair_orders >= min_support
+    item, other, pair_orders = item[supported], other[supported], pair_orders[supported]
+    lift = pair_orders * total_orders / (item_orders[item] * item_orders[other])
+
+    # Sort by item, then lift and co-orders descending, then neighbor
+    order = np.lexsort((other, -pair_orders, -lift, item))
+    item, other, pair_orders, lift = item[order], other[order], pair_orders[order], lift[order]
+    group_start = np.flatnonzero(np.r_[True, item[1:] != item[:-1]])
+    sizes = np.diff(np.r_[group_start, len(item)])
+    rank = np.arange(len(item)) - np.repeat(group_start, sizes) + 1
+    keep = rank <= k
+    return item[keep], rank[keep], other[keep], pair_orders[keep], lift[keep]
+
+
+@tag_queries
+class RecommendationService:
+    """Service for frequently-bought-together recommendations."""
+
+    @staticmethod
+    async def rebuild(
+        db: AsyncSession, top_k_size: int, min_support: int, max_basket: int
+    ) -> Dict[str, int]:
+        """
+        Recompute all co-occurrence counts and recommendations from order lines.
+
+        The tables are locked against concurrent incremental updates while
+        they are replaced, so readers keep seeing the previous version until
+        the rebuild commits.
+        """
+        await db.execute(text(
+            "LOCK TABLE item_order_counts, item_pair_counts, item_recommendations, "
+            "recommendation_state IN EXCLUSIVE MODE"
+        ))
+        rows = await copy_query_to_array(db, _BASKETS_SQL, dtype=_BASKET_DTYPE)
+        item_ids, item_index = np.unique(rows["item_id"], return_inverse=True)
+        _, order_index = np.unique(rows["order_id"], return_inverse=True)
+
+        item, other, pair_orders, item_orders, total_orders = co_occurrence(
+            order_index, item_index, max_basket
+        )
+        ranked = top_k(
+            item, other, pair_orders, item_orders, total_orders, top_k_size, min_support
+        )
+
+        uuids = [UUID(bytes=b.tobytes()) for b in item_ids]
+        await db.execute(text("DELETE FROM item_recommendations"))
+        await db.execute(text("DELETE FROM item_pair_counts"))
+        await db.execute(text("DELETE FROM item_order_counts"))
+        connection = await db.connection()
+        raw = (await connection.get_raw_connection()).driver_connection
+        await raw.copy_records_to_table(
+            "item_order_counts",
+            columns=["item_id", "orders"],
+            records=[(uuids[i], int(n)) for i, n in enumerate(item_orders) if n],
+        )
+        await raw.copy_records_to_table(
+            "item_pair_counts",
+            columns=["item_id", "other_item_id", "orders"],
+            records=zip(
+                (uuids[i] for i in item), (uuids[i] for i in other), pair_orders.tolist()
+            ),
+        )
+        await raw.copy_records_to_table(
+            "item_recommendations",
+            columns=["item_id", "rank", "recommended_item_id", "co_orders", "lift"],
+            records=zip(
+                (uuids[i] for i in ranked[0]),
+                ranked[1].tolist(),
+                (uuids[i] for i in ranked[2]),
+                ranked[3].tolist(),
+                ranked[4].tolist(),
+            ),
+        )
+        await db.execute(text(
+            "UPDATE recommendation_state SET orders_counted = :total, built_at = now()"
+        ), {"total": total_orders})
+        await db.commit()
+        return {
+            "orders": total_orders,
+            "items": int(np.count_nonzero(item_orders)),
+            "pairs": len(pair_orders),
+            "recommendations": len(ranked[0]),
+        }
+
+    @staticmethod
+    async def add_basket(
+        db: AsyncSession,
+        item_ids: Sequence[UUID],
+        ordered_at: datetime,
+        top_k_size: int,
+        min_support: int,
+    ) -> bool:
+        """
+        Count one new order's items and re-rank recommendations for them.
+
+        Orders placed before the last rebuild are already in its counts and
+        are skipped. Returns whether the order was counted.
+        """
+        counted = await db.execute(text(
+            "UPDATE recommendation_state SET orders_counted = orders_counted + 1 "
+            "WHERE built_at IS NULL OR built_at < :ordered_at RETURNING id"
+        ), {"ordered_at": ordered_at})
+        if counted.scalar() is None:
+            return False
+        ids = sorted(set(item_ids))
+        await db.execute(_COUNT_ITEMS_SQL, {"ids": ids})
+        if len(ids) > 1:
+            await db.execute(_COUNT_PAIRS_SQL, {"ids": ids})
+        await db.execute(
+            text("DELETE FROM item_recommendations WHERE item_id = ANY(:ids)")
+            .bindparams(_IDS),
+            {"ids": ids},
+        )
+        await db.execute(
+            _TOP_K_SQL, {"ids": ids, "min_support": min_support, "top_k": top_k_size}
+        )
+        return True
+
+
+@register_handler("order.created")
+async def count_order_basket(event: OutboxEvent) -> None:
+    """
+    Fold a new order into the co-occurrence counts.
+
+    Writes go through the outbox batch's own session, inside a savepoint, so
+    they commit together with the event being marked processed and a retry
+    never counts an order twice. Only the new order's items are re-ranked;
+    the next rebuild corrects the lift of other items' neighbors.
+    """
+    if not settings.RECOMMENDATIONS_ENABLED:
+        return
+    payload = event.payload
+    item_ids = [UUID(line["item_id"]) for line in payload.get("items", [])]
+    if payload.get("status") == OrderStatus.CANCELLED.value:
+        return
+    if not item_ids or len(item_ids) > settings.RECOMMENDATION_MAX_BASKET:
+        return
+    db = async_object_session(event)
+    async with db.begin_nested():
+        await RecommendationService.add_basket(
+            db,
+            item_ids,
+            ordered_at=event.created_at,
+            top_k_size=settings.RECOMMENDATION_TOP_K,
+            min_support=settings.RECOMMENDATION_MIN_SUPPORT,
+        )
+
+
+class RecommendationIndex:
+    """
+    In-memory top-K neighbors per item, refreshed from item_recommendations.
+
+    Refreshes only reload items whose recommendations changed since the last
+    one, re-reading a short overlap to catch transactions that committed late.
+    A rebuild changes every row, so it triggers a full reload.
+    """
+
+    def __init__(self, overlap: float = 60.0) -> None:
+        self.overlap = timedelta(seconds=overlap)
+        self._neighbors: Dict[UUID, List[Tuple[UUID, int, float]]] = {}
+        self._built_at: Optional[datetime] = None
+        self._loaded_through: Optional[datetime] = None
+
+    def get(self, item_id: UUID, limit: int) -> List[Tuple[UUID, int, float]]:
+        """An item's (recommended item, co-orders, lift), best first."""
+        return self._neighbors.get(item_id, [])[:limit]
+
+    async def refresh(self, db: AsyncSession) -> int:
+        """Load changed recommendations; returns the number of items reloaded."""
+        built_at = (await db.execute(select(RecommendationState.built_at))).scalar()
+        stmt = select(ItemRecommendation).order_by(
+            ItemRecommendation.item_id, ItemRecommendation.rank
+        )
+        full = built_at != self._built_at or self._loaded_through is None
+        if not full:
+            stmt = stmt.where(
+                ItemRecommendation.updated_at > self._loaded_through - self.overlap
+            )
+        rows = (await db.execute(stmt)).scalars().all()
+
+        neighbors: Dict[UUID, List[Tuple[UUID, int, float]]] = {}
+        for row in rows:
+            neighbors.setdefault(row.item_id, []).append(
+                (row.recommended_item_id, row.co_orders, row.lift)
+            )
+        if full:
+            self._neighbors = neighbors
+        else:
+            self._neighbors.update(neighbors)
+        self._built_at = built_at
+        if rows:
+            latest = max(row.updated_at for row in rows)
+            if self._loaded_through is None or latest > self._loaded_through:
+                self._loaded_through = latest
+        return len(neighbors)
+
+    def snapshot(self) -> Dict[str, object]:
+        return {
+            "items": len(self._neighbors),
+            "built_at": self._built_at,
+            "loaded_through": self._loaded_through,
+        }
+
+
+recommendation_index = RecommendationIndex()
+
+
+async def run_recommendation_refresher(interval: float) -> None:
+    """Background task keeping this worker's recommendation index current."""
+    while True:
+        try:
+            async with async_session_factory() as db:
+                await recommendation_index.refresh(db)
+        except Exception as e:
+            logger.error(f"Recommendation index refresh failed: {e}")
+        await asyncio.sleep(interval)
@@ -0,0 +1,236 @@
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Hashable, List, Optional, Sequence
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db.binary_copy import copy_query_to_array
+from app.db.query_tags import tag_queries
+from app.schemas.report import (
+    ItemMovingAverage,
+    ItemMovingAverageReport,
+    OrderValueReport,
+    ReportPeriod,
+    RevenuePoint,
+    RevenueReport,
+)
+
+# Revenue lines of non-cancelled orders, live and archived, in a date range.
+# Every column is NOT NULL and fixed width, as parse_binary_copy requires.
+_LINES_SQL = """
+    SELECT oi.order_created_at, oi.order_id, oi.item_id, oi.quantity, oi.price_at_time
+    FROM order_items AS oi
+    JOIN orders AS o ON o.id = oi.order_id AND o.created_at = oi.order_created_at
+    WHERE o.status <> 'cancelled'
+      AND oi.order_created_at >= $1 AND oi.order_created_at < $2
+    UNION ALL
+    SELECT oi.order_created_at, oi.order_id, oi.item_id, oi.quantity, oi.price_at_time
+    FROM order_items_archive AS oi
+    JOIN orders_archive AS o ON o.id = oi.order_id
+    WHERE o.status <> 'cancelled'
+      AND oi.order_created_at >= $1 AND oi.order_created_at < $2
+"""
+
+# Binary COPY row: field count, then (length, value) per column, big-endian
+_ROW_DTYPE = np.dtype([
+    ("fields", ">i2"),
+    ("ts_len", ">i4"), ("ts", ">i8"),
+    ("order_len", ">i4"), ("order_id", "V16"),
+    ("item_len", ">i4"), ("item_id", "V16"),
+    ("quantity_len", ">i4"), ("quantity", ">i4"),
+    ("price_len", ">i4"), ("price", ">f8"),
+])
+# Postgres timestamps count microseconds from 2000-01-01
+_PG_EPOCH_DAYS = (date(2000, 1, 1) - date(1970, 1, 1)).days
+_MICROSECONDS_PER_DAY = 86_400_000_000
+
+
+class OrderLines:
+    """Columns of the revenue lines in a date range, one NumPy array each."""
+
+    __slots__ = ("day", "order_id", "item_id", "quantity", "revenue")
+
+    def __init__(self, rows: np.ndarray) -> None:
+        # Days since 1970-01-01, the unit of numpy datetime64[D]
+        self.day = rows["ts"].astype(np.int64) // _MICROSECONDS_PER_DAY + _PG_EPOCH_DAYS
+        self.order_id = rows["order_id"]
+        self.item_id = rows["item_id"]
+        self.quantity = rows["quantity"].astype(np.int64)
+        self.revenue = self.quantity * rows["price"].astype(np.float64)
+
+    def __len__(self) -> int:
+        return len(self.day)
+
+
+def _period_start(day: np.ndarray, period: ReportPeriod) -> np.ndarray:
+    """Map day numbers to the first day of their period."""
+    if period == ReportPeriod.DAY:
+        return day
+    if period == ReportPeriod.WEEK:
+        # 1970-01-01 was a Thursday; weeks start on Monday (day 4)
+        return day - (day - 4) % 7
+    months = day.astype("datetime64[D]").astype("datetime64[M]")
+    return months.astype("datetime64[D]").astype(np.int64)
+
+
+def _to_date(day: int) -> date:
+    return date(1970, 1, 1) + timedelta(days=int(day))
+
+
+def _day_bounds(start: date, end: date) -> tuple:
+    """Timestamps covering start through end, inclusive."""
+    return (
+        datetime.combine(start, datetime.min.time()),
+        datetime.combine(end + timedelta(days=1), datetime.min.time()),
+    )
+
+
+# Computed reports, shared by every request in this worker
+report_cache = TTLCache(
+    ttl=settings.REPORT_CACHE_TTL, max_entries=settings.REPORT_CACHE_MAX_ENTRIES
+)
+
+
+async def _cached(key: Hashable, compute: Callable) -> Any:
+    report = report_cache.get(key)
+    if report is None:
+        report = await compute()
+        report_cache.set(key, report)
+    return report
+
+
+@tag_queries
+class ReportService:
+    """Service for revenue reporting over order lines."""
+
+    @staticmethod
+    async def load_lines(db: AsyncSession, start: date, end: date) -> OrderLines:
+        """Fetch the revenue lines from start through end with one binary COPY."""
+        rows = await copy_query_to_array(
+            db, _LINES_SQL, *_day_bounds(start, end), dtype=_ROW_DTYPE
+        )
+        return OrderLines(rows)
+
+    @staticmethod
+    async def revenue(
+        db: AsyncSession, period: ReportPeriod, start: date, end: date
+    ) -> RevenueReport:
+        """Revenue, order count and units sold per day, week or month."""
+        async def compute() -> RevenueReport:
+            lines = await ReportService.load_lines(db, start, end)
+            bucket = _period_start(lines.day, period)
+            buckets, index = np.unique(bucket, return_inverse=True)
+            revenue = np.bincount(index, weights=lines.revenue, minlength=len(buckets))
+            units = np.bincount(index, weights=lines.quantity, minlength=len(buckets))
+            # An order's lines all share its creation day, hence its bucket
+            first_lines = np.unique(lines.order_id, return_index=True)[1]
+            orders = np.bincount(index[first_lines], minlength=len(buckets))
+            return RevenueReport(
+                period=period,
+                start=start,
+                end=end,
+                points=[
+                    RevenuePoint(
+                        period_start=_to_date(b),
+                        revenue=round(float(r), 2),
+                        orders=int(o),
+                        units=int(u),
+                    )
+                    for b, r, o, u in zip(buckets, revenue, orders, units)
+                ],
+            )
+
+        return await _cached(("revenue", period, start, end), compute)
+
+    @staticmethod
+    async def order_values(
+        db: AsyncSession, start: date, end: date, percentiles: Sequence[float]
+    ) -> OrderValueReport:
+        """Percentiles of order value, summed from each order's lines."""
+        percentiles = tuple(sorted(set(percentiles)))
+
+        async def compute() -> OrderValueReport:
+            lines = await ReportService.load_lines(db, start, end)
+            _, index = np.unique(lines.order_id, return_inverse=True)
+            values = np.bincount(index, weights=lines.revenue)
+            result = (
+                np.percentile(values, percentiles) if len(values) else
+                np.zeros(len(percentiles))
+            )
+            return OrderValueReport(
+                start=start,
+                end=end,
+                orders=len(values),
+                mean=round(float(values.mean()), 2) if len(values) else 0.0,
+                percentiles={
+                    f"p{p:g}": round(float(v), 2) for p, v in zip(percentiles, result)
+                },
+            )
+
+        return await _cached(("order_values", start, end, percentiles), compute)
+
+    @staticmethod
+    async def item_moving_average(
+        db: AsyncSession,
+        start: date,
+        end: date,
+        window: int,
+        item_ids: Optional[List[UUID]] = None,
+        top: int = 10,
+    ) -> ItemMovingAverageReport:
+        """
+        Daily revenue and trailing `window`-day moving average per item.
+
+        Reports the given items, or the `top` items by revenue in the range.
+        The first days average over however many days are available.
+        """
+        item_key = tuple(sorted(item_ids)) if item_ids else None
+
+        async def compute() -> ItemMovingAverageReport:
+            lines = await ReportService.load_lines(db, start, end)
+            first_day = (start - date(1970, 1, 1)).days
+            n_days = (end - start).days + 1
+
+            items, item_index = np.unique(lines.item_id, return_inverse=True)
+            # Dense item x day revenue matrix built with one bincount
+            daily = np.bincount(
+                item_index * n_days + (lines.day - first_day),
+                weights=lines.revenue,
+                minlength=len(items) * n_days,
+            ).reshape(len(items), n_days)
+            totals = daily.sum(axis=1)
+
+            if item_ids:
+                wanted = np.array([u.bytes for u in item_ids], dtype="V16")
+                rows = np.flatnonzero(np.isin(items, wanted))
+            else:
+                rows = np.argsort(-totals, kind="stable")[:top]
+
+            cumulative = np.cumsum(daily[rows], axis=1)
+            shifted = np.zeros_like(cumulative)
+            shifted[:, window:] = cumulative[:, :-window]
+            counts = np.minimum(np.arange(1, n_days + 1), window)
+            moving = (cumulative - shifted) / counts
+
+            return ItemMovingAverageReport(
+                start=start,
+                end=end,
+                window=window,
+                days=[start + timedelta(days=d) for d in range(n_days)],
+                items=[
+                    ItemMovingAverage(
+                        item_id=UUID(bytes=items[row].tobytes()),
+                        total_revenue=round(float(totals[row]), 2),
+                        revenue=np.round(daily[row], 2).tolist(),
+                        moving_average=np.round(moving[i], 2).tolist(),
+                    )
+                    for i, row in enumerate(rows)
+                ],
+            )
+
+        return await _cached(
+            ("item_moving_average", start, end, window, item_key, top), compute
+        )
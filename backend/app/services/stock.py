@@ -0,0 +1,168 @@
+import asyncio
+import logging
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import delete, insert, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.query_tags import tag_queries
+from app.db.statements import LOCK_STOCK_SHARD_NOS, LOCK_STOCK_SHARDS, STOCK_TOTAL
+from app.db.session import async_session_factory
+from app.models.item import Item
+from app.models.item_stock_shard import ItemStockShard
+
+logger = logging.getLogger(__name__)
+
+# Take stock from one random shard that has enough, skipping shards other
+# transactions hold so concurrent orders don't queue on the same row lock
+_DECREMENT_SQL = text(
+    """
+    UPDATE item_stock_shards AS s
+    SET stock = s.stock - :quantity
+    FROM (
+        SELECT shard_no FROM item_stock_shards
+        WHERE item_id = :item_id AND stock >= :quantity
+        ORDER BY random()
+        LIMIT 1
+        FOR UPDATE SKIP LOCKED
+    ) AS picked
+    WHERE s.item_id = :item_id AND s.shard_no = picked.shard_no
+    RETURNING s.shard_no
+    """
+)
+
+# Write the shard totals of hot items back into items.stock
+_RECONCILE_SQL = text(
+    """
+    UPDATE items
+    SET stock = totals.stock, updated_at = timezone('Asia/Tokyo', now())
+    FROM (
+        SELECT item_id, CAST(SUM(stock) AS integer) AS stock
+        FROM item_stock_shards
+        GROUP BY item_id
+    ) AS totals
+    WHERE items.id = totals.item_id
+      AND items.is_hot
+      AND items.stock <> totals.stock
+    """
+)
+
+
+@tag_queries
+class StockService:
+    """Service for sharded stock of hot items."""
+
+    @staticmethod
+    async def get_total(db: AsyncSession, item_id: UUID) -> int:
+        """Get the current stock of a hot item summed over its shards."""
+        result = await db.execute(STOCK_TOTAL, {"item_id": item_id})
+        return int(result.scalar())
+
+    @staticmethod
+    async def distribute(
+        db: AsyncSession, item_id: UUID, total: int, shards: Optional[int] = None
+    ) -> None:
+        """
+        Replace an item's shards with `total` stock split evenly over `shards`.
+
+        Keeps the current number of shards when `shards` is not given. Does
+        not commit.
+        """
+        # Lock the existing shards so in-flight decrements finish first
+        result = await db.execute(LOCK_STOCK_SHARD_NOS, {"item_id": item_id})
+        existing = len(result.all())
+        shards = shards or existing or settings.STOCK_SHARD_COUNT
+
+        await db.execute(
+            delete(ItemStockShard).where(ItemStockShard.item_id == item_id)
+        )
+        base, extra = divmod(total, shards)
+        await db.execute(
+            insert(ItemStockShard),
+            [
+                {"item_id": item_id, "shard_no": n, "stock": base + (n < extra)}
+                for n in range(shards)
+            ],
+        )
+
+    @staticmethod
+    async def decrement(db: AsyncSession, item_id: UUID, quantity: int) -> bool:
+        """
+        Reserve `quantity` units of a hot item. Does not commit.
+
+        Tries a single unlocked shard first. If every shard with enough stock
+        is busy, or no single shard has enough, falls back to locking all of
+        the item's shards and taking the quantity from several of them.
+        Returns False if the total stock is insufficient.
+        """
+        result = await db.execute(
+            _DECREMENT_SQL, {"item_id": item_id, "quantity": quantity}
+        )
+        if result.first() is not None:
+            return True
+
+        # Slow path: lock every shard in a fixed order to avoid deadlocks
+        result = await db.execute(LOCK_STOCK_SHARDS, {"item_id": item_id})
+        shards = result.scalars().all()
+        if sum(shard.stock for shard in shards) < quantity:
+            return False
+
+        remaining = quantity
+        for shard in sorted(shards, key=lambda s: s.stock, reverse=True):
+            taken = min(shard.stock, remaining)
+            shard.stock -= taken
+            remaining -= taken
+            if remaining == 0:
+                break
+        await db.flush()
+        return True
+
+    @staticmethod
+    async def enable(db: AsyncSession, item: Item, shards: int) -> Item:
+        """Flag an item as hot and spread its stock across `shards` rows."""
+        await db.refresh(item, with_for_update=True)
+        total = await StockService.get_total(db, item.id) if item.is_hot else item.stock
+        await StockService.distribute(db, item.id, total, shards)
+        item.is_hot = True
+        item.stock = total
+        db.add(item)
+        await db.commit()
+        await db.refresh(item)
+        return item
+
+    @staticmethod
+    async def disable(db: AsyncSession, item: Item) -> Item:
+        """Fold a hot item's shards back into items.stock."""
+        await db.refresh(item, with_for_update=True)
+        await db.execute(LOCK_STOCK_SHARD_NOS, {"item_id": item.id})
+        item.stock = await StockService.get_total(db, item.id)
+        item.is_hot = False
+        await db.execute(
+            delete(ItemStockShard).where(ItemStockShard.item_id == item.id)
+        )
+        db.add(item)
+        await db.commit()
+        await db.refresh(item)
+        return item
+
+    @staticmethod
+    async def reconcile(db: AsyncSession) -> int:
+        """Write shard totals back into items.stock; returns items changed."""
+        result = await db.execute(_RECONCILE_SQL)
+        await db.commit()
+        return result.rowcount
+
+
+async def run_stock_reconciler(interval: float) -> None:
+    """Background task that periodically reconciles hot item stock."""
+    while True:
+        try:
+            async with async_session_factory() as db:
+                changed = await StockService.reconcile(db)
+            if changed:
+                logger.debug(f"Reconciled stock for {changed} hot items")
+        except Exception as e:
+            logger.error(f"Stock reconciliation failed: {e}")
+        await asyncio.sleep(interval)
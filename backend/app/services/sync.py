@@ -0,0 +1,164 @@
+import asyncio
+import base64
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Any, List, NamedTuple, Optional, Tuple, Type
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from app.core.config import settings
+from app.db.query_tags import tag_queries
+from app.db.session import async_session_factory
+from app.models.base_model import JST
+from app.models.sync_tombstone import SyncTombstone
+
+logger = logging.getLogger(__name__)
+
+_NIL_UUID = UUID(int=0)
+
+
+class SyncPosition(NamedTuple):
+    """How far a client has read the changed rows and the tombstones."""
+    updated_at: datetime
+    id: UUID
+    deleted_at: datetime
+    tombstone_id: int
+
+
+def encode_sync_cursor(position: SyncPosition) -> str:
+    """Opaque cursor for a delta-sync position."""
+    payload = json.dumps([
+        position.updated_at.isoformat(), str(position.id),
+        position.deleted_at.isoformat(), position.tombstone_id,
+    ])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _decode_sync_cursor(cursor: str) -> SyncPosition:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        updated_at, row_id, deleted_at, tombstone_id = json.loads(
+            base64.urlsafe_b64decode(padded))
+        return SyncPosition(
+            datetime.fromisoformat(updated_at), UUID(row_id),
+            datetime.fromisoformat(deleted_at), int(tombstone_id),
+        )
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+
+
+def _now() -> datetime:
+    return datetime.now(JST).replace(tzinfo=None)
+
+
+@tag_queries
+class SyncService:
+    """Service for the delta-sync change feeds."""
+
+    @staticmethod
+    async def changes(
+        db: AsyncSession,
+        stmt: Select,
+        model: Type[Any],
+        entity: str,
+        since: Optional[str],
+        limit: int,
+        owner_id: Optional[UUID] = None,
+    ) -> Tuple[List[Any], List[UUID], str, bool]:
+        """
+        Get the rows of `stmt` changed since a cursor and the IDs deleted since.
+
+        Returns (changed, deleted, next_cursor, has_more). Rows are read in
+        (updated_at, id) order through an index, so a sync costs the number
+        of changes rather than the size of the table. Without `since` every
+        row is returned, and deletes are reported from then on.
+
+        Only changes older than SYNC_SETTLE_SECONDS are returned: a row's
+        updated_at is set before its transaction commits, so a newer row may
+        still appear behind the cursor. A cursor older than the tombstone
+        retention can no longer report every delete and gets 410.
+        """
+        horizon = _now() - timedelta(seconds=settings.SYNC_SETTLE_SECONDS)
+        if since is None:
+            position = SyncPosition(datetime.min, _NIL_UUID, horizon, 0)
+        else:
+            position = _decode_sync_cursor(since)
+            if position.deleted_at < _now() - timedelta(
+                    days=settings.SYNC_TOMBSTONE_RETENTION_DAYS):
+                raise HTTPException(
+                    status_code=status.HTTP_410_GONE,
+                    detail="Cursor expired; reload everything without since",
+                )
+
+        result = await db.execute(
+            stmt.where(
+                model.updated_at < horizon,
+                tuple_(model.updated_at, model.id)
+                > (position.updated_at, position.id),
+            )
+            .order_by(model.updated_at, model.id)
+            .limit(limit + 1)
+        )
+        rows = result.scalars().all()
+
+        tombstones = (
+            select(SyncTombstone.id, SyncTombstone.entity_id, SyncTombstone.deleted_at)
+            .where(
+                SyncTombstone.entity == entity,
+                SyncTombstone.deleted_at < horizon,
+                tuple_(SyncTombstone.deleted_at, SyncTombstone.id)
+                > (position.deleted_at, position.tombstone_id),
+            )
+            .order_by(SyncTombstone.deleted_at, SyncTombstone.id)
+            .limit(limit + 1)
+        )
+        if owner_id is not None:
+            tombstones = tombstones.where(SyncTombstone.owner_id == owner_id)
+        deletes = (await db.execute(tombstones)).all()
+
+        # Each stream that was read to the end moves up to the horizon
+        rows_more, deletes_more = len(rows) > limit, len(deletes) > limit
+        rows, deletes = rows[:limit], deletes[:limit]
+        next_position = SyncPosition(
+            rows[-1].updated_at if rows_more else horizon,
+            rows[-1].id if rows_more else _NIL_UUID,
+            deletes[-1].deleted_at if deletes_more else horizon,
+            deletes[-1].id if deletes_more else 0,
+        )
+        return (
+            rows,
+            [tombstone.entity_id for tombstone in deletes],
+            encode_sync_cursor(next_position),
+            rows_more or deletes_more,
+        )
+
+    @staticmethod
+    async def prune_tombstones(db: AsyncSession, retention_days: int) -> int:
+        """Delete tombstones older than the retention; returns how many."""
+        result = await db.execute(
+            delete(SyncTombstone)
+            .where(SyncTombstone.deleted_at < _now() - timedelta(days=retention_days))
+        )
+        await db.commit()
+        return result.rowcount
+
+
+async def run_tombstone_pruner(retention_days: int, interval: float) -> None:
+    """Background task dropping tombstones no valid cursor can still need."""
+    while True:
+        try:
+            async with async_session_factory() as db:
+                pruned = await SyncService.prune_tombstones(db, retention_days)
+            if pruned:
+                logger.info(f"Pruned {pruned} sync tombstones")
+        except Exception as e:
+            logger.error(f"Sync tombstone pruning failed: {e}")
+        await asyncio.sleep(interval)
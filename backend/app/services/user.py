@@ -1,36 +1,128 @@
-from typing import List, Optional
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
 from uuid import UUID
 
 from fastapi import HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import delete, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import get_password_hash, verify_password
+from app.core.config import settings
+from app.core.security import get_password_hash, verify_dummy_password, verify_password
+from app.db.loader import get_loader
+from app.db.query_tags import tag_queries
+from app.db.statements import USER_BY_EMAIL, USERS, USERS_PAGE
 from app.models.user import User
+from app.schemas import user as user_schemas
+from app.schemas.pagination import CountMode
 from app.schemas.user import UserCreate, UserUpdate
+from app.services.count import CountService
 
 
+class UserCache:
+    """
+    Short-TTL LRU of user rows for authenticating requests.
+
+    Entries are immutable schema snapshots rather than ORM objects, so they
+    can be shared between sessions. Writes through UserService invalidate
+    the entry in this worker; other workers see the change within the TTL.
+    """
+
+    def __init__(self, ttl: float, max_entries: int) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.generation = 0
+        self._entries: "OrderedDict[UUID, Tuple[float, user_schemas.User]]" = OrderedDict()
+
+    def get(self, user_id: UUID) -> Optional[user_schemas.User]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        expires_at, user = entry
+        if expires_at < time.monotonic():
+            del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        return user
+
+    def set(self, user: user_schemas.User, generation: int) -> None:
+        """Cache a row read when `generation` was current."""
+        # Drop rows read before an invalidation that raced with the read
+        if generation != self.generation:
+            return
+        self._entries[user.id] = (time.monotonic() + self.ttl, user)
+        self._entries.move_to_end(user.id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: UUID) -> None:
+        self.generation += 1
+        self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._entries.clear()
+
+
+user_cache = UserCache(
+    ttl=settings.AUTH_USER_CACHE_TTL, max_entries=settings.AUTH_USER_CACHE_MAX_ENTRIES
+)
+
+
+@tag_queries
 class UserService:
     """Service for User related operations."""
 
     @staticmethod
     async def get_by_id(db: AsyncSession, user_id: UUID) -> Optional[User]:
-        """Get a user by ID."""
-        result = await db.execute(select(User).where(User.id == user_id))
-        return result.scalars().first()
+        """
+        Get a user by ID.
+
+        Lookups made concurrently within a request share one query, and
+        repeated lookups are answered from the request's memo until it commits.
+        """
+        return await get_loader(db, User).load(user_id)
+
+    @staticmethod
+    async def get_cached(
+        db: AsyncSession, user_id: UUID
+    ) -> Optional[user_schemas.User]:
+        """Get a user snapshot, reading the database only on a cache miss."""
+        user = user_cache.get(user_id)
+        if user is not None:
+            return user
+        generation = user_cache.generation
+        db_obj = await UserService.get_by_id(db, user_id=user_id)
+        if db_obj is None:
+            return None
+        user = user_schemas.User.model_validate(db_obj)
+        user_cache.set(user, generation)
+        return user
+
+    @staticmethod
+    async def get_by_ids(db: AsyncSession, user_ids: Sequence[UUID]) -> List[User]:
+        """Get users by ID with a single query, in no particular order."""
+        users = await get_loader(db, User).load_many(user_ids)
+        return [user for user in users if user is not None]
 
     @staticmethod
     async def get_by_email(db: AsyncSession, email: str) -> Optional[User]:
         """Get a user by email."""
-        result = await db.execute(select(User).where(User.email == email))
+        result = await db.execute(USER_BY_EMAIL, {"email": email})
         return result.scalars().first()
 
     @staticmethod
     async def get_all(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[User]:
         """Get all users."""
-        result = await db.execute(select(User).offset(skip).limit(limit))
+        result = await db.execute(USERS_PAGE, {"skip": skip, "limit": limit})
         return result.scalars().all()
 
+    @staticmethod
+    async def count(db: AsyncSession, mode: CountMode) -> Optional[int]:
+        """Total number of users, exact, estimated or not computed."""
+        return await CountService.count(db, USERS, mode)
+
     @staticmethod
     async def create(db: AsyncSession, obj_in: UserCreate) -> User:
         """Create a new user."""
@@ -73,20 +165,75 @@ class UserService:
 
         db.add(db_obj)
         await db.commit()
+        user_cache.invalidate(db_obj.id)
         await db.refresh(db_obj)
         return db_obj
 
+    @staticmethod
+    async def update_by_id(
+        db: AsyncSession,
+        user_id: UUID,
+        obj_in: UserUpdate,
+        expected_updated_at: Optional[List[datetime]] = None,
+    ) -> Optional[User]:
+        """
+        Update a user with a single UPDATE ... RETURNING statement.
+
+        Returns None when no row matched, either because the user does not
+        exist or because its updated_at is not in expected_updated_at.
+        """
+        update_data = obj_in.dict(exclude_unset=True)
+
+        if "password" in update_data:
+            hashed_password = get_password_hash(update_data["password"])
+            del update_data["password"]
+            update_data["hashed_password"] = hashed_password
+
+        stmt = update(User).where(User.id == user_id)
+        if expected_updated_at is not None:
+            stmt = stmt.where(User.updated_at.in_(expected_updated_at))
+        result = await db.execute(stmt.values(**update_data).returning(User))
+        user = result.scalars().first()
+        await db.commit()
+        if user:
+            user_cache.invalidate(user_id)
+        return user
+
     @staticmethod
     async def delete(db: AsyncSession, db_obj: User) -> User:
         """Delete a user."""
         await db.delete(db_obj)
         await db.commit()
+        user_cache.invalidate(db_obj.id)
         return db_obj
 
     @staticmethod
-    def authenticate(db_obj: User, password: str) -> bool:
-        """Verify if password is correct."""
+    async def delete_by_id(
+        db: AsyncSession,
+        user_id: UUID,
+        expected_updated_at: Optional[List[datetime]] = None,
+    ) -> Optional[User]:
+        """Delete a user with a single DELETE ... RETURNING statement."""
+        stmt = delete(User).where(User.id == user_id)
+        if expected_updated_at is not None:
+            stmt = stmt.where(User.updated_at.in_(expected_updated_at))
+        result = await db.execute(stmt.returning(User))
+        user = result.scalars().first()
+        await db.commit()
+        if user:
+            user_cache.invalidate(user_id)
+        return user
+
+    @staticmethod
+    def authenticate(db_obj: Optional[User], password: str) -> bool:
+        """
+        Verify if password is correct.
+
+        Without a user a dummy hash is checked instead, so the response time
+        does not reveal whether an account exists.
+        """
         if not db_obj:
+            verify_dummy_password()
             return False
         if not verify_password(password, db_obj.hashed_password):
             return False
@@ -1,2 +1,5 @@
 -- Enable pgvector extension
 CREATE EXTENSION IF NOT EXISTS vector;
+
+-- Enable pg_stat_statements (needs shared_preload_libraries, see docker-compose)
+CREATE EXTENSION IF NOT EXISTS pg_stat_statements;
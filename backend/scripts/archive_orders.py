@@ -0,0 +1,70 @@
+import asyncio
+import logging
+from typing import Optional
+
+import typer
+
+from app.core.config import settings
+from app.db.base import Base  # noqa: F401 - registers all models
+from app.db.session import async_session_factory
+from app.services.archive import ArchiveService, archive_cutoff
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Create typer app
+app = typer.Typer()
+
+
+async def run_archival(
+    retention_days: int,
+    batch_size: int,
+    max_batches: Optional[int],
+    batch_pause: float,
+    dry_run: bool,
+) -> None:
+    """Archive completed orders older than the retention window in batches."""
+    cutoff = archive_cutoff(retention_days)
+    async with async_session_factory() as db:
+        pending = await ArchiveService.count_archivable(db, cutoff)
+    logger.info(f"{pending} completed orders created before {cutoff} to archive")
+    if dry_run or not pending:
+        return
+
+    archived = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        async with async_session_factory() as db:
+            moved = await ArchiveService.archive_batch(db, cutoff, batch_size)
+        archived += moved
+        batches += 1
+        logger.info(f"Batch {batches}: archived {moved} orders ({archived}/{pending})")
+        if moved < batch_size:
+            break
+        await asyncio.sleep(batch_pause)
+    logger.info(f"Archived {archived} orders in {batches} batches")
+
+
+@app.command()
+def archive(
+    retention_days: int = typer.Option(
+        settings.ORDER_ARCHIVE_RETENTION_DAYS, help="Keep orders younger than this"),
+    batch_size: int = typer.Option(
+        settings.ORDER_ARCHIVE_BATCH_SIZE, help="Orders moved per transaction"),
+    max_batches: Optional[int] = typer.Option(
+        None, help="Stop after this many batches; rerun to continue"),
+    batch_pause: float = typer.Option(
+        settings.ORDER_ARCHIVE_BATCH_PAUSE, help="Seconds to pause between batches"),
+    dry_run: bool = typer.Option(False, help="Only count the orders to archive"),
+) -> None:
+    """Move delivered and cancelled orders past retention into the archive tables."""
+    try:
+        asyncio.run(run_archival(retention_days, batch_size, max_batches, batch_pause, dry_run))
+    except Exception as e:
+        logger.error(f"Order archival failed: {e}")
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,101 @@
+import asyncio
+import logging
+import statistics
+import sys
+import time
+from typing import Dict, List
+
+import httpx
+import typer
+
+from app.core.config import settings
+from app.db.session import async_session_factory
+from app.main import app as api
+from app.services.catalog import catalog_replica
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+# Create typer app
+app = typer.Typer()
+
+# GET /items query strings, from a plain page to filtered and sorted ones
+QUERIES: Dict[str, dict] = {
+    "page": {},
+    "cheapest": {"sort": "price"},
+    "by name": {"sort": "name", "skip": 1000},
+    "name prefix": {"name_prefix": "A", "sort": "-price"},
+    "price band": {"min_price": 10, "max_price": 20, "sort": "-stock"},
+    "low stock": {"max_stock": 5, "sort": "name", "count": "exact"},
+}
+
+
+async def bench_query(
+    client: httpx.AsyncClient, params: dict, limit: int, requests: int
+) -> dict:
+    """Latency and process CPU time per GET /items request."""
+    params = {"limit": limit, **params}
+    for _ in range(5):
+        (await client.get(f"{settings.API_V1_STR}/items", params=params)).raise_for_status()
+    latencies: List[float] = []
+    cpu_start = time.process_time()
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = await client.get(f"{settings.API_V1_STR}/items", params=params)
+        latencies.append(time.perf_counter() - start)
+        response.raise_for_status()
+    cpu = (time.process_time() - cpu_start) / requests
+    latencies.sort()
+    return {
+        "mean": statistics.mean(latencies),
+        "p99": latencies[int(len(latencies) * 0.99)],
+        "cpu": cpu,
+    }
+
+
+async def run(limit: int, requests: int) -> None:
+    async with async_session_factory() as db:
+        start = time.perf_counter()
+        loaded = await catalog_replica.refresh(db)
+        load_seconds = time.perf_counter() - start
+    if not loaded:
+        logger.error("Seed items (within CATALOG_REPLICA_MAX_BYTES) before running the benchmark")
+        sys.exit(1)
+    snapshot = catalog_replica.snapshot()
+    logger.info(
+        f"Loaded {snapshot['items']} items in {load_seconds:.2f} s, "
+        f"{snapshot['bytes'] / 1024 / 1024:.1f} MiB "
+        f"({snapshot['bytes'] / snapshot['items']:.0f} bytes per item)"
+    )
+
+    transport = httpx.ASGITransport(app=api)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name, params in QUERIES.items():
+            results = {}
+            for path, max_lag in (("database", -1.0), ("replica", float("inf"))):
+                # A negative max lag keeps every request on the database
+                settings.CATALOG_REPLICA_MAX_LAG = max_lag
+                results[path] = await bench_query(client, params, limit, requests)
+            logger.info(
+                f"{name:<12} " + "  ".join(
+                    f"{path} mean {result['mean'] * 1e3:6.2f} ms "
+                    f"p99 {result['p99'] * 1e3:6.2f} ms "
+                    f"CPU {result['cpu'] * 1e3:6.2f} ms"
+                    for path, result in results.items()
+                )
+            )
+
+
+@app.command()
+def bench(
+    limit: int = typer.Option(100, help="Items per page"),
+    requests: int = typer.Option(200, help="Requests per query and path"),
+) -> None:
+    """Compare GET /items served by Postgres with the in-memory catalog replica."""
+    asyncio.run(run(limit, requests))
+
+
+if __name__ == "__main__":
+    app()
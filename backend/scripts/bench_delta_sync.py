@@ -0,0 +1,158 @@
+import asyncio
+import logging
+import statistics
+import time
+from typing import List, Optional
+
+import typer
+from pydantic import TypeAdapter
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.base import Base  # noqa: F401 - registers all models
+from app.db.session import async_session_factory
+from app.schemas.item import Item
+from app.schemas.sync import Changes
+from app.services.item import ItemService
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Create typer app
+app = typer.Typer()
+
+BENCH_DESCRIPTION = "bench-delta-sync"
+
+items_json = TypeAdapter(List[Item])
+changes_json = TypeAdapter(Changes[Item])
+
+
+async def seed(db: AsyncSession, rows: int) -> None:
+    """Insert `rows` items last updated over the past day."""
+    await db.execute(text("""
+        INSERT INTO items (id, name, description, price, stock, is_hot,
+                           created_at, updated_at)
+        SELECT gen_random_uuid(), 'bench item ' || g, :description,
+               round((random() * 10000)::numeric, 2), 100, false, ts, ts
+        FROM (
+            SELECT g, timezone('Asia/Tokyo', now()) - interval '1 hour'
+                      - random() * interval '1 day' AS ts
+            FROM generate_series(1, :rows) AS g
+        ) s
+    """), {"rows": rows, "description": BENCH_DESCRIPTION})
+    await db.commit()
+    await db.execute(text("ANALYZE items"))
+
+
+async def change(db: AsyncSession, updates: int, deletes: int) -> None:
+    """Update and delete random synthetic items, as a day of catalog edits might."""
+    await db.execute(text("""
+        UPDATE items SET price = price + 1, updated_at = timezone('Asia/Tokyo', now())
+        WHERE id IN (SELECT id FROM items WHERE description = :description
+                     ORDER BY random() LIMIT :n)
+    """), {"description": BENCH_DESCRIPTION, "n": updates})
+    await db.execute(text("""
+        DELETE FROM items
+        WHERE id IN (SELECT id FROM items WHERE description = :description
+                     ORDER BY random() LIMIT :n)
+    """), {"description": BENCH_DESCRIPTION, "n": deletes})
+    await db.commit()
+
+
+async def cleanup(db: AsyncSession) -> None:
+    await db.execute(text("SET LOCAL app.skip_tombstones = 'on'"))
+    await db.execute(
+        text("DELETE FROM items WHERE description = :description"),
+        {"description": BENCH_DESCRIPTION},
+    )
+    # Tombstones of the items deleted by the benchmark
+    await db.execute(text("""
+        DELETE FROM sync_tombstones AS t
+        WHERE t.entity = 'item'
+          AND NOT EXISTS (SELECT 1 FROM items WHERE items.id = t.entity_id)
+          AND t.deleted_at > timezone('Asia/Tokyo', now()) - interval '1 day'
+    """))
+    await db.commit()
+
+
+async def full_reload(page: int) -> int:
+    """Fetch the whole catalog a page at a time, as clients do today; returns bytes."""
+    size, skip = 0, 0
+    async with async_session_factory() as db:
+        while True:
+            items = await ItemService.get_all(db, skip=skip, limit=page)
+            size += len(items_json.dump_json(items))
+            if len(items) < page:
+                return size
+            skip += page
+
+
+async def delta_sync(since: Optional[str], page: int) -> tuple:
+    """Follow the change feed until it is drained; returns (cursor, rows, bytes)."""
+    rows, size = 0, 0
+    async with async_session_factory() as db:
+        while True:
+            changed, deleted, since, has_more = await ItemService.changes(
+                db, since=since, limit=page)
+            rows += len(changed) + len(deleted)
+            size += len(changes_json.dump_json(Changes[Item](
+                changed=changed, deleted=deleted, next_cursor=since,
+                has_more=has_more)))
+            if not has_more:
+                return since, rows, size
+
+
+async def timed(label: str, iterations: int, fn, *args) -> None:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        result = await fn(*args)
+        samples.append(time.perf_counter() - start)
+    size = result if isinstance(result, int) else result[2]
+    rows = "" if isinstance(result, int) else f"  rows {result[1]:7d}"
+    logger.info(
+        f"{label:<28} p50 {statistics.median(samples) * 1e3:9.2f} ms  "
+        f"payload {size / 1024:10.1f} KiB{rows}"
+    )
+
+
+async def run(rows: int, changes: List[int], page: int, iterations: int,
+              keep: bool) -> None:
+    # Every change is committed before it is read, so nothing needs to settle
+    settings.SYNC_SETTLE_SECONDS = 0.0
+
+    async with async_session_factory() as db:
+        logger.info(f"Seeding {rows} items...")
+        await seed(db, rows)
+    try:
+        await timed("full reload", iterations, full_reload, page)
+        await timed("initial sync (no cursor)", iterations, delta_sync, None, page)
+        for count in changes:
+            cursor, _, _ = await delta_sync(None, page)
+            async with async_session_factory() as db:
+                await change(db, updates=count, deletes=max(count // 10, 1))
+            await timed(f"delta sync after {count} edits", iterations,
+                        delta_sync, cursor, page)
+    finally:
+        if not keep:
+            async with async_session_factory() as db:
+                await cleanup(db)
+
+
+@app.command()
+def bench(
+    rows: int = typer.Option(50_000, help="Synthetic items to insert"),
+    changes: List[int] = typer.Option(
+        [10, 100, 1000], help="Items updated between syncs (a tenth as many deleted)"),
+    page: int = typer.Option(1000, help="Rows per request"),
+    iterations: int = typer.Option(10, help="Runs per measurement"),
+    keep: bool = typer.Option(False, help="Keep the synthetic items afterwards"),
+) -> None:
+    """Compare reloading the item catalog against syncing only its changes."""
+    asyncio.run(run(rows, changes, page, iterations, keep))
+
+
+if __name__ == "__main__":
+    app()
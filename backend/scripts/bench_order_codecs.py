@@ -0,0 +1,86 @@
+import asyncio
+import logging
+import statistics
+import sys
+import time
+from typing import Any, List
+
+import typer
+from pydantic import TypeAdapter
+
+from app.api.negotiation import CBOR_CODEC, JSON_CODEC, MSGPACK_CODEC, Codec
+from app.db.base import Base  # noqa: F401 - registers all models
+from app.db.session import async_session_factory
+from app.schemas.order import Order, OrderFilter
+from app.services.order import OrderService
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Create typer app
+app = typer.Typer()
+
+CODECS = {"json": JSON_CODEC, "msgpack": MSGPACK_CODEC, "cbor": CBOR_CODEC}
+
+orders_adapter = TypeAdapter(List[Order])
+
+
+async def load_orders(count: int) -> List[Any]:
+    """The newest orders as the JSON-compatible data an endpoint responds with."""
+    async with async_session_factory() as db:
+        orders, _ = await OrderService.search(db, OrderFilter(), limit=count)
+    return orders_adapter.dump_python(orders_adapter.validate_python(
+        orders, from_attributes=True), mode="json")
+
+
+def best_of(fn, repeat: int) -> float:
+    """Median seconds per call of `fn` over `repeat` calls."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def bench_codec(codec: Codec, content: List[Any], repeat: int) -> dict:
+    payload = codec.encode(content)
+    if codec.decode(payload) != content:
+        raise RuntimeError(f"{codec.media_type} did not round-trip")
+    return {
+        "bytes": len(payload),
+        "encode": best_of(lambda: codec.encode(content), repeat),
+        "decode": best_of(lambda: codec.decode(payload), repeat),
+    }
+
+
+async def run(sizes: List[int], repeat: int) -> None:
+    orders = await load_orders(max(sizes))
+    if not orders:
+        logger.error("Seed orders before running the benchmark")
+        sys.exit(1)
+    for size in sizes:
+        content = orders[:size]
+        baseline = bench_codec(JSON_CODEC, content, repeat)
+        for name, codec in CODECS.items():
+            result = bench_codec(codec, content, repeat)
+            logger.info(
+                f"{len(content):>5} orders  {name:<8}"
+                f"{result['bytes'] / 1024:9.1f} KiB ({result['bytes'] / baseline['bytes']:4.0%})  "
+                f"encode {result['encode'] * 1e3:7.3f} ms  "
+                f"decode {result['decode'] * 1e3:7.3f} ms"
+            )
+
+
+@app.command()
+def bench(
+    sizes: List[int] = typer.Option([20, 100, 1000], "--size", help="Orders per list"),
+    repeat: int = typer.Option(200, help="Encodes and decodes timed per codec"),
+) -> None:
+    """Compare JSON, MessagePack and CBOR size and speed on Order lists."""
+    asyncio.run(run(sizes, repeat))
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,84 @@
+import asyncio
+import logging
+import statistics
+import sys
+import time
+from typing import List
+
+import httpx
+import typer
+
+from app.core.config import settings
+from app.main import app as api
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+# Create typer app
+app = typer.Typer()
+
+PATHS = {"orm": False, "db-json": True}
+
+
+async def bench_path(
+    client: httpx.AsyncClient, db_json: bool, limit: int, requests: int
+) -> dict:
+    """Latency and process CPU time per GET /orders request."""
+    settings.ORDER_LIST_DB_JSON = db_json
+    params = {"limit": limit, "count": "none"}
+    # Warm the statement caches and the connection pool
+    for _ in range(5):
+        (await client.get(f"{settings.API_V1_STR}/orders", params=params)).raise_for_status()
+    latencies: List[float] = []
+    size = 0
+    cpu_start = time.process_time()
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = await client.get(f"{settings.API_V1_STR}/orders", params=params)
+        latencies.append(time.perf_counter() - start)
+        response.raise_for_status()
+        size = len(response.content)
+    cpu = (time.process_time() - cpu_start) / requests
+    latencies.sort()
+    return {
+        "mean": statistics.mean(latencies),
+        "p50": latencies[len(latencies) // 2],
+        "p99": latencies[int(len(latencies) * 0.99)],
+        "cpu": cpu,
+        "bytes": size,
+    }
+
+
+async def run(limits: List[int], requests: int) -> None:
+    transport = httpx.ASGITransport(app=api)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        response = await client.get(f"{settings.API_V1_STR}/orders", params={"limit": 1})
+        if not response.json():
+            logger.error("Seed orders before running the benchmark")
+            sys.exit(1)
+        for limit in limits:
+            for name, db_json in PATHS.items():
+                result = await bench_path(client, db_json, limit, requests)
+                logger.info(
+                    f"{name:>7} limit {limit:>4}  "
+                    f"mean {result['mean'] * 1e3:7.2f} ms  "
+                    f"p50 {result['p50'] * 1e3:7.2f} ms  "
+                    f"p99 {result['p99'] * 1e3:7.2f} ms  "
+                    f"app CPU {result['cpu'] * 1e3:7.2f} ms/request  "
+                    f"{result['bytes'] / 1024:7.1f} KiB"
+                )
+
+
+@app.command()
+def bench(
+    limits: List[int] = typer.Option([20, 100, 500], "--limit", help="Page sizes to compare"),
+    requests: int = typer.Option(200, help="Requests per page size and path"),
+) -> None:
+    """Compare GET /orders built by the ORM and pydantic with JSON built by Postgres."""
+    asyncio.run(run(limits, requests))
+
+
+if __name__ == "__main__":
+    app()
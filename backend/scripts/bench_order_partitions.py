@@ -0,0 +1,154 @@
+import asyncio
+import logging
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+import typer
+from sqlalchemy import DateTime, Uuid, column, select, table, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.db.base import Base  # noqa: F401 - registers all models
+from app.models.base_model import JST
+from app.services.partition import PartitionService
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Create typer app
+app = typer.Typer()
+
+BENCH_NOTE = "bench-order-partitions"
+PLAIN_TABLE = "orders_unpartitioned_bench"
+
+
+def orders_table(name: str):
+    return table(
+        name,
+        column("id"),
+        column("user_id", Uuid),
+        column("status"),
+        column("total_amount"),
+        column("created_at", DateTime),
+    )
+
+
+def queries(name: str, user_id, now: datetime) -> dict:
+    """The recent-order queries to time, against partitioned or plain orders."""
+    orders = orders_table(name)
+    return {
+        "user last 30 days": select(orders)
+        .where(
+            orders.c.user_id == user_id,
+            orders.c.created_at >= now - timedelta(days=30),
+            orders.c.created_at < now,
+        )
+        .order_by(orders.c.created_at.desc())
+        .limit(20),
+        "all last 7 days": select(orders)
+        .where(
+            orders.c.created_at >= now - timedelta(days=7),
+            orders.c.created_at < now,
+        )
+        .order_by(orders.c.created_at.desc())
+        .limit(50),
+    }
+
+
+async def seed(db: AsyncSession, rows: int, years: int) -> None:
+    """Spread `rows` orders over the last `years` years and copy them unpartitioned."""
+    await PartitionService.ensure_order_partitions(
+        db, settings.ORDER_PARTITION_MONTHS_AHEAD, months_back=years * 12
+    )
+    await db.execute(text("""
+        INSERT INTO orders (id, created_at, updated_at, user_id, status,
+                            total_amount, notes)
+        SELECT gen_random_uuid(), s.ts, s.ts, u.ids[1 + (s.g % array_length(u.ids, 1))],
+               'delivered', round((random() * 10000)::numeric, 2), :note
+        FROM (
+            SELECT g, timezone('Asia/Tokyo', now())
+                      - random() * make_interval(years => :years) AS ts
+            FROM generate_series(1, :rows) AS g
+        ) s,
+        (SELECT array_agg(id) AS ids FROM (SELECT id FROM users LIMIT 100) x) u
+    """), {"rows": rows, "years": years, "note": BENCH_NOTE})
+    await db.execute(text(f"DROP TABLE IF EXISTS {PLAIN_TABLE}"))
+    await db.execute(text(f"CREATE TABLE {PLAIN_TABLE} AS SELECT * FROM orders"))
+    await db.execute(text(
+        f"CREATE INDEX ON {PLAIN_TABLE} (user_id, created_at)"))
+    await db.commit()
+    await db.execute(text("ANALYZE orders"))
+    await db.execute(text(f"ANALYZE {PLAIN_TABLE}"))
+
+
+async def cleanup(db: AsyncSession) -> None:
+    await db.execute(text("DELETE FROM orders WHERE notes = :note"), {"note": BENCH_NOTE})
+    await db.execute(text(f"DROP TABLE IF EXISTS {PLAIN_TABLE}"))
+    await db.commit()
+
+
+async def run(rows: int, years: int, iterations: int, keep: bool) -> None:
+    engine = create_async_engine(
+        str(settings.SQLALCHEMY_DATABASE_URI).replace(
+            "postgresql+psycopg2", "postgresql+asyncpg"
+        ),
+        pool_size=1,
+        max_overflow=0,
+    )
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with session_factory() as db:
+        user_id = (await db.execute(text("SELECT id FROM users LIMIT 1"))).scalar()
+        if not user_id:
+            logger.error("Seed users before running the benchmark")
+            sys.exit(1)
+        logger.info(f"Seeding {rows} orders over {years} years...")
+        await seed(db, rows, years)
+
+    now = datetime.now(JST).replace(tzinfo=None)
+    try:
+        async with session_factory() as db:
+            for layout, name in (("partitioned", "orders"), ("plain", PLAIN_TABLE)):
+                for label, stmt in queries(name, user_id, now).items():
+                    plan = (await db.execute(text(
+                        "EXPLAIN " + str(stmt.compile(
+                            engine.sync_engine, compile_kwargs={"literal_binds": True}))
+                    ))).scalars().all()
+                    scanned = sum(" on " in line and "Scan" in line for line in plan)
+
+                    samples = []
+                    for _ in range(iterations):
+                        start = time.perf_counter()
+                        (await db.execute(stmt)).all()
+                        samples.append(time.perf_counter() - start)
+                    samples.sort()
+                    logger.info(
+                        f"{layout:>11} {label:<18} relations scanned {scanned:3d}  "
+                        f"mean {statistics.mean(samples) * 1e3:8.2f} ms  "
+                        f"p50 {samples[len(samples) // 2] * 1e3:8.2f} ms  "
+                        f"p99 {samples[int(len(samples) * 0.99)] * 1e3:8.2f} ms"
+                    )
+    finally:
+        if not keep:
+            async with session_factory() as db:
+                await cleanup(db)
+        await engine.dispose()
+
+
+@app.command()
+def bench(
+    rows: int = typer.Option(1_000_000, help="Synthetic orders to insert"),
+    years: int = typer.Option(3, help="Years of history to spread them over"),
+    iterations: int = typer.Option(200, help="Executions per query and layout"),
+    keep: bool = typer.Option(False, help="Keep the synthetic orders afterwards"),
+) -> None:
+    """Compare recent-order queries on partitioned and unpartitioned orders."""
+    asyncio.run(run(rows, years, iterations, keep))
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,96 @@
+import asyncio
+import logging
+import statistics
+import sys
+import time
+from uuid import uuid4
+
+import typer
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.db.base import Base  # noqa: F401 - registers all models
+from app.models.item import Item
+from app.models.order import Order
+from app.models.user import User
+from app.services.item import ItemService
+from app.services.order import OrderService
+from app.services.user import UserService
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Create typer app
+app = typer.Typer()
+
+MODES = {
+    # Prepared statements cached and reused per connection (the default)
+    "reuse": {"statement_cache_size": 100, "prepared_statement_cache_size": 100},
+    # PgBouncer-safe: every execution prepares a uniquely named statement
+    "pgbouncer": {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+    },
+}
+
+
+async def run(mode: str, iterations: int) -> dict:
+    """Return per-call latencies (seconds) of the hot service queries."""
+    engine = create_async_engine(
+        str(settings.SQLALCHEMY_DATABASE_URI).replace(
+            "postgresql+psycopg2", "postgresql+asyncpg"
+        ),
+        pool_size=1,
+        max_overflow=0,
+        connect_args=MODES[mode],
+    )
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with session_factory() as db:
+        item = (await db.execute(select(Item).limit(1))).scalars().first()
+        user = (await db.execute(select(User).limit(1))).scalars().first()
+        order = (await db.execute(select(Order).limit(1))).scalars().first()
+    if not item or not user or not order:
+        logger.error("Seed users, items and orders before running the benchmark")
+        sys.exit(1)
+
+    calls = {
+        "ItemService.get_by_id": lambda db: ItemService.get_by_id(db, item.id),
+        "UserService.get_by_email": lambda db: UserService.get_by_email(db, user.email),
+        "OrderService.get_by_id": lambda db: OrderService.get_by_id(db, order.id),
+    }
+    latencies = {}
+    async with session_factory() as db:
+        for name, call in calls.items():
+            samples = []
+            for _ in range(iterations):
+                start = time.perf_counter()
+                await call(db)
+                samples.append(time.perf_counter() - start)
+                db.expunge_all()
+            latencies[name] = samples
+    await engine.dispose()
+    return latencies
+
+
+@app.command()
+def bench(iterations: int = typer.Option(2000, help="Calls per query and mode")) -> None:
+    """Compare hot query latency with and without prepared statement reuse."""
+    for mode in MODES:
+        latencies = asyncio.run(run(mode, iterations))
+        for name, samples in latencies.items():
+            samples.sort()
+            logger.info(
+                f"{mode:>9} {name:<26} "
+                f"mean {statistics.mean(samples) * 1e6:7.0f} us  "
+                f"p50 {samples[len(samples) // 2] * 1e6:7.0f} us  "
+                f"p99 {samples[int(len(samples) * 0.99)] * 1e6:7.0f} us"
+            )
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,69 @@
+import asyncio
+import logging
+import time
+
+import typer
+
+from app.core.rate_limit import RateLimiter, RateLimitMiddleware, RateLimitRule
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Create typer app
+app = typer.Typer()
+
+
+async def plain_app(scope, receive, send) -> None:
+    """Minimal ASGI app so the measurement isolates the middleware."""
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def receive() -> dict:
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def send(message: dict) -> None:
+    pass
+
+
+async def measure(asgi_app, requests: int, clients: int) -> float:
+    """Return mean seconds per request for `asgi_app`."""
+    scopes = [
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/api/v1/items",
+            "headers": [],
+            "client": (f"10.0.{i // 256}.{i % 256}", 50000),
+        }
+        for i in range(clients)
+    ]
+    start = time.perf_counter()
+    for i in range(requests):
+        await asgi_app(scopes[i % clients], receive, send)
+    return (time.perf_counter() - start) / requests
+
+
+@app.command()
+def bench(
+    requests: int = typer.Option(200_000, help="Requests per run"),
+    clients: int = typer.Option(1000, help="Distinct client IPs"),
+) -> None:
+    """Measure the per-request overhead of the in-memory rate limiter."""
+    limiter = RateLimiter(
+        default_rule=RateLimitRule.parse("1000000/second"),
+        route_rules={"GET /api/v1/items": RateLimitRule.parse("1000000/second")},
+    )
+    wrapped = RateLimitMiddleware(plain_app, limiter=limiter)
+
+    baseline = asyncio.run(measure(plain_app, requests, clients))
+    limited = asyncio.run(measure(wrapped, requests, clients))
+    logger.info(f"without limiter: {baseline * 1e6:.2f} us/request")
+    logger.info(f"with limiter:    {limited * 1e6:.2f} us/request")
+    logger.info(f"overhead:        {(limited - baseline) * 1e6:.2f} us/request")
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+import typer
+from sqlalchemy import any_, bindparam, select
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from sqlalchemy.orm import selectinload
+from sqlalchemy.sql import Executable
+
+from app.db import statements
+from app.db.base import Base  # noqa: F401 - registers all models
+from app.db.session import async_session_factory
+from app.models.item import Item
+from app.models.order import Order
+from app.models.order_item import OrderItem
+from app.models.user import User
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Create typer app
+app = typer.Typer()
+
+Query = Tuple[Callable[[dict], Executable], Executable, Callable[[dict], dict]]
+
+
+def _ids(values) -> object:
+    return bindparam("ids", values, type_=ARRAY(PG_UUID(as_uuid=True)))
+
+
+# Each hot query as the services used to build it on every call, its
+# prebuilt statement, and the parameters the prebuilt one is executed with
+QUERIES: Dict[str, Query] = {
+    "item by name": (
+        lambda row: select(Item).where(Item.name == row["item_name"]),
+        statements.ITEM_BY_NAME,
+        lambda row: {"name": row["item_name"]},
+    ),
+    "items by ids": (
+        lambda row: select(Item).where(Item.id == any_(_ids([row["item_id"]]))),
+        statements.by_ids(Item),
+        lambda row: {"ids": [row["item_id"]]},
+    ),
+    "user by email": (
+        lambda row: select(User).where(User.email == row["email"]),
+        statements.USER_BY_EMAIL,
+        lambda row: {"email": row["email"]},
+    ),
+    "users page": (
+        lambda row: select(User).offset(0).limit(100),
+        statements.USERS_PAGE,
+        lambda row: {"skip": 0, "limit": 100},
+    ),
+    "order by id": (
+        lambda row: select(Order)
+        .options(selectinload(Order.order_items).selectinload(OrderItem.item))
+        .where(Order.id == row["order_id"]),
+        statements.ORDER_BY_ID,
+        lambda row: {"order_id": row["order_id"]},
+    ),
+    "orders by ids": (
+        lambda row: select(Order)
+        .options(selectinload(Order.order_items).selectinload(OrderItem.item))
+        .where(Order.id == any_(_ids([row["order_id"]]))),
+        statements.ORDERS_BY_IDS,
+        lambda row: {"ids": [row["order_id"]]},
+    ),
+    "order status": (
+        lambda row: select(Order.id, Order.user_id, Order.status, Order.updated_at)
+        .where(Order.id == row["order_id"]),
+        statements.ORDER_STATUS,
+        lambda row: {"order_id": row["order_id"]},
+    ),
+}
+
+
+def summary(samples: List[float]) -> str:
+    samples = sorted(samples)
+    return (f"mean {statistics.mean(samples) * 1e6:7.1f} us  "
+            f"p50 {samples[len(samples) // 2] * 1e6:7.1f} us")
+
+
+def bench_python(row: dict, iterations: int) -> None:
+    """
+    Python cost per call of getting a statement and its cache key.
+
+    This is what every execution pays before the compiled-statement cache
+    lookup; the prebuilt statement's key is computed once and memoized.
+    """
+    for name, (build, prebuilt, _params) in QUERIES.items():
+        inline, reused = [], []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            build(row)._generate_cache_key()
+            inline.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            prebuilt._generate_cache_key()
+            reused.append(time.perf_counter() - start)
+        logger.info(f"build+key  {name:<14} per call  "
+                    f"inline {summary(inline)}  prebuilt {summary(reused)}")
+
+
+async def bench_execute(row: dict, iterations: int) -> None:
+    """Round-trip latency of executing each statement on one session."""
+    async with async_session_factory() as db:
+        for name, (build, prebuilt, params) in QUERIES.items():
+            inline, reused = [], []
+            for _ in range(iterations):
+                start = time.perf_counter()
+                (await db.execute(build(row))).all()
+                inline.append(time.perf_counter() - start)
+                db.expunge_all()
+                start = time.perf_counter()
+                (await db.execute(prebuilt, params(row))).all()
+                reused.append(time.perf_counter() - start)
+                db.expunge_all()
+            logger.info(f"execute    {name:<14} per call  "
+                        f"inline {summary(inline)}  prebuilt {summary(reused)}")
+
+
+async def sample_row() -> dict:
+    async with async_session_factory() as db:
+        item = (await db.execute(select(Item).limit(1))).scalars().first()
+        user = (await db.execute(select(User).limit(1))).scalars().first()
+        order = (await db.execute(select(Order).limit(1))).scalars().first()
+    if not item or not user or not order:
+        logger.error("Seed users, items and orders before running the benchmark")
+        sys.exit(1)
+    return {"item_id": item.id, "item_name": item.name, "email": user.email,
+            "order_id": order.id}
+
+
+async def run(iterations: int, execute: bool) -> None:
+    row = await sample_row()
+    bench_python(row, iterations)
+    if execute:
+        await bench_execute(row, iterations)
+
+
+@app.command()
+def bench(
+    iterations: int = typer.Option(5000, help="Calls per query"),
+    execute: bool = typer.Option(True, help="Also time execution against the database"),
+) -> None:
+    """Compare building hot queries on every call with prebuilt statements."""
+    asyncio.run(run(iterations, execute))
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,95 @@
+import asyncio
+import logging
+import time
+
+import typer
+from sqlalchemy import delete, text, update
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.db.base import Base  # noqa: F401 - registers all models
+from app.models.item import Item
+from app.services.stock import StockService
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Create typer app
+app = typer.Typer()
+
+
+async def row_decrement(db: AsyncSession, item_id) -> bool:
+    """Decrement items.stock directly, as non-hot items do."""
+    result = await db.execute(
+        update(Item)
+        .where(Item.id == item_id, Item.stock >= 1)
+        .values(stock=Item.stock - 1)
+    )
+    return result.rowcount == 1
+
+
+async def shard_decrement(db: AsyncSession, item_id) -> bool:
+    return await StockService.decrement(db, item_id, 1)
+
+
+async def run(mode: str, workers: int, seconds: float, shards: int, hold_ms: float) -> float:
+    """Return committed decrements per second for one mode."""
+    engine = create_async_engine(
+        str(settings.SQLALCHEMY_DATABASE_URI).replace(
+            "postgresql+psycopg2", "postgresql+asyncpg"
+        ),
+        pool_size=workers,
+        max_overflow=0,
+    )
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    decrement = shard_decrement if mode == "sharded" else row_decrement
+
+    async with session_factory() as db:
+        item = Item(name="bench-hot-item", price=1.0, stock=10_000_000)
+        db.add(item)
+        await db.commit()
+        if mode == "sharded":
+            await StockService.enable(db, item, shards=shards)
+        item_id = item.id
+
+    committed = 0
+    deadline = time.perf_counter() + seconds
+
+    async def worker() -> None:
+        nonlocal committed
+        async with session_factory() as db:
+            while time.perf_counter() < deadline:
+                await decrement(db, item_id)
+                # Simulate the rest of an order transaction holding the lock
+                await db.execute(text("SELECT pg_sleep(:s)"), {"s": hold_ms / 1000})
+                await db.commit()
+                committed += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    elapsed = time.perf_counter() - start
+
+    async with session_factory() as db:
+        await db.execute(delete(Item).where(Item.id == item_id))
+        await db.commit()
+    await engine.dispose()
+    return committed / elapsed
+
+
+@app.command()
+def bench(
+    workers: int = typer.Option(32, help="Concurrent order transactions"),
+    seconds: float = typer.Option(10.0, help="Duration of each run"),
+    shards: int = typer.Option(16, help="Shards for the sharded run"),
+    hold_ms: float = typer.Option(2.0, help="Extra time each transaction holds its locks"),
+) -> None:
+    """Compare stock decrement throughput on one hot item with and without sharding."""
+    for mode in ("row", "sharded"):
+        rate = asyncio.run(run(mode, workers, seconds, shards, hold_ms))
+        logger.info(f"{mode:>8}: {rate:,.0f} decrements/s")
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,121 @@
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime
+
+import typer
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.ids import uuid7
+from app.db.base import Base  # noqa: F401 - registers all models
+from app.db.session import async_session_factory
+from app.models.base_model import JST
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Create typer app
+app = typer.Typer()
+
+GENERATORS = {"v4": uuid.uuid4, "v7": uuid7}
+
+
+def bench_table(version: str) -> str:
+    return f"uuid_{version}_insert_bench"
+
+
+async def create_table(db: AsyncSession, name: str) -> None:
+    """An orders-shaped table keyed by a UUID primary key."""
+    await db.execute(text(f"DROP TABLE IF EXISTS {name}"))
+    await db.execute(text(f"""
+        CREATE TABLE {name} (
+            id uuid PRIMARY KEY,
+            user_id uuid NOT NULL,
+            total_amount double precision NOT NULL,
+            created_at timestamp NOT NULL
+        )
+    """))
+    await db.commit()
+
+
+async def wal_lsn(db: AsyncSession) -> str:
+    return (await db.execute(text("SELECT pg_current_wal_lsn()"))).scalar()
+
+
+async def insert_rows(version: str, rows: int, batch_size: int, report_every: int) -> None:
+    """COPY `rows` rows in batches; logs throughput as the index grows."""
+    name = bench_table(version)
+    generate = GENERATORS[version]
+    user_id = uuid.uuid4()
+    async with async_session_factory() as db:
+        await create_table(db, name)
+        start_lsn = await wal_lsn(db)
+        await db.commit()
+        connection = await db.connection()
+        raw = (await connection.get_raw_connection()).driver_connection
+
+        inserted, copy_time, window_rows, window_time = 0, 0.0, 0, 0.0
+        while inserted < rows:
+            count = min(batch_size, rows - inserted)
+            now = datetime.now(JST).replace(tzinfo=None)
+            # Generate IDs outside the timed section; only the insert is measured
+            records = [(generate(), user_id, 1.0, now) for _ in range(count)]
+            started = time.perf_counter()
+            await raw.copy_records_to_table(
+                name, columns=["id", "user_id", "total_amount", "created_at"],
+                records=records,
+            )
+            elapsed = time.perf_counter() - started
+            inserted += count
+            copy_time += elapsed
+            window_rows += count
+            window_time += elapsed
+            if window_rows >= report_every or inserted == rows:
+                logger.info(
+                    f"{version} {inserted:>11,d} rows  "
+                    f"{window_rows / window_time:>10,.0f} rows/s over the last "
+                    f"{window_rows:,d}"
+                )
+                window_rows, window_time = 0, 0.0
+
+        result = await db.execute(text("""
+            SELECT pg_wal_lsn_diff(pg_current_wal_lsn(), :start),
+                   pg_relation_size(:pkey), pg_relation_size(:table)
+        """), {"start": start_lsn, "pkey": f"{name}_pkey", "table": name})
+        wal, index_size, table_size = result.one()
+        logger.info(
+            f"{version} total {rows / copy_time:,.0f} rows/s  "
+            f"WAL {wal / 2**20:,.0f} MiB  "
+            f"primary key {index_size / 2**20:,.0f} MiB  "
+            f"table {table_size / 2**20:,.0f} MiB"
+        )
+
+
+async def run(rows: int, batch_size: int, report_every: int, keep: bool) -> None:
+    try:
+        for version in GENERATORS:
+            await insert_rows(version, rows, batch_size, report_every)
+    finally:
+        if not keep:
+            async with async_session_factory() as db:
+                for version in GENERATORS:
+                    await db.execute(text(f"DROP TABLE IF EXISTS {bench_table(version)}"))
+                await db.commit()
+
+
+@app.command()
+def bench(
+    rows: int = typer.Option(10_000_000, help="Rows to insert per UUID version"),
+    batch_size: int = typer.Option(10_000, help="Rows per COPY"),
+    report_every: int = typer.Option(1_000_000, help="Rows between progress lines"),
+    keep: bool = typer.Option(False, help="Keep the benchmark tables afterwards"),
+) -> None:
+    """Compare insert throughput into a UUID primary key with v4 and v7 IDs."""
+    asyncio.run(run(rows, batch_size, report_every, keep))
+
+
+if __name__ == "__main__":
+    app()
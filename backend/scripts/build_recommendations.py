@@ -0,0 +1,52 @@
+import asyncio
+import logging
+import time
+
+import typer
+
+from app.core.config import settings
+from app.db.base import Base  # noqa: F401 - registers all models
+from app.db.session import async_session_factory
+from app.services.recommendation import RecommendationService
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Create typer app
+app = typer.Typer()
+
+
+async def run_rebuild(top_k: int, min_support: int, max_basket: int) -> None:
+    """Recompute frequently-bought-together counts and recommendations."""
+    started = time.perf_counter()
+    async with async_session_factory() as db:
+        stats = await RecommendationService.rebuild(
+            db, top_k_size=top_k, min_support=min_support, max_basket=max_basket
+        )
+    logger.info(
+        f"Counted {stats['orders']} orders over {stats['items']} items: "
+        f"{stats['pairs']} item pairs, {stats['recommendations']} recommendations "
+        f"in {time.perf_counter() - started:.2f}s"
+    )
+
+
+@app.command()
+def build(
+    top_k: int = typer.Option(
+        settings.RECOMMENDATION_TOP_K, help="Recommendations kept per item"),
+    min_support: int = typer.Option(
+        settings.RECOMMENDATION_MIN_SUPPORT, help="Fewest shared orders to recommend a pair"),
+    max_basket: int = typer.Option(
+        settings.RECOMMENDATION_MAX_BASKET, help="Skip orders with more items than this"),
+) -> None:
+    """Rebuild recommendations from all live and archived orders."""
+    try:
+        asyncio.run(run_rebuild(top_k, min_support, max_basket))
+    except Exception as e:
+        logger.error(f"Recommendation rebuild failed: {e}")
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    app()
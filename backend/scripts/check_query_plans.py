@@ -0,0 +1,375 @@
+import asyncio
+import difflib
+import json
+import logging
+import os
+import subprocess
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+from uuid import UUID
+
+import typer
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.db.base import Base  # noqa: F401 - registers all models
+from app.db.query_tags import current_call_site
+from app.models.base_model import JST
+from app.models.order import OrderStatus
+from app.schemas.item import ItemFilter, ItemSort
+from app.schemas.order import OrderFilter, OrderSort
+from app.schemas.pagination import CountMode
+from app.services.archive import ArchiveService
+from app.services.count import count_cache
+from app.services.item import ItemService
+from app.services.order import OrderService, encode_order_cursor
+from app.services.partition import PartitionService
+from app.services.sync import SyncPosition, encode_sync_cursor
+from app.services.user import UserService
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Create typer app
+app = typer.Typer()
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+FINGERPRINTS = Path(__file__).resolve().parent / "query_plans.json"
+
+Scenario = Callable[[AsyncSession, Dict[str, Any]], Awaitable[Any]]
+
+# Read paths of the services, each run on a fresh session. Every statement
+# a scenario issues (selectinload follow-ups and loader batches included)
+# gets its plan checked.
+SCENARIOS: Dict[str, Scenario] = {
+    "items list": lambda db, ctx: ItemService.get_all(db),
+    "item by id": lambda db, ctx: ItemService.get_by_id(db, ctx["item_ids"][0]),
+    "items by ids": lambda db, ctx: ItemService.get_by_ids(db, ctx["item_ids"]),
+    "item by name": lambda db, ctx: ItemService.get_by_name(db, ctx["item_name"]),
+    "items by name prefix": lambda db, ctx: ItemService.search(
+        db, ItemFilter(name_prefix="Plan item 12")),
+    "items in price range": lambda db, ctx: ItemService.search(
+        db, ItemFilter(min_price=100, max_price=120)),
+    "items in stock range": lambda db, ctx: ItemService.search(
+        db, ItemFilter(min_stock=0, max_stock=5)),
+    **{
+        f"items sorted by {sort.value}": (
+            lambda db, ctx, sort=sort: ItemService.search(db, ItemFilter(), sort=sort))
+        for sort in ItemSort
+    },
+    "items exact count": lambda db, ctx: ItemService.count(db, CountMode.EXACT),
+    "item changes initial": lambda db, ctx: ItemService.changes(db, None, 500),
+    "item changes delta": lambda db, ctx: ItemService.changes(
+        db, ctx["sync_cursor"], 500),
+    "users list": lambda db, ctx: UserService.get_all(db),
+    "user by id": lambda db, ctx: UserService.get_by_id(db, ctx["user_id"]),
+    "user by email": lambda db, ctx: UserService.get_by_email(db, ctx["email"]),
+    "order by id": lambda db, ctx: OrderService.get_by_id(db, ctx["order_ids"][0]),
+    "orders by ids": lambda db, ctx: OrderService.get_by_ids(db, ctx["order_ids"]),
+    "archived orders by ids": lambda db, ctx: OrderService.get_by_ids(
+        db, ctx["archived_order_ids"]),
+    "order status": lambda db, ctx: OrderService.get_status(db, ctx["order_ids"][0]),
+    "orders newest": lambda db, ctx: OrderService.search(db, OrderFilter()),
+    "orders newest cursor": lambda db, ctx: OrderService.search(
+        db, OrderFilter(), cursor=ctx["order_cursor"]),
+    "orders pending": lambda db, ctx: OrderService.search(
+        db, OrderFilter(status=[OrderStatus.PENDING])),
+    "orders of user": lambda db, ctx: OrderService.search(
+        db, OrderFilter(user_id=ctx["user_id"])),
+    "orders last 30 days": lambda db, ctx: OrderService.search(
+        db, OrderFilter(created_from=ctx["now"] - timedelta(days=30))),
+    "orders highest total": lambda db, ctx: OrderService.search(
+        db, OrderFilter(), sort=OrderSort.HIGHEST_TOTAL),
+    "orders newest as json": lambda db, ctx: OrderService.search_json(db, OrderFilter()),
+    "orders of user as json": lambda db, ctx: OrderService.search_json(
+        db, OrderFilter(user_id=ctx["user_id"])),
+    "orders pending exact count": lambda db, ctx: OrderService.count(
+        db, CountMode.EXACT, OrderFilter(status=[OrderStatus.PENDING])),
+    "order changes of user": lambda db, ctx: OrderService.changes(
+        db, ctx["user_id"], None, 500),
+    "archivable orders count": lambda db, ctx: ArchiveService.count_archivable(
+        db, ctx["now"] - timedelta(days=365)),
+}
+
+
+def _url(database: str):
+    return make_url(str(settings.SQLALCHEMY_DATABASE_URI)).set(database=database)
+
+
+async def create_database(name: str) -> None:
+    """(Re)create the scratch database and migrate it to head."""
+    admin = create_async_engine(
+        _url("postgres").set(drivername="postgresql+asyncpg"),
+        isolation_level="AUTOCOMMIT",
+    )
+    async with admin.connect() as connection:
+        await connection.execute(text(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)'))
+        await connection.execute(text(f'CREATE DATABASE "{name}"'))
+    await admin.dispose()
+    env = {**os.environ, "SQLALCHEMY_DATABASE_URI":
+           _url(name).render_as_string(hide_password=False)}
+    subprocess.run([sys.executable, "-m", "alembic", "upgrade", "head"],
+                   cwd=BACKEND_DIR, env=env, check=True, capture_output=True)
+
+
+async def drop_database(name: str) -> None:
+    admin = create_async_engine(
+        _url("postgres").set(drivername="postgresql+asyncpg"),
+        isolation_level="AUTOCOMMIT",
+    )
+    async with admin.connect() as connection:
+        await connection.execute(text(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)'))
+    await admin.dispose()
+
+
+async def seed(db: AsyncSession, users: int, items: int, orders: int, years: int) -> None:
+    """Deterministic dataset: skewed order counts per user, mostly-completed history."""
+    await PartitionService.ensure_order_partitions(
+        db, settings.ORDER_PARTITION_MONTHS_AHEAD, months_back=years * 12 + 1)
+    await db.execute(text("SELECT setseed(0.42)"))
+    await db.execute(text("""
+        INSERT INTO users (created_at, updated_at, email, hashed_password,
+                           full_name, is_active, is_superuser)
+        SELECT ts, ts, 'plan-user-' || g || '@example.com', 'x',
+               'Plan User ' || g, true, false
+        FROM (SELECT g, timezone('Asia/Tokyo', now())
+                        - random() * make_interval(years => :years) AS ts
+              FROM generate_series(1, :users) AS g) s
+    """), {"users": users, "years": years})
+    await db.execute(text("""
+        INSERT INTO items (created_at, updated_at, name, description, price,
+                           stock, is_hot)
+        SELECT ts, ts + random() * interval '30 days',
+               'Plan item ' || g, NULL, round((random() * 500)::numeric, 2),
+               g * 37 % 200, false
+        FROM (SELECT g, timezone('Asia/Tokyo', now())
+                        - random() * make_interval(years => :years) AS ts
+              FROM generate_series(1, :items) AS g) s
+    """), {"items": items, "years": years})
+    await db.execute(text("""
+        INSERT INTO orders (created_at, updated_at, user_id, status,
+                            shipping_address, total_amount)
+        SELECT ts, ts + random() * interval '3 days',
+               u.ids[1 + floor(power(random(), 3) * array_length(u.ids, 1))::int],
+               CASE
+                   WHEN ts > timezone('Asia/Tokyo', now()) - interval '30 days'
+                   THEN (ARRAY['pending', 'processing', 'shipped', 'delivered',
+                               'cancelled'])[1 + floor(random() * 5)::int]
+                   WHEN random() < 0.85 THEN 'delivered'
+                   ELSE 'cancelled'
+               END::orderstatus,
+               'Tokyo', round((10 + random() * 990)::numeric, 2)
+        FROM (SELECT timezone('Asia/Tokyo', now())
+                     - power(random(), 2) * make_interval(years => :years) AS ts
+              FROM generate_series(1, :orders)) s,
+             (SELECT array_agg(id ORDER BY email) AS ids FROM users) u
+    """), {"orders": orders, "years": years})
+    # One to four distinct items per order
+    await db.execute(text("""
+        INSERT INTO order_items (order_id, item_id, quantity, price_at_time,
+                                 order_created_at)
+        SELECT o.id, i.ids[1 + (o.n * 7 + k * 997) % array_length(i.ids, 1)],
+               1 + floor(random() * 3)::int, 10, o.created_at
+        FROM (SELECT id, created_at, row_number() OVER (ORDER BY created_at) AS n
+              FROM orders) o,
+             (SELECT array_agg(id ORDER BY name) AS ids FROM items) i,
+             generate_series(1, 4) AS k
+        WHERE k <= 1 + o.n % 4
+    """))
+    await db.commit()
+    # Give the archive tables some rows too
+    await ArchiveService.archive_batch(
+        db, datetime.now(JST).replace(tzinfo=None) - timedelta(days=365 * 2), 5000)
+
+
+async def context(db: AsyncSession) -> Dict[str, Any]:
+    """IDs and cursors the scenarios look up."""
+    now = datetime.now(JST).replace(tzinfo=None)
+    scalars = lambda sql: db.execute(text(sql))  # noqa: E731
+    user_id = (await scalars(
+        "SELECT user_id FROM orders GROUP BY user_id ORDER BY count(*) DESC, user_id "
+        "LIMIT 1")).scalar()
+    item_ids = (await scalars("SELECT id FROM items ORDER BY name LIMIT 50")).scalars().all()
+    deep = (await db.execute(
+        OrderService.search_statement(OrderFilter(), OrderSort.NEWEST)
+        .offset(5000).limit(1)
+    )).scalars().first()
+    return {
+        "now": now,
+        "user_id": user_id,
+        "email": (await scalars("SELECT min(email) FROM users")).scalar(),
+        "item_ids": item_ids,
+        "item_name": (await scalars("SELECT min(name) FROM items")).scalar(),
+        "order_ids": (await scalars(
+            "SELECT id FROM orders ORDER BY created_at DESC LIMIT 20")).scalars().all(),
+        "archived_order_ids": (await scalars(
+            "SELECT id FROM orders_archive ORDER BY id LIMIT 5")).scalars().all(),
+        "order_cursor": encode_order_cursor(OrderSort.NEWEST, deep),
+        "sync_cursor": encode_sync_cursor(SyncPosition(
+            now - timedelta(days=1), UUID(int=0), now - timedelta(days=1), 0)),
+    }
+
+
+async def parent_relations(db: AsyncSession) -> Dict[str, str]:
+    """Map partitions and partition indexes to the table or index they belong to."""
+    result = await db.execute(text("""
+        SELECT child.relname, parent.relname
+        FROM pg_inherits AS i
+        JOIN pg_class AS child ON child.oid = i.inhrelid
+        JOIN pg_class AS parent ON parent.oid = i.inhparent
+    """))
+    return dict(result.all())
+
+
+def fingerprint(node: dict, parents: Dict[str, str]) -> List[str]:
+    """
+    The shape of a plan: node types, join kinds, relations and indexes.
+
+    Costs and row counts are left out. Partitions are named after their parent,
+    and identical scans under an Append or BitmapOr are listed once, so adding
+    monthly partitions or IDs to a lookup doesn't change the fingerprint.
+    """
+    label = node["Node Type"]
+    if "Join Type" in node and label != "Hash":
+        label += f" ({node['Join Type']})"
+    if label == "Aggregate" and node.get("Strategy"):
+        label += f" ({node['Strategy']})"
+    if node.get("Scan Direction") == "Backward":
+        label += " backward"
+    if "Relation Name" in node:
+        label += f" on {parents.get(node['Relation Name'], node['Relation Name'])}"
+    if "Index Name" in node:
+        label += f" using {parents.get(node['Index Name'], node['Index Name'])}"
+    if node.get("Parent Relationship") in ("InitPlan", "SubPlan"):
+        label = f"{node['Parent Relationship']}: {label}"
+
+    children = [fingerprint(child, parents) for child in node.get("Plans", [])]
+    if node["Node Type"] in ("Append", "Merge Append", "BitmapOr", "BitmapAnd"):
+        children = sorted({tuple(child): child for child in children}.values())
+    return [label] + ["  " + line for child in children for line in child]
+
+
+class StatementRecorder:
+    """Collects the statements an engine runs, with the service method issuing them."""
+
+    def __init__(self) -> None:
+        self.statements: List[Tuple[str, str, Any]] = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if not executemany:
+            self.statements.append((current_call_site() or "-", statement, parameters))
+
+
+async def capture_plans(session_factory, recorder: StatementRecorder) -> Dict[str, list]:
+    """Run every scenario and fingerprint the plan of each statement it issued."""
+    async with session_factory() as db:
+        ctx = await context(db)
+        parents = await parent_relations(db)
+    plans: Dict[str, list] = {}
+    for name, scenario in SCENARIOS.items():
+        count_cache.clear()
+        recorder.statements.clear()
+        async with session_factory() as db:
+            await scenario(db, ctx)
+        statements = list(recorder.statements)
+        steps = []
+        async with session_factory() as db:
+            connection = await db.connection()
+            raw = (await connection.get_raw_connection()).driver_connection
+            for call_site, statement, parameters in statements:
+                plan = await raw.fetchval(
+                    f"EXPLAIN (FORMAT JSON) {statement}", *(parameters or ()))
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                steps.append({
+                    "call_site": call_site,
+                    "plan": fingerprint(plan[0]["Plan"], parents),
+                })
+        plans[name] = steps
+    return plans
+
+
+def render(steps: list) -> List[str]:
+    lines = []
+    for number, step in enumerate(steps, 1):
+        lines.append(f"statement {number} from {step['call_site']}")
+        lines.extend("  " + line for line in step["plan"])
+    return lines
+
+
+def compare(expected: Dict[str, list], actual: Dict[str, list]) -> int:
+    """Log a diff for each scenario whose plans changed; returns how many did."""
+    changed = 0
+    for name in sorted(set(expected) | set(actual)):
+        if expected.get(name) == actual.get(name):
+            logger.info(f"ok   {name}")
+            continue
+        changed += 1
+        diff = difflib.unified_diff(
+            render(expected.get(name, [])), render(actual.get(name, [])),
+            fromfile=f"{name} (committed)", tofile=f"{name} (now)", lineterm="",
+        )
+        logger.error(f"DIFF {name}\n" + "\n".join(diff))
+    return changed
+
+
+async def run(database: str, users: int, items: int, orders: int, years: int,
+              update: bool, reseed: bool, keep: bool) -> None:
+    if reseed:
+        logger.info(f"Creating {database} and seeding {orders} orders...")
+        await create_database(database)
+    engine = create_async_engine(_url(database).set(drivername="postgresql+asyncpg"))
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    recorder = StatementRecorder()
+    event.listen(engine.sync_engine, "before_cursor_execute", recorder)
+    try:
+        if reseed:
+            async with session_factory() as db:
+                await seed(db, users, items, orders, years)
+            async with engine.connect() as connection:
+                await connection.execution_options(isolation_level="AUTOCOMMIT")
+                # Index-only scans depend on the visibility map
+                await connection.execute(text("VACUUM ANALYZE"))
+        plans = await capture_plans(session_factory, recorder)
+    finally:
+        await engine.dispose()
+        if not keep:
+            await drop_database(database)
+
+    if update or not FINGERPRINTS.exists():
+        FINGERPRINTS.write_text(json.dumps(plans, indent=2, ensure_ascii=False) + "\n")
+        logger.info(f"Wrote {sum(map(len, plans.values()))} plan fingerprints "
+                    f"to {FINGERPRINTS}")
+        return
+    changed = compare(json.loads(FINGERPRINTS.read_text()), plans)
+    if changed:
+        logger.error(
+            f"{changed} scenarios changed plan; if intended, rerun with --update "
+            f"and commit {FINGERPRINTS.name}")
+        sys.exit(1)
+
+
+@app.command()
+def check(
+    database: str = typer.Option(
+        f"{settings.POSTGRES_DB}_plans", help="Scratch database to create"),
+    users: int = typer.Option(2_000, help="Users to seed"),
+    items: int = typer.Option(5_000, help="Items to seed"),
+    orders: int = typer.Option(200_000, help="Orders to seed"),
+    years: int = typer.Option(3, help="Years of order history"),
+    update: bool = typer.Option(False, help="Rewrite the committed fingerprints"),
+    reseed: bool = typer.Option(True, help="Recreate and seed the scratch database"),
+    keep: bool = typer.Option(False, help="Keep the scratch database for --no-reseed"),
+) -> None:
+    """Check that service queries keep their committed plan shapes."""
+    asyncio.run(run(database, users, items, orders, years, update, reseed, keep))
+
+
+if __name__ == "__main__":
+    app()
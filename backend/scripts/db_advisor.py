@@ -0,0 +1,401 @@
+import asyncio
+import json
+import logging
+import re
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional
+
+import typer
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.base import Base  # noqa: F401 - registers all models
+from app.db.query_tags import CALL_SITE_COMMENT
+from app.db.session import async_session_factory
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Create typer app
+app = typer.Typer()
+
+SEVERITIES = ("high", "medium", "low")
+
+
+class Finding(NamedTuple):
+    severity: str
+    kind: str
+    target: str
+    detail: str
+    advice: str
+    # Orders findings of the same severity: bytes, rows or milliseconds
+    weight: float
+
+
+def _mib(size: float) -> str:
+    return f"{size / 2**20:,.1f} MiB"
+
+
+async def _parents(db: AsyncSession) -> Dict[str, str]:
+    """Map partitions and their indexes to the partitioned table or index."""
+    result = await db.execute(text("""
+        SELECT child.relname, parent.relname
+        FROM pg_inherits AS i
+        JOIN pg_class AS child ON child.oid = i.inhrelid
+        JOIN pg_class AS parent ON parent.oid = i.inhparent
+        WHERE parent.relkind IN ('p', 'I')
+    """))
+    return dict(result.all())
+
+
+async def table_stats(db: AsyncSession, parents: Dict[str, str]) -> Dict[str, dict]:
+    """pg_stat_user_tables, with partitions summed into their parent."""
+    result = await db.execute(text("""
+        SELECT relname, seq_scan, seq_tup_read, coalesce(idx_scan, 0) AS idx_scan,
+               n_live_tup, n_dead_tup, n_tup_ins + n_tup_upd + n_tup_del AS writes,
+               coalesce(last_analyze, last_autoanalyze) IS NOT NULL AS analyzed
+        FROM pg_stat_user_tables
+    """))
+    tables: Dict[str, dict] = {}
+    for row in result.mappings():
+        name = parents.get(row["relname"], row["relname"])
+        stats = tables.setdefault(name, defaultdict(int, analyzed=True))
+        for key in ("seq_scan", "seq_tup_read", "idx_scan", "n_live_tup",
+                    "n_dead_tup", "writes"):
+            stats[key] += row[key]
+        if row["n_live_tup"]:
+            stats["analyzed"] = stats["analyzed"] and row["analyzed"]
+    return tables
+
+
+async def index_stats(db: AsyncSession, parents: Dict[str, str]) -> Dict[str, dict]:
+    """pg_stat_user_indexes, with partition indexes summed into their parent."""
+    result = await db.execute(text("""
+        SELECT s.relname, s.indexrelname, s.idx_scan,
+               pg_relation_size(s.indexrelid) AS size
+        FROM pg_stat_user_indexes AS s
+    """))
+    indexes: Dict[str, dict] = {}
+    for row in result.mappings():
+        name = parents.get(row["indexrelname"], row["indexrelname"])
+        stats = indexes.setdefault(name, {
+            "table": parents.get(row["relname"], row["relname"]),
+            "idx_scan": 0, "size": 0,
+        })
+        stats["idx_scan"] += row["idx_scan"]
+        stats["size"] += row["size"]
+    return indexes
+
+
+async def index_definitions(db: AsyncSession) -> List[dict]:
+    """Indexes of regular and partitioned tables (not of individual partitions)."""
+    result = await db.execute(text("""
+        SELECT c.relname AS table, ic.relname AS index,
+               i.indkey::int2[] AS columns, i.indclass::oid[] AS opclasses,
+               i.indisunique AS is_unique, i.indisprimary AS is_primary,
+               am.amname AS method,
+               pg_get_expr(i.indpred, i.indrelid) AS predicate,
+               pg_get_expr(i.indexprs, i.indrelid) AS expressions,
+               pg_get_indexdef(i.indexrelid) AS definition
+        FROM pg_index AS i
+        JOIN pg_class AS ic ON ic.oid = i.indexrelid
+        JOIN pg_class AS c ON c.oid = i.indrelid
+        JOIN pg_namespace AS n ON n.oid = c.relnamespace
+        JOIN pg_am AS am ON am.oid = ic.relam
+        WHERE n.nspname NOT IN ('pg_catalog', 'information_schema')
+          AND n.nspname NOT LIKE 'pg_toast%'
+          AND c.relkind IN ('r', 'p') AND NOT c.relispartition
+    """))
+    return [dict(row) for row in result.mappings()]
+
+
+def _covers(wide: dict, narrow: dict) -> bool:
+    """Whether `wide` can serve every lookup `narrow` serves."""
+    n = len(narrow["columns"])
+    return (
+        wide["table"] == narrow["table"]
+        and wide["method"] == narrow["method"] == "btree"
+        and wide["predicate"] == narrow["predicate"]
+        and wide["expressions"] == narrow["expressions"]
+        and list(wide["columns"][:n]) == list(narrow["columns"])
+        and list(wide["opclasses"][:n]) == list(narrow["opclasses"])
+    )
+
+
+def duplicate_indexes(definitions: List[dict], indexes: Dict[str, dict]) -> List[Finding]:
+    """Indexes whose columns are a leading prefix of another index's."""
+    findings = []
+    for narrow in definitions:
+        for wide in definitions:
+            if wide is narrow or not _covers(wide, narrow):
+                continue
+            same = len(wide["columns"]) == len(narrow["columns"])
+            # A unique index enforces a constraint a wider index can't
+            if narrow["is_unique"] and not (same and wide["is_unique"]):
+                continue
+            # Of two identical indexes, report only the one that isn't the key
+            if same and (narrow["is_primary"] or (
+                    not wide["is_primary"] and narrow["index"] < wide["index"])):
+                continue
+            size = indexes.get(narrow["index"], {}).get("size", 0)
+            findings.append(Finding(
+                "high",
+                "duplicate index",
+                narrow["index"],
+                f"{narrow['definition']} is covered by {wide['index']} "
+                f"({_mib(size)}, maintained on every write)",
+                f"DROP INDEX {narrow['index']};",
+                size,
+            ))
+            break
+    return findings
+
+
+def unused_indexes(
+    definitions: List[dict], indexes: Dict[str, dict], min_size: int
+) -> List[Finding]:
+    """Indexes never scanned since the statistics were reset."""
+    findings = []
+    for definition in definitions:
+        stats = indexes.get(definition["index"])
+        if not stats or stats["idx_scan"] or definition["is_unique"]:
+            continue
+        findings.append(Finding(
+            "medium" if stats["size"] >= min_size else "low",
+            "unused index",
+            definition["index"],
+            f"never scanned; {_mib(stats['size'])} on {definition['table']}",
+            f"Check replicas and rare jobs, then DROP INDEX {definition['index']};",
+            stats["size"],
+        ))
+    return findings
+
+
+async def unindexed_foreign_keys(
+    db: AsyncSession, definitions: List[dict], tables: Dict[str, dict], min_rows: int
+) -> List[Finding]:
+    """Foreign keys with no index leading with their columns."""
+    result = await db.execute(text("""
+        SELECT c.relname AS table, con.conname AS constraint,
+               con.conkey AS columns,
+               ARRAY(SELECT attname FROM pg_attribute
+                     WHERE attrelid = con.conrelid AND attnum = ANY(con.conkey)
+                     ORDER BY array_position(con.conkey, attnum)) AS names,
+               con.confrelid::regclass::text AS referenced
+        FROM pg_constraint AS con
+        JOIN pg_class AS c ON c.oid = con.conrelid
+        JOIN pg_namespace AS n ON n.oid = c.relnamespace
+        WHERE con.contype = 'f' AND con.conparentid = 0 AND NOT c.relispartition
+          AND n.nspname NOT IN ('pg_catalog', 'information_schema')
+    """))
+    findings = []
+    for fk in result.mappings():
+        n = len(fk["columns"])
+        if any(
+            d["table"] == fk["table"] and d["predicate"] is None
+            and sorted(d["columns"][:n]) == sorted(fk["columns"])
+            for d in definitions
+        ):
+            continue
+        rows = tables.get(fk["table"], {}).get("n_live_tup", 0)
+        columns = ", ".join(fk["names"])
+        findings.append(Finding(
+            "medium" if rows >= min_rows else "low",
+            "unindexed foreign key",
+            f"{fk['table']}({columns})",
+            f"{fk['constraint']} -> {fk['referenced']}; deletes and updates of "
+            f"{fk['referenced']} scan {rows:,d} rows",
+            f"CREATE INDEX ON {fk['table']} ({columns});",
+            rows,
+        ))
+    return findings
+
+
+def sequential_scans(
+    tables: Dict[str, dict], statements: List[dict], min_rows: int
+) -> List[Finding]:
+    """Large tables read mostly by sequential scans."""
+    findings = []
+    for name, stats in tables.items():
+        if stats["n_live_tup"] < min_rows or not stats["seq_scan"]:
+            continue
+        per_scan = stats["seq_tup_read"] / stats["seq_scan"]
+        if per_scan < min_rows or stats["seq_scan"] < stats["idx_scan"] * 0.01:
+            continue
+        pattern = re.compile(rf"\b(FROM|JOIN)\s+{re.escape(name)}\b", re.IGNORECASE)
+        sites = sorted({
+            statement["call_site"] for statement in statements
+            if pattern.search(statement["query"])
+        })
+        findings.append(Finding(
+            "high" if stats["seq_scan"] > stats["idx_scan"] else "medium",
+            "sequential scans",
+            name,
+            f"{stats['seq_scan']:,d} seq scans reading {per_scan:,.0f} rows each "
+            f"vs {stats['idx_scan']:,d} index scans"
+            + (f"; statements from {', '.join(sites)}" if sites else ""),
+            "EXPLAIN the statements above and index their filters and sort keys",
+            stats["seq_tup_read"],
+        ))
+    return findings
+
+
+async def maintenance(
+    db: AsyncSession, tables: Dict[str, dict], min_rows: int
+) -> List[Finding]:
+    """Tables needing VACUUM or ANALYZE."""
+    findings = []
+    for name, stats in tables.items():
+        live, dead = stats["n_live_tup"], stats["n_dead_tup"]
+        if dead > 10_000 and dead > 0.2 * (live + dead):
+            findings.append(Finding(
+                "medium", "dead rows", name,
+                f"{dead:,d} dead vs {live:,d} live rows",
+                f"VACUUM (ANALYZE) {name}; and review autovacuum settings",
+                dead,
+            ))
+        elif live >= min_rows and not stats["analyzed"]:
+            findings.append(Finding(
+                "low", "not analyzed", name,
+                "has rows but no statistics", f"ANALYZE {name};", live,
+            ))
+    # Autovacuum never analyzes partitioned parents, only their partitions
+    result = await db.execute(text("""
+        SELECT c.relname FROM pg_class AS c
+        JOIN pg_namespace AS n ON n.oid = c.relnamespace
+        WHERE c.relkind = 'p' AND c.reltuples < 0
+          AND n.nspname NOT IN ('pg_catalog', 'information_schema')
+    """))
+    for name in result.scalars():
+        findings.append(Finding(
+            "low", "not analyzed", name,
+            "partitioned table without parent statistics; autovacuum never "
+            "analyzes it", f"ANALYZE {name}; periodically", 0,
+        ))
+    return findings
+
+
+async def statement_stats(db: AsyncSession, top: int) -> Optional[List[dict]]:
+    """Top statements by total time from pg_stat_statements, or None without it."""
+    installed = (await db.execute(text(
+        "SELECT 1 FROM pg_extension WHERE extname = 'pg_stat_statements'"
+    ))).scalar()
+    if not installed:
+        return None
+    result = await db.execute(text("""
+        SELECT queryid, calls, total_exec_time, mean_exec_time, rows,
+               shared_blks_hit, shared_blks_read, query
+        FROM pg_stat_statements
+        WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+        ORDER BY total_exec_time DESC
+        LIMIT :top
+    """), {"top": top})
+    statements = []
+    for row in result.mappings():
+        match = CALL_SITE_COMMENT.search(row["query"])
+        statements.append({**row, "call_site": match.group(1) if match else "untagged"})
+    return statements
+
+
+async def total_statement_time(db: AsyncSession) -> float:
+    return (await db.execute(text("""
+        SELECT coalesce(sum(total_exec_time), 0) FROM pg_stat_statements
+        WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+    """))).scalar()
+
+
+def slow_statements(statements: List[dict], total_time: float) -> List[Finding]:
+    """Statements taking the largest share of database time."""
+    findings = []
+    for statement in statements:
+        share = statement["total_exec_time"] / total_time if total_time else 0
+        blocks = statement["shared_blks_hit"] + statement["shared_blks_read"]
+        hit_ratio = statement["shared_blks_hit"] / blocks if blocks else 1.0
+        query = " ".join(CALL_SITE_COMMENT.sub("", statement["query"]).split())
+        findings.append(Finding(
+            "high" if share >= 0.1 else "medium" if share >= 0.02 else "low",
+            "slow statement",
+            statement["call_site"],
+            f"{share:.0%} of DB time; {statement['calls']:,d} calls, "
+            f"mean {statement['mean_exec_time']:.2f} ms, "
+            f"{statement['rows'] / max(statement['calls'], 1):,.0f} rows/call, "
+            f"cache hit {hit_ratio:.0%}: {query[:160]}",
+            "EXPLAIN (ANALYZE, BUFFERS) it; cache or batch it if it is called per row",
+            statement["total_exec_time"],
+        ))
+    return findings
+
+
+def time_by_call_site(statements: List[dict]) -> Dict[str, float]:
+    sites: Dict[str, float] = defaultdict(float)
+    for statement in statements:
+        sites[statement["call_site"]] += statement["total_exec_time"]
+    return dict(sorted(sites.items(), key=lambda item: -item[1]))
+
+
+async def run(top: int, min_index_mb: float, min_rows: int, as_json: bool) -> None:
+    async with async_session_factory() as db:
+        stats_reset = (await db.execute(text(
+            "SELECT coalesce(stats_reset, pg_postmaster_start_time()) "
+            "FROM pg_stat_database WHERE datname = current_database()"
+        ))).scalar()
+        parents = await _parents(db)
+        tables = await table_stats(db, parents)
+        indexes = await index_stats(db, parents)
+        definitions = await index_definitions(db)
+        statements = await statement_stats(db, top)
+        total_time = await total_statement_time(db) if statements is not None else 0.0
+
+        findings = (
+            duplicate_indexes(definitions, indexes)
+            + unused_indexes(definitions, indexes, int(min_index_mb * 2**20))
+            + await unindexed_foreign_keys(db, definitions, tables, min_rows)
+            + sequential_scans(tables, statements or [], min_rows)
+            + await maintenance(db, tables, min_rows)
+            + slow_statements(statements or [], total_time)
+        )
+    findings.sort(key=lambda f: (SEVERITIES.index(f.severity), -f.weight))
+
+    if as_json:
+        print(json.dumps({
+            "stats_since": stats_reset.isoformat() if stats_reset else None,
+            "findings": [f._asdict() for f in findings],
+            "time_by_call_site_ms": time_by_call_site(statements or []),
+        }, indent=2))
+        return
+
+    logger.info(f"Usage statistics cover activity since {stats_reset}")
+    if statements is None:
+        logger.warning(
+            "pg_stat_statements is not installed; statement findings are skipped. "
+            "Add it to shared_preload_libraries and run "
+            "CREATE EXTENSION pg_stat_statements;")
+    for rank, finding in enumerate(findings, 1):
+        logger.info(
+            f"{rank:3d}. [{finding.severity:<6}] {finding.kind}: {finding.target}\n"
+            f"       {finding.detail}\n"
+            f"       -> {finding.advice}"
+        )
+    if statements:
+        logger.info("Database time by call site (top statements):")
+        for site, elapsed in time_by_call_site(statements).items():
+            logger.info(f"  {elapsed:12,.1f} ms  {site}")
+
+
+@app.command()
+def advise(
+    top: int = typer.Option(20, help="Statements to read from pg_stat_statements"),
+    min_index_mb: float = typer.Option(
+        1.0, help="Unused indexes smaller than this are reported as low severity"),
+    min_rows: int = typer.Option(
+        10_000, help="Tables smaller than this are not flagged for scans, FKs "
+                     "or statistics"),
+    as_json: bool = typer.Option(False, "--json", help="Print the report as JSON"),
+) -> None:
+    """Report unused, duplicate and missing indexes and the costliest statements."""
+    asyncio.run(run(top, min_index_mb, min_rows, as_json))
+
+
+if __name__ == "__main__":
+    app()
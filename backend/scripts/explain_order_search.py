@@ -0,0 +1,135 @@
+import asyncio
+import json
+import logging
+import sys
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+import typer
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.base import Base  # noqa: F401 - registers all models
+from app.db.session import async_session_factory
+from app.models.base_model import JST
+from app.models.order import OrderStatus
+from app.schemas.order import OrderFilter, OrderSort
+from app.services.order import OrderService, encode_order_cursor
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Create typer app
+app = typer.Typer()
+
+
+def _plan_nodes(plan: dict) -> List[dict]:
+    nodes = [plan]
+    for child in plan.get("Plans", []):
+        nodes.extend(_plan_nodes(child))
+    return nodes
+
+
+async def parent_indexes(db: AsyncSession) -> Dict[str, str]:
+    """Map each partition's index to the index declared on its parent table."""
+    result = await db.execute(text("""
+        SELECT child.relname, parent.relname
+        FROM pg_inherits AS i
+        JOIN pg_class AS child ON child.oid = i.inhrelid
+        JOIN pg_class AS parent ON parent.oid = i.inhparent
+        WHERE child.relkind = 'i'
+    """))
+    return dict(result.all())
+
+
+async def explain(db: AsyncSession, stmt) -> Tuple[dict, float]:
+    """EXPLAIN ANALYZE a statement; returns the root plan node and execution time."""
+    connection = await db.connection()
+    sql = stmt.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True})
+    result = await connection.exec_driver_sql(
+        f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}")
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"], plan[0]["Execution Time"]
+
+
+async def scenarios(db: AsyncSession, depth: int) -> Dict[str, tuple]:
+    """Searches the indexes from the order search migration should serve."""
+    now = datetime.now(JST).replace(tzinfo=None)
+    user_id = (await db.execute(
+        text("SELECT user_id FROM orders GROUP BY user_id ORDER BY count(*) DESC LIMIT 1")
+    )).scalar()
+
+    # Cursor for the page `depth` rows into the newest-first feed
+    deep = (await db.execute(
+        OrderService.search_statement(OrderFilter(), OrderSort.NEWEST)
+        .offset(depth - 1).limit(1)
+    )).scalars().first()
+    cursor = encode_order_cursor(OrderSort.NEWEST, deep) if deep else None
+
+    pending = OrderFilter(status=[OrderStatus.PENDING])
+    return {
+        # label: (filters, sort, cursor, skip, expected index)
+        "newest": (OrderFilter(), OrderSort.NEWEST, None, 0, "ix_orders_created_at_id"),
+        "pending newest": (pending, OrderSort.NEWEST, None, 0,
+                           "ix_orders_status_created_at_id"),
+        "pending last 30 days": (
+            OrderFilter(status=[OrderStatus.PENDING],
+                        created_from=now - timedelta(days=30)),
+            OrderSort.NEWEST, None, 0, "ix_orders_status_created_at_id"),
+        "user newest": (OrderFilter(user_id=user_id), OrderSort.NEWEST, None, 0,
+                        "ix_orders_user_id_created_at_id"),
+        "highest total": (OrderFilter(), OrderSort.HIGHEST_TOTAL, None, 0,
+                          "ix_orders_total_amount_id"),
+        "total 100-110": (OrderFilter(min_total=100, max_total=110),
+                          OrderSort.LOWEST_TOTAL, None, 0, "ix_orders_total_amount_id"),
+        f"newest skip {depth}": (OrderFilter(), OrderSort.NEWEST, None, depth, None),
+        f"newest cursor at {depth}": (OrderFilter(), OrderSort.NEWEST, cursor, 0,
+                                      "ix_orders_created_at_id"),
+    }
+
+
+async def run(page: int, depth: int) -> None:
+    failures = 0
+    async with async_session_factory() as db:
+        await db.execute(text("ANALYZE orders"))
+        parents = await parent_indexes(db)
+        for label, (filters, sort, cursor, skip, expected) in (
+            await scenarios(db, depth)
+        ).items():
+            stmt = OrderService.search_statement(filters, sort, cursor)
+            plan, elapsed = await explain(db, stmt.offset(skip).limit(page))
+            nodes = _plan_nodes(plan)
+            # Count partitions scanned through each parent index
+            indexes: Dict[str, int] = {}
+            for node in nodes:
+                if "Index Name" in node:
+                    name = parents.get(node["Index Name"], node["Index Name"])
+                    indexes[name] = indexes.get(name, 0) + 1
+            scanned = sum(1 for node in nodes if node["Node Type"].endswith("Scan"))
+            sorted_rows = any(node["Node Type"] == "Sort" for node in nodes)
+            ok = expected is None or expected in indexes
+            failures += not ok
+            logger.info(
+                f"{'ok ' if ok else 'BAD'} {label:<24} {elapsed:8.2f} ms  "
+                f"scans {scanned:3d}  sort {'yes' if sorted_rows else 'no ':<3}  "
+                f"indexes {', '.join(f'{name} x{n}' for name, n in indexes.items()) or '-'}"
+            )
+    if failures:
+        logger.error(f"{failures} searches did not use their expected index")
+        sys.exit(1)
+
+
+@app.command()
+def explain_search(
+    page: int = typer.Option(50, help="Page size"),
+    depth: int = typer.Option(10_000, help="Rows skipped for the deep page comparison"),
+) -> None:
+    """Check that order searches are served by the order search indexes."""
+    asyncio.run(run(page, depth))
+
+
+if __name__ == "__main__":
+    app()